@@ -1,23 +1,212 @@
-from fastapi import FastAPI, HTTPException
+import logging
+import os
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from aijobhunter.crew import AIjobhunter
+from aijobhunter.jobs import JobQueue, JobStatus, QueueFullError, current_job
+from aijobhunter.tools.pool import tool_pool
+from aijobhunter.tools.resume_index import resume_index_store
+from aijobhunter.tracing import metrics
+from aijobhunter.users import InvalidResumeError, user_store
+from aijobhunter.utils import Environment, configure_logging
+
+logger = logging.getLogger(__name__)
+
+RESUME_PATH = "./knowledge/CV_YuvalMehta.pdf"
+DEFAULT_RUN_OUTPUT_DIR = os.path.join("outputs", "runs")
+
+
+def run_application(inputs: dict):
+    # Imported here so the API starts serving before crewAI is loaded.
+    from aijobhunter.crew import AIjobhunter
+
+    inputs = dict(inputs)
+    user_id = inputs.pop("user_id", None)
+    file_path = user_store.resume_path(user_id) if user_id else RESUME_PATH
+    # Each run writes its files to its own directory so concurrent runs never clobber each other.
+    # A user's runs are kept with the user's data, so deleting the user removes them.
+    job = current_job()
+    output_root = (
+        user_store.runs_dir(user_id) if user_id
+        else Environment.get_env_variable("AIJOBHUNTER_RUN_OUTPUT_DIR", DEFAULT_RUN_OUTPUT_DIR)
+    )
+    output_dir = os.path.join(output_root, job.id if job is not None else uuid.uuid4().hex)
+    ai_job_hunter = AIjobhunter(file_path=file_path, output_dir=output_dir)
+    return ai_job_hunter.crew().kickoff(inputs=inputs)
+
+
+job_queue = JobQueue(run_application)
+
+
+def _collect_job_metrics():
+    return [
+        ("aijobhunter_jobs", "Retained jobs by status.", "gauge", {"status": status}, count)
+        for status, count in job_queue.stats().items()
+    ]
+
+
+metrics.register_collector(_collect_job_metrics)
+
+
+def warm_up():
+    from aijobhunter.crew import AIjobhunter  # noqa: F401
+
+    tool_pool.get(RESUME_PATH)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # Import crewAI, load the embedder and index the resume in the background
+    # so the first /apply does not pay for it, without delaying startup.
+    threading.Thread(target=warm_up, name="aijobhunter-warmup", daemon=True).start()
+    yield
+    job_queue.shutdown(wait=False)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 class JobApplicationInputs(BaseModel):
     job_posting_url: str
     github_url: str
     personal_website: str = None  # Optional field
+    user_id: Optional[str] = None  # Uses the resume uploaded for this user
 
-@app.post("/apply")
+def _get_job_or_404(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+def _submit(inputs: JobApplicationInputs):
+    if inputs.user_id is not None:
+        try:
+            user_store.resume_path(inputs.user_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"No resume uploaded for user {inputs.user_id}")
+    try:
+        return job_queue.submit(inputs.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+@app.post("/apply", status_code=202)
 async def apply_for_job(inputs: JobApplicationInputs):
+    job = _submit(inputs)
+    return {"status": job.status.value, "job_id": job.id}
+
+async def _event_stream(job, start: int = 0):
+    # Waits on the event loop, so idle clients do not hold a worker thread.
+    async for event in job.events.follow_async(start):
+        yield ": keep-alive\n\n" if event is None else event.to_sse()
+
+def _sse_response(job, start: int = 0):
+    return StreamingResponse(
+        _event_stream(job, start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/apply/stream")
+async def apply_for_job_stream(inputs: JobApplicationInputs):
+    """Queues a run and streams its progress as Server-Sent Events."""
+    job = _submit(inputs)
+    return _sse_response(job)
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str, last_event_id: Optional[int] = Header(None)):
+    """Streams a job's events, resuming after Last-Event-ID on reconnect."""
+    job = _get_job_or_404(job_id)
+    start = last_event_id + 1 if last_event_id is not None else 0
+    return _sse_response(job, start)
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    summary = job_queue.summary(job_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return summary
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = _get_job_or_404(job_id)
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {job.error}")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status.value}")
+    return {"status": "success", "output": job.output}
+
+def _index_resume(file_path: str) -> None:
     try:
-        ai_job_hunter = AIjobhunter(file_path="./knowledge/CV_YuvalMehta.pdf")
-        output = ai_job_hunter.crew().kickoff(inputs=inputs.model_dump())
-        return {"status": "success", "output": output}
+        resume_index_store.load(file_path)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+        # The first run indexes it instead.
+        logger.warning(f"Could not index {file_path}: {e}")
+
+async def _read_capped(request: Request, max_bytes: int) -> bytes:
+    """Reads the request body, rejecting it as soon as it exceeds ``max_bytes``."""
+    too_large = HTTPException(status_code=413, detail=f"Resume is larger than {max_bytes} bytes")
+    length = request.headers.get("content-length")
+    if length is not None:
+        try:
+            if int(length) > max_bytes:
+                raise too_large
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+@app.put("/users/{user_id}/resume", status_code=201)
+async def upload_resume(user_id: str, request: Request):
+    """Stores the PDF sent as the request body as the user's resume and indexes it."""
+    content = await _read_capped(request, user_store.max_resume_bytes)
+    try:
+        resume = await run_in_threadpool(user_store.save_resume, user_id, content)
+    except InvalidResumeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await run_in_threadpool(_index_resume, user_store.resume_path(user_id))
+    return resume
+
+@app.get("/users/{user_id}/resume")
+async def get_resume(user_id: str):
+    try:
+        resume = user_store.get(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resume is None:
+        raise HTTPException(status_code=404, detail=f"No resume uploaded for user {user_id}")
+    return resume
+
+@app.delete("/users/{user_id}", status_code=204)
+async def delete_user(user_id: str):
+    try:
+        deleted = await run_in_threadpool(user_store.delete, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Unknown user: {user_id}")
+    return Response(status_code=204)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Exposes span latencies, token counts, cache and job stats for Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
-    return {"message": "AIJobHunter Agent API"}
\ No newline at end of file
+    return {"message": "AIJobHunter Agent API"}
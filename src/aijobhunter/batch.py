@@ -0,0 +1,245 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aijobhunter.matching import rank_postings
+from aijobhunter.outbound import bind_lane
+from aijobhunter.profile_cache import profile_store
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WORKERS = 4
+DEFAULT_OUTPUT_ROOT = os.path.join("outputs", "batch")
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value).strip(".") or "posting"
+
+
+def iter_postings(input_path: str) -> Iterator[Dict[str, Any]]:
+    """Streams job postings from a JSONL file.
+
+    Each non-empty line is a JSON object with at least ``job_posting_url``.
+    Postings without an ``id`` get their line number as id.
+
+    Raises:
+        ValueError: If a line is not valid JSON or lacks ``job_posting_url``.
+    """
+    with open(input_path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                posting = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{input_path}:{line_number}: invalid JSON: {e}") from e
+            if "job_posting_url" not in posting:
+                raise ValueError(f"{input_path}:{line_number}: missing job_posting_url")
+            posting.setdefault("id", str(line_number))
+            yield posting
+
+
+class CandidateProfiles:
+    """Builds each candidate profile once and shares it across postings.
+
+    Profiles still fresh in the profile store are reused without running the
+    profiler at all. ``make_hunter(file_path=...)`` builds the crews and
+    defaults to ``AIjobhunter``.
+    """
+
+    def __init__(self, file_path: str, make_hunter: Optional[Callable[..., Any]] = None):
+        self.file_path = file_path
+        self.make_hunter = make_hunter or _default_hunter
+        self._profiles: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, github_url: str) -> str:
+        with self._lock:
+            url_lock = self._locks.setdefault(github_url, threading.Lock())
+        with url_lock:
+            if github_url not in self._profiles:
+                ai_job_hunter = self.make_hunter(file_path=self.file_path)
+                artifact = profile_store.get(github_url, self.file_path, ai_job_hunter.profile_prompt())
+                if artifact is not None:
+                    self._profiles[github_url] = artifact.profile
+                else:
+                    logger.info(f"Building candidate profile for {github_url}")
+                    output = ai_job_hunter.profile_crew().kickoff(inputs={"github_url": github_url})
+                    self._profiles[github_url] = output.raw
+            return self._profiles[github_url]
+
+
+def _default_hunter(**kwargs: Any) -> Any:
+    from aijobhunter.crew import AIjobhunter
+
+    return AIjobhunter(**kwargs)
+
+
+@dataclass
+class BatchSummary:
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+
+def _optional_env(name: str, cast):
+    value = Environment.get_env_variable(name, "")
+    return cast(value) if value else None
+
+
+def rank_batch(
+    postings: List[Dict[str, Any]],
+    file_path: str,
+    top: Optional[int] = None,
+    min_fit: Optional[float] = None,
+) -> Tuple[List[Tuple[Dict[str, Any], Optional[float]]], List[Tuple[Dict[str, Any], Optional[float]]]]:
+    """Orders postings by resume fit and splits off those not worth applying to.
+
+    Returns:
+        Tuple: ``(selected, skipped)`` lists of ``(posting, fit score)``, best
+            fit first. Postings that could not be scored are kept, last.
+    """
+    selected, skipped = [], []
+    for posting, report in rank_postings(file_path, postings):
+        fit = report.fit_score if report is not None else None
+        below = fit is not None and min_fit is not None and fit < min_fit
+        beyond = top is not None and len(selected) >= top
+        (skipped if below or beyond else selected).append((posting, fit))
+    logger.info(f"Ranked {len(postings)} postings by fit: {len(selected)} selected, {len(skipped)} skipped")
+    return selected, skipped
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    file_path: str,
+    github_url: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    output_root: str = DEFAULT_OUTPUT_ROOT,
+    rank: Optional[bool] = None,
+    top: Optional[int] = None,
+    min_fit: Optional[float] = None,
+    make_hunter: Optional[Callable[..., Any]] = None,
+) -> BatchSummary:
+    """Applies one resume to every posting in a JSONL file.
+
+    The candidate-side work (profile, resume embeddings) is done once and
+    shared by all postings, which run on a bounded pool. One JSON line is
+    appended to ``output_path`` as soon as each posting finishes, and each
+    posting writes its files under ``<output_root>/<id>/``.
+
+    Args:
+        input_path (str): JSONL file of postings.
+        output_path (str): JSONL file receiving one result per posting.
+        file_path (str): Path to the resume PDF.
+        github_url (Optional[str]): Candidate GitHub URL, used for postings
+            that do not set their own.
+        max_workers (Optional[int]): Concurrent applications. Defaults to the
+            ``AIJOBHUNTER_BATCH_WORKERS`` environment variable, or 4.
+        output_root (str): Directory for per-posting output files.
+        rank (Optional[bool]): Score every posting against the resume first
+            and apply best fit first. Reads all postings up front. Defaults to
+            the ``AIJOBHUNTER_BATCH_RANK`` environment variable, and is implied
+            by ``top`` or ``min_fit``.
+        top (Optional[int]): Only apply to this many of the best-fitting
+            postings. Defaults to ``AIJOBHUNTER_BATCH_TOP``.
+        min_fit (Optional[float]): Skip postings whose fit score (0-1) is
+            lower. Defaults to ``AIJOBHUNTER_BATCH_MIN_FIT``.
+        make_hunter (Optional[Callable]): Builds the crews from ``AIjobhunter``
+            keyword arguments. Defaults to ``AIjobhunter`` itself.
+
+    Returns:
+        BatchSummary: Counts of succeeded, failed and skipped postings.
+    """
+    if max_workers is None:
+        max_workers = int(
+            Environment.get_env_variable("AIJOBHUNTER_BATCH_WORKERS", str(DEFAULT_BATCH_WORKERS))
+        )
+    if top is None:
+        top = _optional_env("AIJOBHUNTER_BATCH_TOP", int)
+    if min_fit is None:
+        min_fit = _optional_env("AIJOBHUNTER_BATCH_MIN_FIT", float)
+    if rank is None:
+        rank = Environment.get_env_variable("AIJOBHUNTER_BATCH_RANK", "0") == "1"
+    rank = rank or top is not None or min_fit is not None
+    make_hunter = make_hunter or _default_hunter
+
+    profiles = CandidateProfiles(file_path, make_hunter)
+    summary = BatchSummary()
+    started = time.time()
+
+    def apply(posting: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = {k: v for k, v in posting.items() if k != "id"}
+        inputs.setdefault("github_url", github_url)
+        if not inputs["github_url"]:
+            raise ValueError("No github_url given for the posting or the batch")
+        posting_started = time.time()
+        # Batch runs queue behind interactive ones for the shared API quotas.
+        with bind_lane("batch"):
+            ai_job_hunter = make_hunter(
+                file_path=file_path,
+                output_dir=os.path.join(output_root, _safe_name(str(posting["id"]))),
+                precomputed_outputs={"profile_task": profiles.get(inputs["github_url"])},
+            )
+            output = ai_job_hunter.crew().kickoff(inputs=inputs)
+        return {"output": output.raw, "elapsed": time.time() - posting_started}
+
+    with open(output_path, "a") as out, ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="aijobhunter-batch"
+    ) as executor:
+        running: Dict[Future, Tuple[Dict[str, Any], Optional[float]]] = {}
+
+        def new_record(posting: Dict[str, Any], fit: Optional[float]) -> Dict[str, Any]:
+            record = {"id": posting["id"], "job_posting_url": posting["job_posting_url"]}
+            if rank:
+                record["fit_score"] = fit
+            return record
+
+        def drain() -> None:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                posting, fit = running.pop(future)
+                record = new_record(posting, fit)
+                try:
+                    record.update(status="success", **future.result())
+                    summary.succeeded += 1
+                except Exception as e:
+                    logger.error(f"Posting {posting['id']} failed: {e}")
+                    record.update(status="error", error=str(e))
+                    summary.failed += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+        postings: Iterable[Tuple[Dict[str, Any], Optional[float]]]
+        if rank:
+            postings, skipped = rank_batch(list(iter_postings(input_path)), file_path, top, min_fit)
+            for posting, fit in skipped:
+                out.write(json.dumps({**new_record(posting, fit), "status": "skipped"}) + "\n")
+                summary.skipped += 1
+            out.flush()
+        else:
+            postings = ((posting, None) for posting in iter_postings(input_path))
+
+        # Only keep a bounded number of postings queued so large files stream.
+        for posting, fit in postings:
+            if len(running) >= max_workers * 2:
+                drain()
+            running[executor.submit(apply, posting)] = (posting, fit)
+        while running:
+            drain()
+
+    summary.elapsed = time.time() - started
+    logger.info(
+        f"Batch finished in {summary.elapsed:.1f}s: "
+        f"{summary.succeeded} succeeded, {summary.failed} failed, {summary.skipped} skipped"
+    )
+    return summary
@@ -0,0 +1,517 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from aijobhunter.outbound import DEFAULT_QUOTAS
+from aijobhunter.utils import configure_logging
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_VERSION = 1
+DEFAULT_FIXTURE = os.path.join("benchmarks", "fixtures", "default.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_RUNS = 5
+DEFAULT_TOLERANCE = 0.2
+
+# Request parameters that decide which completion a recorded call maps to.
+_COMPLETION_KEY_PARAMS = (
+    "model", "messages", "tools", "tool_choice", "response_format", "temperature", "top_p",
+    "seed", "stop", "max_tokens",
+)
+# Recorded bodies are stored decoded, so transport headers no longer apply.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class FixtureMissingError(LookupError):
+    """Raised during replay for a request that was never recorded."""
+
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class Fixtures:
+    """Recorded LLM completions and HTTP responses of one crew run.
+
+    A fixture file also holds the inputs and resume the run was recorded with,
+    so replaying it reproduces the exact same prompts and requests.
+    """
+
+    def __init__(
+        self,
+        inputs: Dict[str, Any],
+        resume_path: str,
+        completions: Optional[Dict[str, Dict[str, Any]]] = None,
+        http: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.inputs = inputs
+        self.resume_path = resume_path
+        self.completions = completions or {}
+        self.http = http or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Fixtures":
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"{path}: unsupported fixture version {data.get('version')}")
+        return cls(data["inputs"], data["resume_path"], data["completions"], data["http"])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            data = {
+                "version": FIXTURE_VERSION,
+                "inputs": self.inputs,
+                "resume_path": self.resume_path,
+                "completions": self.completions,
+                "http": self.http,
+            }
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def completion_key(params: Dict[str, Any]) -> str:
+        return _digest({name: params.get(name) for name in _COMPLETION_KEY_PARAMS})
+
+    @staticmethod
+    def http_key(method: str, url: str, body: Any) -> str:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        return _digest([method.upper(), url, body])
+
+    def get(self, kind: str, key: str) -> Dict[str, Any]:
+        entries = self.completions if kind == "completion" else self.http
+        with self._lock:
+            entry = entries.get(key)
+        if entry is None:
+            raise FixtureMissingError(f"No recorded {kind} for key {key}; re-record the fixture")
+        return entry
+
+    def put(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        entries = self.completions if kind == "completion" else self.http
+        with self._lock:
+            entries[key] = entry
+
+
+def _log_usage(params: Dict[str, Any], usage: Any) -> None:
+    # litellm reports usage to crewAI's token counter itself; the stand-in has to.
+    import litellm
+
+    for callback in litellm.callbacks or []:
+        if hasattr(callback, "log_success_event"):
+            callback.log_success_event(kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0)
+
+
+class ReplayBackend:
+    """Stand-in for ``litellm.completion`` that answers from the fixtures.
+
+    The recorded model latency is slept for, scaled by ``latency_scale``;
+    the default of 0 measures the pipeline's own overhead only.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency_scale: float = 0.0):
+        self.fixtures = fixtures
+        self.latency_scale = latency_scale
+
+    def completion(self, **params: Any) -> Any:
+        import litellm
+
+        entry = self.fixtures.get("completion", Fixtures.completion_key(params))
+        if self.latency_scale:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        response = litellm.ModelResponse(**entry["response"])
+        if params.get("stream"):
+            return self._stream(response)
+        _log_usage(params, response.usage)
+        return response
+
+    @staticmethod
+    def _stream(response: Any) -> Iterator[Any]:
+        text = response.choices[0].message.content or ""
+        for word in re.findall(r"\S+\s*", text):
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+        yield SimpleNamespace(usage=response.usage, choices=[])
+
+
+class RecordingBackend:
+    """Wraps the real ``litellm.completion`` and records every response."""
+
+    def __init__(self, fixtures: Fixtures, completion: Callable[..., Any]):
+        self.fixtures = fixtures
+        self._completion = completion
+
+    def completion(self, **params: Any) -> Any:
+        key = Fixtures.completion_key(params)
+        started = time.perf_counter()
+        response = self._completion(**params)
+        if params.get("stream"):
+            return self._record_stream(key, response, started)
+        self.fixtures.put(
+            "completion", key, {"response": response.model_dump(), "elapsed": time.perf_counter() - started}
+        )
+        return response
+
+    def _record_stream(self, key: str, chunks: Iterator[Any], started: float) -> Iterator[Any]:
+        parts, usage = [], None
+        for chunk in chunks:
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        response = {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(parts)}, "finish_reason": "stop"}],
+            "usage": usage.model_dump() if hasattr(usage, "model_dump") else usage,
+        }
+        self.fixtures.put("completion", key, {"response": response, "elapsed": time.perf_counter() - started})
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport adapter serving recorded HTTP responses."""
+
+    def __init__(self, fixtures: Fixtures, latency_scale: float = 0.0):
+        super().__init__()
+        self.fixtures = fixtures
+        self.latency_scale = latency_scale
+
+    def send(self, request, **kwargs) -> requests.Response:
+        entry = self.fixtures.get("http", Fixtures.http_key(request.method, request.url, request.body))
+        if self.latency_scale:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["text"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = entry["url"]
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """requests transport adapter that records the responses it receives."""
+
+    def __init__(self, fixtures: Fixtures, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.fixtures = fixtures
+
+    def send(self, request, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        response.encoding = response.apparent_encoding
+        self.fixtures.put("http", Fixtures.http_key(request.method, request.url, request.body), {
+            "url": response.url,
+            "status_code": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "text": response.text,
+            "elapsed": time.perf_counter() - started,
+        })
+        return response
+
+
+def prepare_environment(work_dir: str, replay: bool) -> None:
+    """Points every cache at ``work_dir`` and turns off network side channels.
+
+    Must run before the crew modules are imported: litellm reads its model
+    cost map from the network at import unless told otherwise.
+    """
+    os.environ["AIJOBHUNTER_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ["AIJOBHUNTER_TRACE_DIR"] = os.path.join(work_dir, "traces")
+    # Every run must do the same work, so nothing is reused between runs.
+    os.environ["AIJOBHUNTER_LLM_CACHE"] = "0"
+    os.environ["AIJOBHUNTER_PROFILE_TTL"] = "0"
+    # Fixtures are recorded per model, so every call must go to the same backend.
+    os.environ["AIJOBHUNTER_LLM_ROUTING"] = "0"
+    os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+    if replay:
+        os.environ.setdefault("SERPER_API_KEY", "benchmark")
+        # Fixtures have no quota to protect; waiting for one would skew the timings.
+        for provider in DEFAULT_QUOTAS:
+            os.environ[f"AIJOBHUNTER_RATE_LIMIT_{provider.upper()}"] = "0"
+
+
+@contextmanager
+def stand_ins(fixtures: Fixtures, record: bool = False, latency_scale: float = 0.0) -> Iterator[None]:
+    """Routes LLM calls, HTTP fetches and embeddings through the fixtures.
+
+    When ``record`` is set, real calls are made and their responses stored;
+    otherwise everything is answered from the fixtures without any network.
+    """
+    import litellm
+
+    from aijobhunter.tools.http_cache import FetchClient, set_fetch_client
+    from aijobhunter.tools.resume_index import DEFAULT_EMBEDDING_MODEL, HashingEmbedder, register_embedder
+
+    real_completion = litellm.completion
+    session = requests.Session()
+    if record:
+        backend = RecordingBackend(fixtures, real_completion)
+        adapter = RecordingAdapter(fixtures)
+    else:
+        backend = ReplayBackend(fixtures, latency_scale)
+        adapter = ReplayAdapter(fixtures, latency_scale)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    register_embedder(DEFAULT_EMBEDDING_MODEL, HashingEmbedder())
+    litellm.completion = backend.completion
+    # No response cache, so every run performs all of its fetches.
+    set_fetch_client(FetchClient(ttl=0, session=session))
+    try:
+        yield
+    finally:
+        litellm.completion = real_completion
+        set_fetch_client(None)
+
+
+@dataclass
+class RunResult:
+    elapsed: float
+    task_durations: Dict[str, float] = field(default_factory=dict)
+    tool_calls: Dict[str, int] = field(default_factory=dict)
+    llm_calls: int = 0
+    error: Optional[str] = None
+
+
+def run_once(fixtures: Fixtures, stage: str = "full", output_dir: Optional[str] = None) -> RunResult:
+    """Runs the crew (``full``) or only the profiler (``profile``) once."""
+    from aijobhunter.crew import AIjobhunter
+
+    ai_job_hunter = AIjobhunter(file_path=fixtures.resume_path, output_dir=output_dir, checkpoints=False)
+    crew = ai_job_hunter.crew() if stage == "full" else ai_job_hunter.profile_crew()
+    started = time.perf_counter()
+    try:
+        crew.kickoff(inputs=fixtures.inputs)
+        error = None
+    except Exception as e:
+        logger.exception("Benchmark run failed")
+        error = str(e)
+    result = RunResult(elapsed=time.perf_counter() - started, error=error)
+
+    trace = crew.run_trace
+    for span in trace.spans if trace else []:
+        if span.kind == "task":
+            result.task_durations[span.name] = span.duration
+        elif span.kind == "tool":
+            result.tool_calls[span.name] = result.tool_calls.get(span.name, 0) + 1
+        elif span.kind == "llm":
+            result.llm_calls += 1
+    return result
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (0 where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class BenchmarkReport:
+    stage: str
+    runs: int
+    concurrency: int
+    failures: int
+    latency_p50: float
+    latency_p95: float
+    latency_max: float
+    throughput: float
+    peak_rss_mb: float
+    tool_calls: float
+    llm_calls: float
+    tool_calls_by_name: Dict[str, float] = field(default_factory=dict)
+    task_p50: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.runs} {self.stage} runs, {self.concurrency} concurrent, {self.failures} failed",
+            f"  latency p50 {self.latency_p50:.3f}s  p95 {self.latency_p95:.3f}s  max {self.latency_max:.3f}s",
+            f"  throughput {self.throughput:.2f} runs/s, peak RSS {self.peak_rss_mb:.0f} MiB",
+            f"  per run: {self.tool_calls:.1f} tool calls, {self.llm_calls:.1f} LLM calls",
+        ]
+        lines += [f"    {name}: {count:.1f}" for name, count in sorted(self.tool_calls_by_name.items())]
+        lines += [f"  {name}: p50 {duration:.3f}s" for name, duration in self.task_p50.items()]
+        return "\n".join(lines)
+
+
+def run_benchmark(
+    fixtures: Fixtures,
+    runs: int = DEFAULT_RUNS,
+    concurrency: int = 1,
+    stage: str = "full",
+    output_root: Optional[str] = None,
+) -> BenchmarkReport:
+    """Replays the fixtures ``runs`` times with ``concurrency`` runs at once.
+
+    One untimed warm-up run first builds the resume index and imports
+    everything, so the measured runs reflect steady-state serving.
+    """
+    output_root = output_root or tempfile.mkdtemp(prefix="aijobhunter-benchmark-")
+    warmup = run_once(fixtures, stage, os.path.join(output_root, "warmup"))
+    if warmup.error:
+        raise RuntimeError(f"Warm-up run failed: {warmup.error}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="aijobhunter-bench") as executor:
+        results = list(executor.map(
+            lambda i: run_once(fixtures, stage, os.path.join(output_root, str(i))), range(runs)
+        ))
+    wall_time = time.perf_counter() - started
+
+    latencies = np.array([r.elapsed for r in results])
+    tool_names = {name for r in results for name in r.tool_calls}
+    task_names = list(dict.fromkeys(name for r in results for name in r.task_durations))
+    return BenchmarkReport(
+        stage=stage,
+        runs=runs,
+        concurrency=concurrency,
+        failures=sum(1 for r in results if r.error),
+        latency_p50=float(np.percentile(latencies, 50)),
+        latency_p95=float(np.percentile(latencies, 95)),
+        latency_max=float(latencies.max()),
+        throughput=runs / wall_time,
+        peak_rss_mb=peak_rss_mb(),
+        tool_calls=float(np.mean([sum(r.tool_calls.values()) for r in results])),
+        llm_calls=float(np.mean([r.llm_calls for r in results])),
+        tool_calls_by_name={
+            name: float(np.mean([r.tool_calls.get(name, 0) for r in results])) for name in tool_names
+        },
+        task_p50={
+            name: float(np.percentile([r.task_durations[name] for r in results if name in r.task_durations], 50))
+            for name in task_names
+        },
+    )
+
+
+# Metric name and whether a higher value is worse.
+REGRESSION_CHECKS = (
+    ("latency_p50", True),
+    ("latency_p95", True),
+    ("throughput", False),
+    ("peak_rss_mb", True),
+    ("tool_calls", True),
+    ("llm_calls", True),
+)
+
+
+def find_regressions(report: BenchmarkReport, baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Returns a message for every metric more than ``tolerance`` worse than the baseline."""
+    current = asdict(report)
+    regressions = []
+    for name, higher_is_worse in REGRESSION_CHECKS:
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        change = (current[name] - expected) / expected
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(f"{name}: {current[name]:.3f} vs baseline {expected:.3f} ({change:+.0%})")
+    return regressions
+
+
+def record(fixture_path: str, inputs: Dict[str, Any], resume_path: str, stage: str = "full") -> Fixtures:
+    """Runs the crew once against the real services and saves the fixtures."""
+    fixtures = Fixtures(inputs=inputs, resume_path=resume_path)
+    with stand_ins(fixtures, record=True):
+        result = run_once(fixtures, stage)
+    if result.error:
+        raise RuntimeError(f"Recording run failed: {result.error}")
+    fixtures.save(fixture_path)
+    logger.info(
+        f"Recorded {len(fixtures.completions)} completions and {len(fixtures.http)} "
+        f"HTTP responses to {fixture_path}"
+    )
+    return fixtures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns a non-zero status on failures or regressions."""
+    parser = argparse.ArgumentParser(prog="benchmark", description="Offline crew benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record fixtures from a live run")
+    record_parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    record_parser.add_argument("--stage", choices=("full", "profile"), default="full")
+    record_parser.add_argument("--resume")
+    record_parser.add_argument("--job-posting-url")
+    record_parser.add_argument("--github-url")
+
+    run_parser = commands.add_parser("run", help="replay fixtures and report performance")
+    run_parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    run_parser.add_argument("--stage", choices=("full", "profile"), default="full")
+    run_parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    run_parser.add_argument("--concurrency", type=int, default=1)
+    run_parser.add_argument("--latency-scale", type=float, default=0.0,
+                            help="replay recorded model/HTTP latency scaled by this factor")
+    run_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    run_parser.add_argument("--save-baseline", action="store_true")
+
+    args = parser.parse_args(argv)
+    prepare_environment(tempfile.mkdtemp(prefix="aijobhunter-benchmark-"), replay=args.command == "run")
+    configure_logging()
+
+    if args.command == "record":
+        from aijobhunter.main import RESUME_PATH, job_application_inputs
+
+        inputs = dict(job_application_inputs)
+        if args.job_posting_url:
+            inputs["job_posting_url"] = args.job_posting_url
+        if args.github_url:
+            inputs["github_url"] = args.github_url
+        record(args.fixture, inputs, args.resume or RESUME_PATH, args.stage)
+        return 0
+
+    fixtures = Fixtures.load(args.fixture)
+    with stand_ins(fixtures, latency_scale=args.latency_scale):
+        report = run_benchmark(fixtures, runs=args.runs, concurrency=args.concurrency, stage=args.stage)
+    print(report.summary())
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(asdict(report), f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0 if not report.failures else 1
+
+    status = 1 if report.failures else 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        status = status or (1 if regressions else 0)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
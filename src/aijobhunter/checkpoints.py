@@ -0,0 +1,345 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are not leased.
+    fcntl = None
+
+from aijobhunter.utils import Environment, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_TTL = 7 * 24 * 3600
+# Expired runs are deleted at most this often, when a run starts.
+PRUNE_INTERVAL = 3600
+# Inputs that identify an application across edits of the resume or posting.
+APPLICATION_INPUTS = ("github_url", "job_posting_url")
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def task_fingerprint(description: str, expected_output: str, context: str, *inputs: str) -> str:
+    """Identifies what a task was asked: its prompt and the outputs it built on.
+
+    ``inputs`` adds what the task reads through its tools, such as the resume.
+    A checkpoint is only reused for the same fingerprint, so a task reruns as
+    soon as its prompt or any upstream output differs.
+    """
+    digest = hashlib.sha256()
+    for part in (description, expected_output, context, *inputs):
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class TaskCheckpoint:
+    task: str
+    fingerprint: str
+    raw: str
+    agent: str
+    completed_at: float
+    # Digest of each input the output was produced from, by input name.
+    components: Dict[str, str] = field(default_factory=dict)
+
+
+class RunCheckpoints:
+    """Task outputs of one run, saved as each task completes.
+
+    Lives in ``<root>/<run key>/``: ``run.json`` holds the inputs, resume path
+    and status, and every completed task adds ``<task name>.json``. A run
+    that writes to the directory holds its lease, an exclusive lock on the
+    ``lease`` file, so two runs with the same inputs never write at once.
+    """
+
+    def __init__(self, key: str, directory: str, ttl: float):
+        self.key = key
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lease: Optional[IO] = None
+
+    def acquire(self) -> bool:
+        """Takes the run's lease. Returns False if another run holds it."""
+        if fcntl is None or self._lease is not None:
+            return True
+        handle = open(os.path.join(self.directory, "lease"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lease = handle
+        return True
+
+    def release(self) -> None:
+        if self._lease is not None:
+            self._lease.close()
+            self._lease = None
+
+    def __del__(self):
+        self.release()
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "run.json")
+
+    def _task_path(self, task_name: str) -> str:
+        return os.path.join(self.directory, f"{task_name}.json")
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return _read_json(self._meta_path()) or {}
+
+    @property
+    def inputs(self) -> Dict[str, Any]:
+        return self.meta.get("inputs", {})
+
+    @property
+    def file_path(self) -> Optional[str]:
+        return self.meta.get("file_path")
+
+    @property
+    def status(self) -> Optional[str]:
+        return self.meta.get("status")
+
+    def mark(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            meta = self.meta
+            meta.update(status=status, error=error, updated_at=time.time())
+            _write_json(self._meta_path(), meta)
+
+    def load(self, task_name: str, fingerprint: str) -> Optional[TaskCheckpoint]:
+        """Returns the task's saved output if it was produced from the same inputs and is fresh."""
+        data = _read_json(self._task_path(task_name))
+        if data is None:
+            return None
+        checkpoint = TaskCheckpoint(**data)
+        if checkpoint.fingerprint != fingerprint or time.time() - checkpoint.completed_at > self.ttl:
+            return None
+        return checkpoint
+
+    def latest(self, task_name: str) -> Optional[TaskCheckpoint]:
+        """Returns the task's saved output if it is fresh, whatever inputs it came from."""
+        data = _read_json(self._task_path(task_name))
+        if data is None:
+            return None
+        checkpoint = TaskCheckpoint(**data)
+        if time.time() - checkpoint.completed_at > self.ttl:
+            return None
+        return checkpoint
+
+    def save(self, task_name: str, fingerprint: str, raw: str, agent: str,
+             components: Optional[Dict[str, str]] = None) -> None:
+        checkpoint = TaskCheckpoint(task_name, fingerprint, raw, agent, time.time(), components or {})
+        _write_json(self._task_path(task_name), asdict(checkpoint))
+
+    def completed_tasks(self) -> List[str]:
+        return sorted(
+            name[:-len(".json")] for name in os.listdir(self.directory)
+            if name.endswith(".json") and name != "run.json"
+        )
+
+    def discard(self, task_name: str) -> bool:
+        """Forgets a task's output so the next run executes it again."""
+        try:
+            os.remove(self._task_path(task_name))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class CheckpointStore:
+    """Run checkpoints on disk, keyed by the run's inputs and resume.
+
+    Starting a run whose inputs and resume match an earlier one reopens that
+    run's checkpoints, so a failed or interrupted run picks up after its last
+    completed task and no finished stage is paid for twice. Checkpoints older
+    than ``AIJOBHUNTER_CHECKPOINT_TTL`` seconds (default a week) are ignored,
+    and runs not updated for that long are deleted.
+
+    Runs of the same application (resume file, GitHub profile and posting
+    URL) are listed in ``<root>/applications/<application key>.json``, so
+    the previous run of an application is found without reading every run.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl: Optional[float] = None):
+        self._root = root
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = get_cache_dir("checkpoints")
+        return self._root
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return float(Environment.get_env_variable("AIJOBHUNTER_CHECKPOINT_TTL", str(DEFAULT_CHECKPOINT_TTL)))
+
+    @staticmethod
+    def run_key(inputs: Dict[str, Any], file_path: str) -> str:
+        """Derives the run key from the inputs and the resume's content."""
+        from aijobhunter.tools.resume_index import file_sha256
+
+        digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(file_sha256(file_path).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def get(self, key: str) -> Optional[RunCheckpoints]:
+        directory = os.path.join(self.root, key)
+        if not os.path.exists(os.path.join(directory, "run.json")):
+            return None
+        return RunCheckpoints(key, directory, self.ttl)
+
+    @staticmethod
+    def application_key(inputs: Dict[str, Any], file_path: str) -> str:
+        raw = json.dumps([os.path.abspath(file_path)] + [inputs.get(name) for name in APPLICATION_INPUTS], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _application_path(self, application: str) -> str:
+        directory = os.path.join(self.root, "applications")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{application}.json")
+
+    def _read_application(self, application: str) -> Dict[str, Any]:
+        return _read_json(self._application_path(application)) or {"file_path": None, "runs": {}}
+
+    def previous(self, run: RunCheckpoints) -> Optional[RunCheckpoints]:
+        """Finds the latest other run of the same application.
+
+        That is a run with the same resume file, GitHub profile and posting
+        URL whose resume or inputs have since been edited, e.g. after a
+        change to the CV. Its outputs can be reused where nothing changed.
+        """
+        runs = self._read_application(self.application_key(run.inputs, run.file_path))["runs"]
+        now = time.time()
+        for key, updated_at in sorted(runs.items(), key=lambda item: item[1], reverse=True):
+            if now - updated_at > self.ttl:
+                break
+            other = self.get(key) if key != run.key else None
+            if other is not None:
+                return other
+        return None
+
+    def start(self, inputs: Dict[str, Any], file_path: str) -> Optional[RunCheckpoints]:
+        """Opens the checkpoints of the run for these inputs, creating them if new.
+
+        Returns None if another run with the same inputs is in progress and
+        holds them; the caller then runs without checkpoints.
+        """
+        self._prune_if_due()
+        key = self.run_key(inputs, file_path)
+        directory = os.path.join(self.root, key)
+        run = RunCheckpoints(key, directory, self.ttl)
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            if not run.acquire():
+                logger.warning(f"Run {key} is already in progress elsewhere; running without checkpoints")
+                return None
+            completed = run.completed_tasks()
+            if completed:
+                logger.info(f"Run {key} has checkpoints of {', '.join(completed)}")
+            now = time.time()
+            _write_json(run._meta_path(), {
+                **run.meta,
+                "inputs": inputs,
+                "file_path": os.path.abspath(file_path),
+                "status": "running",
+                "error": None,
+                "updated_at": now,
+            })
+            application = self.application_key(inputs, file_path)
+            index = self._read_application(application)
+            index["file_path"] = os.path.abspath(file_path)
+            index["runs"][key] = now
+            _write_json(self._application_path(application), index)
+        return run
+
+    def forget(self, file_path: str) -> int:
+        """Deletes every run of a resume file, e.g. when its owner is removed. Returns how many."""
+        path = os.path.abspath(file_path)
+        directory = os.path.join(self.root, "applications")
+        removed = 0
+        with self._lock:
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                index = _read_json(os.path.join(directory, name))
+                if index is None or index.get("file_path") != path:
+                    continue
+                for key in index["runs"]:
+                    run = self.get(key)
+                    if run is not None:
+                        shutil.rmtree(run.directory, ignore_errors=True)
+                        removed += 1
+                os.remove(os.path.join(directory, name))
+        return removed
+
+    def _prune_if_due(self) -> None:
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + PRUNE_INTERVAL
+        try:
+            self.prune()
+        except OSError as e:
+            logger.warning(f"Could not prune checkpoints: {e}")
+
+    def prune(self) -> int:
+        """Deletes runs not updated within the TTL, except ones in progress. Returns how many."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        with self._lock:
+            for key in os.listdir(self.root):
+                run = self.get(key)
+                if run is None or run.meta.get("updated_at", 0.0) > cutoff or not run.acquire():
+                    continue
+                run.release()
+                shutil.rmtree(run.directory, ignore_errors=True)
+                removed += 1
+            self._prune_applications(cutoff)
+        if removed:
+            logger.info(f"Pruned {removed} expired checkpointed runs")
+        return removed
+
+    def _prune_applications(self, cutoff: float) -> None:
+        directory = os.path.join(self.root, "applications")
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            index = _read_json(path)
+            if not name.endswith(".json") or index is None:
+                continue
+            runs = {key: at for key, at in index["runs"].items() if at > cutoff and self.get(key) is not None}
+            if not runs:
+                os.remove(path)
+            elif runs != index["runs"]:
+                _write_json(path, {**index, "runs": runs})
+
+
+checkpoint_store = CheckpointStore()
@@ -0,0 +1,296 @@
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set, Tuple
+
+from aijobhunter.tracing import metrics
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in characters for English prose; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+# Shares of the model's context window given to the outputs of upstream
+# tasks and to a single scraped page; the rest is left for the task prompt,
+# the resume, the agent's own turns and the answer.
+CONTEXT_SHARE = 0.25
+TOOL_SHARE = 0.15
+# Window assumed for a model whose backend does not declare one.
+DEFAULT_CONTEXT_WINDOW = 8192
+MIN_PARTIAL_LINE_TOKENS = 20
+
+# Lines of a job board page that are not part of the posting.
+_BOILERPLATE_LINE = re.compile(
+    r"^(?:apply(?: now| for this (?:job|position|role))?|easy apply|sign in|log in|sign up|join now|register"
+    r"|share(?: this (?:job|position|role))?|save(?: this)?(?: job)?|report(?: this)? job|back to (?:jobs|search)"
+    r"|skip to (?:main )?content|show more|see more|show less|see less|view all jobs|accept(?: all)?(?: cookies)?"
+    r"|reject(?: all)?|manage (?:cookies|preferences)|.*\bcookies?\b.*|.*privacy policy.*|.*terms of (?:use|service).*"
+    r"|.*all rights reserved.*|\W*)\W*$",
+    re.IGNORECASE,
+)
+# Headings of page sections that are about other jobs or the site itself;
+# they are dropped with everything up to the next heading.
+_UNRELATED_SECTIONS = re.compile(
+    r"^(?:similar|related|recommended|more|other) jobs\b|^people (?:also|who) (?:viewed|searched)"
+    r"|^jobs you may\b|^(?:more )?jobs (?:at|from|like this)\b|^explore (?:more )?jobs\b",
+    re.IGNORECASE,
+)
+# Headings of posting sections about the role itself.
+_ROLE_SECTIONS = re.compile(
+    r"^(?:about (?:the|this) (?:role|job|position|opportunity)|(?:the )?role\b|job (?:description|summary|details)"
+    r"|description|overview|summary|(?:key |main )?responsibilities|what you(?:'|\u2019)?ll (?:do|bring|need)"
+    r"|what we(?:'|\u2019)?re looking for|who you are|you (?:have|bring|are)\b|requirements|(?:minimum |basic |preferred "
+    r"|required )?qualifications|skills\b|experience\b|nice to have|bonus points|location|salary|compensation|pay\b)",
+    re.IGNORECASE,
+)
+# Headings of posting sections about the employer rather than the role,
+# which are dropped first when the page is over budget.
+_EMPLOYER_SECTIONS = re.compile(
+    r"^(?:about (?:us|the company|the employer)|who we are|our (?:story|mission|values|culture)|why (?:join|work)\b"
+    r"|(?:benefits|perks)\b|what we offer|equal (?:employment )?opportunity|eeo\b|diversity\b)",
+    re.IGNORECASE,
+)
+# Page numbers in a PDF's running header or footer, e.g. "2", "- 2 -" or "Page 2 of 3".
+_PAGE_NUMBER_LINE = re.compile(r"^\W*(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?\W*$", re.IGNORECASE)
+MAX_SECTION_HEADING_LENGTH = 60
+# Longer lines hold posting text even when they mention cookies or terms.
+MAX_BOILERPLATE_LINE_LENGTH = 160
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def budgets_for(context_window: Optional[int]) -> Tuple[int, int]:
+    """Returns the (context, tool output) token budgets for a model with ``context_window``.
+
+    ``AIJOBHUNTER_CONTEXT_TOKEN_BUDGET`` and ``AIJOBHUNTER_TOOL_TOKEN_BUDGET``
+    override the shares of the window; ``0`` disables compaction of that kind.
+    """
+    window = context_window or DEFAULT_CONTEXT_WINDOW
+    context_budget = int(Environment.get_env_variable(
+        "AIJOBHUNTER_CONTEXT_TOKEN_BUDGET", str(int(window * CONTEXT_SHARE))))
+    tool_budget = int(Environment.get_env_variable("AIJOBHUNTER_TOOL_TOKEN_BUDGET", str(int(window * TOOL_SHARE))))
+    return context_budget, tool_budget
+
+
+_current = threading.local()
+
+
+@contextmanager
+def bind_context_window(context_window: Optional[int]) -> Iterator[None]:
+    """Makes tool outputs in the current thread fit the budget of a model with ``context_window``."""
+    previous = getattr(_current, "context_window", None)
+    _current.context_window = context_window
+    try:
+        yield
+    finally:
+        _current.context_window = previous
+
+
+def current_context_window() -> Optional[int]:
+    return getattr(_current, "context_window", None)
+
+
+@dataclass
+class Compaction:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _line_key(line: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", line.lower()).strip()
+
+
+def _dedupe_lines(text: str, seen: Set[str]) -> List[str]:
+    """Drops blank runs and lines already in ``seen``, which it extends.
+
+    Short lines such as headings or list markers are kept, as repeating them
+    costs little and dropping them breaks the structure of the text.
+    """
+    lines: List[str] = []
+    for raw_line in text.splitlines():
+        line = raw_line.rstrip()
+        if not line.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        key = _line_key(line)
+        if len(key) >= 20:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _truncate_lines(lines: List[str], budget: int) -> List[str]:
+    """Keeps lines from the start until ``budget`` tokens are used.
+
+    The first line that does not fit is cut rather than dropped when enough
+    budget is left, since scraped pages often flatten into a few long lines.
+    """
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            room = budget - used - 1
+            if room >= MIN_PARTIAL_LINE_TOKENS:
+                kept.append(line[:room * CHARS_PER_TOKEN] + "...")
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    if omitted:
+        kept.append(f"[... {omitted} more lines omitted to fit the context budget]")
+    return kept
+
+
+def _share_budget(sizes: List[int], budget: int) -> List[int]:
+    """Splits ``budget`` evenly, handing what small parts leave over to larger ones."""
+    shares = [0] * len(sizes)
+    remaining = list(range(len(sizes)))
+    left = budget
+    while remaining and left > 0:
+        share = left // len(remaining)
+        small = [i for i in remaining if sizes[i] <= share]
+        if not small:
+            for i in remaining:
+                shares[i] = share
+            break
+        for i in small:
+            shares[i] = sizes[i]
+            left -= sizes[i]
+            remaining.remove(i)
+    return shares
+
+
+def compact_parts(parts: List[str], budget: int, separator: str) -> Compaction:
+    """Deduplicates lines across ``parts`` and fits them into ``budget`` tokens.
+
+    Lines repeated from an earlier part are dropped. If the parts are still
+    too large, every part keeps its beginning, and the budget is shared so
+    that no part is squeezed out by a long one. A budget of 0 returns the
+    parts unchanged.
+    """
+    original = separator.join(parts)
+    tokens_before = estimate_tokens(original)
+    if budget <= 0:
+        return Compaction(original, tokens_before, tokens_before)
+
+    seen: Set[str] = set()
+    deduped = [_dedupe_lines(part, seen) for part in parts]
+    sizes = [sum(estimate_tokens(line) + 1 for line in lines) for lines in deduped]
+    overhead = estimate_tokens(separator) * max(len(parts) - 1, 0)
+    if sum(sizes) + overhead > budget:
+        shares = _share_budget(sizes, max(budget - overhead, 0))
+        deduped = [_truncate_lines(lines, share) for lines, share in zip(deduped, shares)]
+    text = separator.join("\n".join(lines) for lines in deduped)
+    return Compaction(text, tokens_before, estimate_tokens(text))
+
+
+def _record(stage: str, result: Compaction) -> None:
+    if result.tokens_saved > 0:
+        metrics.inc("aijobhunter_compaction_tokens_saved_total",
+                    "Prompt tokens removed by context compaction, by stage.", {"stage": stage}, result.tokens_saved)
+        logger.debug(f"Compacted {stage}: {result.tokens_before} -> {result.tokens_after} tokens")
+
+
+def compact_context(outputs: List[str], context_window: Optional[int], separator: str) -> Compaction:
+    """Fits the outputs of upstream tasks into the task context budget of a model with ``context_window``."""
+    result = compact_parts(outputs, budgets_for(context_window)[0], separator)
+    _record("task_context", result)
+    return result
+
+
+def _is_boilerplate(line: str) -> bool:
+    stripped = line.strip()
+    return len(stripped) <= MAX_BOILERPLATE_LINE_LENGTH and bool(_BOILERPLATE_LINE.match(stripped))
+
+
+def _section_of(line: str) -> Optional[str]:
+    """Returns ``role``, ``employer`` or ``unrelated`` if ``line`` is a posting section heading."""
+    heading = line.strip().strip("#*:- \t")
+    if not heading or len(heading) > MAX_SECTION_HEADING_LENGTH:
+        return None
+    for kind, pattern in (("unrelated", _UNRELATED_SECTIONS), ("employer", _EMPLOYER_SECTIONS),
+                          ("role", _ROLE_SECTIONS)):
+        if pattern.match(heading):
+            return kind
+    return None
+
+
+def _page_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Splits page lines at posting section headings into ``(kind, lines)`` pairs."""
+    sections: List[Tuple[str, List[str]]] = [("role", [])]
+    for line in lines:
+        kind = _section_of(line)
+        if kind is not None:
+            sections.append((kind, []))
+        sections[-1][1].append(line)
+    return [(kind, lines) for kind, lines in sections if lines]
+
+
+def compact_page(tool: str, text: str) -> str:
+    """Fits a scraped page into the tool budget of the model currently reading it.
+
+    Navigation, cookie and sharing lines and repeated lines are dropped, as
+    are sections listing other jobs. If the page is still over budget, the
+    sections about the employer (benefits, values, equal opportunity
+    statements) go next, and only then is every remaining section cut to a
+    share of the budget, so the requirements at the end of a long posting
+    are never lost.
+    """
+    if not isinstance(text, str):
+        return text
+    budget = budgets_for(current_context_window())[1]
+    if budget <= 0:
+        return text
+
+    lines = _dedupe_lines("\n".join(line for line in text.splitlines() if not _is_boilerplate(line)), set())
+    sections = [(kind, lines) for kind, lines in _page_sections(lines) if kind != "unrelated"]
+    if sum(estimate_tokens(line) + 1 for _, lines in sections for line in lines) > budget:
+        omitted = [lines[0].strip() for kind, lines in sections if kind == "employer"]
+        sections = [(kind, lines) for kind, lines in sections if kind != "employer"]
+        if omitted:
+            sections.append(("note", [f"[... sections omitted to fit the context budget: {', '.join(omitted)}]"]))
+    result = compact_parts(["\n".join(lines) for _, lines in sections], budget, "\n")
+    result = Compaction(result.text, estimate_tokens(text), result.tokens_after)
+    _record(tool, result)
+    return result.text
+
+
+def compact_document(tool: str, pages: List[str]) -> List[str]:
+    """Trims the pages of a document such as the resume to what it says once.
+
+    When the pages are over the tool budget of the model currently reading
+    them, page numbers and lines repeated from earlier in the document are
+    dropped. Nothing else is, however far over budget the document remains:
+    every section of the resume may matter to the task.
+    """
+    budget = budgets_for(current_context_window())[1]
+    tokens_before = sum(estimate_tokens(page) + 1 for page in pages)
+    if budget <= 0 or tokens_before <= budget:
+        return pages
+
+    seen: Set[str] = set()
+    compacted = [
+        "\n".join(_dedupe_lines(
+            "\n".join(line for line in page.splitlines() if not _PAGE_NUMBER_LINE.match(line.strip())), seen
+        ))
+        for page in pages
+    ]
+    text = "\n".join(compacted)
+    _record(tool, Compaction(text, tokens_before, estimate_tokens(text)))
+    return compacted
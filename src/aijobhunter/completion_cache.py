@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from aijobhunter.utils import Environment, get_cache_dir
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_SIMILARITY_THRESHOLD = 0.97
+# Completions unused for this many seconds expire. Prompts carry resume text,
+# so cached answers should not outlive the resumes they were made from for long.
+DEFAULT_TTL = 7 * 24 * 3600
+# URLs identify the posting, profile or resume a prompt is about. A similar
+# prompt about another URL must never share its completion.
+_IDENTIFIER = re.compile(r"https?://[^\s'\"<>()\[\]]+")
+
+
+@dataclass
+class CacheStats:
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return (self.exact_hits + self.semantic_hits) / total if total else 0.0
+
+
+class CompletionCache:
+    """SQLite-backed cache of LLM completions.
+
+    Entries are grouped into namespaces (model, sampling params and the earlier
+    messages of the conversation) and looked up by an exact key on the prompt.
+    When an ``embed`` function is given, a miss falls back to a similarity
+    search over prompts in the same namespace that name the same URLs, and a
+    cached completion is reused if its cosine similarity is at least
+    ``similarity_threshold``. Entries unused for ``ttl`` seconds expire, and
+    the least recently used entries are evicted once more than
+    ``max_entries`` are stored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        ttl: float = DEFAULT_TTL,
+    ):
+        """Initializes the CompletionCache.
+
+        Args:
+            path (str): SQLite database file.
+            max_entries (int): Maximum number of stored completions.
+            embed (Optional[Callable]): Text embedding function enabling
+                near-duplicate lookups. Exact matching only when omitted.
+            similarity_threshold (float): Minimum cosine similarity for a
+                near-duplicate hit.
+            ttl (float): Seconds an unused completion is kept; 0 keeps it
+                until it is evicted.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                embedding BLOB,
+                response TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_namespace ON completions(namespace)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_namespace(params: Dict[str, Any]) -> str:
+        raw = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def similarity_scope(namespace: str, prompt: str) -> str:
+        """The namespace narrowed to the URLs the prompt names, for similarity lookups."""
+        identifiers = sorted({url.rstrip(".,;:!?") for url in _IDENTIFIER.findall(prompt)})
+        if not identifiers:
+            return namespace
+        return CompletionCache.make_namespace({"namespace": namespace, "identifiers": identifiers})
+
+    @staticmethod
+    def make_key(namespace: str, prompt: str) -> str:
+        return hashlib.sha256(f"{namespace}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, prompt: str) -> Optional[str]:
+        """Returns the cached completion for a prompt, or None on a miss."""
+        return self.lookup(namespace, prompt)[0]
+
+    def lookup(self, namespace: str, prompt: str) -> Tuple[Optional[str], str]:
+        """Like ``get``, but also says how the lookup was answered.
+
+        Returns:
+            Tuple[Optional[str], str]: The completion or None, and one of
+                ``"exact"``, ``"semantic"`` or ``"miss"``.
+        """
+        return self.lookup_any([namespace], prompt)
+
+    def lookup_any(self, namespaces: List[str], prompt: str) -> Tuple[Optional[str], str]:
+        """Like ``lookup``, over several namespaces in order of preference.
+
+        An exact hit in any namespace beats a similar prompt in the first one.
+        The lookup counts as one hit or miss.
+        """
+        with self._lock:
+            for namespace in namespaces:
+                key = self.make_key(namespace, prompt)
+                row = self._conn.execute(
+                    "SELECT response FROM completions WHERE key = ? AND last_used >= ?",
+                    (key, self._expired_before()),
+                ).fetchone()
+                if row is not None:
+                    self._touch(key)
+                    self.stats.exact_hits += 1
+                    return row[0], "exact"
+
+        if self.embed is not None:
+            for namespace in namespaces:
+                response = self._get_similar(self.similarity_scope(namespace, prompt), prompt)
+                if response is not None:
+                    return response, "semantic"
+
+        with self._lock:
+            self.stats.misses += 1
+        return None, "miss"
+
+    def _get_similar(self, scope: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, embedding, response FROM completions "
+                "WHERE namespace = ? AND embedding IS NOT NULL AND last_used >= ?",
+                (scope, self._expired_before()),
+            ).fetchall()
+        if not rows:
+            return None
+
+        query = np.asarray(self.embed(prompt), dtype=np.float32)
+        matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            self._touch(rows[best][0])
+            self.stats.semantic_hits += 1
+        return rows[best][2]
+
+    def put(self, namespace: str, prompt: str, response: str) -> None:
+        embedding = None
+        if self.embed is not None:
+            embedding = np.asarray(self.embed(prompt), dtype=np.float32).tobytes()
+        key = self.make_key(namespace, prompt)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.similarity_scope(namespace, prompt), prompt, embedding, response, time.time()),
+            )
+            self._conn.execute("DELETE FROM completions WHERE last_used < ?", (self._expired_before(),))
+            self._conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                "SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def _expired_before(self) -> float:
+        return time.time() - self.ttl if self.ttl > 0 else 0.0
+
+    def _touch(self, key: str) -> None:
+        self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Returns the process-wide completion cache configured from the environment.
+
+    ``AIJOBHUNTER_LLM_CACHE=0`` disables it, ``AIJOBHUNTER_LLM_CACHE_MAX_ENTRIES``
+    bounds its size, ``AIJOBHUNTER_LLM_CACHE_TTL`` sets how long unused
+    completions are kept and ``AIJOBHUNTER_LLM_CACHE_SEMANTIC_MODEL`` names a
+    HuggingFace embedding model that enables near-duplicate lookups.
+    """
+    global _completion_cache
+    if Environment.get_env_variable("AIJOBHUNTER_LLM_CACHE", "1") == "0":
+        return None
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                embed = None
+                model_name = Environment.get_env_variable("AIJOBHUNTER_LLM_CACHE_SEMANTIC_MODEL")
+                if model_name:
+                    from aijobhunter.tools.resume_index import get_embedder
+
+                    embed = lambda text: get_embedder(model_name).embed_query(text)
+                _completion_cache = CompletionCache(
+                    os.path.join(get_cache_dir("llm"), "completions.sqlite3"),
+                    max_entries=int(Environment.get_env_variable(
+                        "AIJOBHUNTER_LLM_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)
+                    )),
+                    embed=embed,
+                    ttl=float(Environment.get_env_variable("AIJOBHUNTER_LLM_CACHE_TTL", str(DEFAULT_TTL))),
+                )
+    return _completion_cache
@@ -1,28 +1,98 @@
-from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool, PDFSearchTool
-from aijobhunter.tools.pdf_content_reader import PDFContentReader
+from crewai import Agent, Crew, Process, Task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
+from aijobhunter.checkpoints import checkpoint_store
+from aijobhunter.incremental import digest, posting_components, resume_components
+from aijobhunter.job_parser import fetch_job_requirements
+from aijobhunter.llm_cache import CachedLLM, RoutedLLM
+from aijobhunter.llm_router import ModelRouter, load_routing_config
+from aijobhunter.matching import fetch_job_target, match_resume
+from aijobhunter.profile_cache import profile_store
+from aijobhunter.scheduler import DAGCrew, DEFAULT_MAX_PARALLEL_TASKS, TracedAgent
+from aijobhunter.utils import Environment
+from aijobhunter.tools.pool import tool_pool
+from aijobhunter.tools.resume_index import chunk_pdf
+import functools
+import logging
+import os
 import warnings
 
 warnings.filterwarnings("ignore")
 
-llm = LLM(
-    # model="groq/llama-3.3-70b-versatile",
-    model="ollama/qwen2.5:3b",
-    temperature=0.2,
-)
+logger = logging.getLogger(__name__)
 
-manager_llm = LLM(
-    model="groq/llama-3.3-70b-versatile",
-    temperature=0.2,
-)
+# The LLMs are only built when a crew first needs them, so importing this
+# module (the API, the CLI scripts) does not pay for it. They all run at
+# temperature 0, so their completions can be served from the completion cache.
+LLM_CONFIGS = {
+    "llm": dict(
+        temperature=0.0,
+    ),
+    "manager_llm": dict(
+        temperature=0.0,
+    ),
+    "function_calling_llm": dict(
+        temperature=0.0,
+        seed=71,
+    ),
+}
 
-function_calling_llm = LLM(
-    model="ollama/qwen2.5:3b",
-    # model="groq/qwen-2.5-32b",
-    temperature=0.0,
-    seed=71,
-)
+# Model endpoints the LLMs are routed across. A local Ollama serves few calls
+# at once; the Groq keys are rate limited rather than slow.
+LLM_BACKENDS = {
+    "ollama-qwen2.5-3b": dict(
+        model="ollama/qwen2.5:3b",
+        max_concurrency=int(Environment.get_env_variable("OLLAMA_NUM_PARALLEL", "2")),
+        context_window=32768,
+        latency=10.0,
+        timeout=180,
+    ),
+    "groq-llama-3.3-70b": dict(
+        model="groq/llama-3.3-70b-versatile",
+        max_concurrency=4,
+        context_window=128000,
+        latency=3.0,
+        timeout=60,
+    ),
+    "groq-qwen-2.5-32b": dict(
+        model="groq/qwen-2.5-32b",
+        max_concurrency=4,
+        context_window=128000,
+        latency=2.0,
+        timeout=60,
+    ),
+}
+
+# Backends each LLM may use, most preferred first. "<llm>:<task name>" routes
+# override the LLM's route for one task.
+LLM_ROUTES = {
+    "llm": ["ollama-qwen2.5-3b", "groq-qwen-2.5-32b", "groq-llama-3.3-70b"],
+    "manager_llm": ["groq-llama-3.3-70b", "groq-qwen-2.5-32b", "ollama-qwen2.5-3b"],
+    "function_calling_llm": ["ollama-qwen2.5-3b", "groq-qwen-2.5-32b"],
+    # The long written deliverables are worth the larger model.
+    "llm:resume_strategy_task": ["groq-llama-3.3-70b", "ollama-qwen2.5-3b"],
+    "llm:interview_preparation_task": ["groq-llama-3.3-70b", "ollama-qwen2.5-3b"],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_router():
+    """Returns the ModelRouter shared by all LLMs, built from the routing config."""
+    return ModelRouter.from_config(load_routing_config(LLM_BACKENDS, LLM_ROUTES))
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(name):
+    """Returns the shared LLM configured under ``name`` in ``LLM_CONFIGS``.
+
+    Its calls are routed across the backends of ``LLM_ROUTES[name]``; with
+    ``AIJOBHUNTER_LLM_ROUTING=0`` it always uses the route's first backend.
+    """
+    router = get_router()
+    if Environment.get_env_variable("AIJOBHUNTER_LLM_ROUTING", "1") == "0":
+        backend = router.primary(name)
+        return CachedLLM(model=backend.model, timeout=backend.timeout, context_window=backend.context_window,
+                         base_url=backend.base_url, api_key=backend.api_key, **LLM_CONFIGS[name])
+    return RoutedLLM(route=name, router=router, **LLM_CONFIGS[name])
 
 
 @CrewBase
@@ -32,86 +102,91 @@ class AIjobhunter:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
-    def __init__(self, file_path):
-        self.search_tool = SerperDevTool()
-        self.scrape_tool = ScrapeWebsiteTool()
-        self.read_resume = PDFContentReader(file_path)
-        self.semantic_search_job = PDFSearchTool(
-            pdf=file_path,
-            config=dict(
-                llm=dict(
-                    provider="groq",
-                    config=dict(
-                        model="qwen-2.5-32b",
-                        # model="groq/llama-3.3-70b-versatile",
-                    ),
-                ),
-                embedder=dict(
-                    provider="huggingface",
-                    config=dict(
-                        model="BAAI/bge-large-en-v1.5",
-                        # task_type="retrieval_document",
-                    ),
-                ),
-            ),
-        )
+    def __init__(self, file_path, output_dir=None, precomputed_outputs=None, checkpoints=True, incremental=True):
+        """
+        :param file_path: Path to the candidate's resume PDF.
+        :param output_dir: Directory for the task output files. Defaults to the working directory.
+        :param precomputed_outputs: Raw outputs by task name; those tasks are not executed.
+        :param checkpoints: Save each task's output and resume earlier runs with the same inputs.
+        :param incremental: Reuse what did not change since the last run of the same application.
+            Needs checkpoints.
+        """
+        self.file_path = file_path
+        self.output_dir = output_dir
+        self.precomputed_outputs = precomputed_outputs or {}
+        self.checkpoints = checkpoints
+        self.incremental = incremental
+        self._github_url = None
+        self.job_requirements = None
+        self.match_report = None
+        tools = tool_pool.get(file_path)
+        self.search_tool = tools.search_tool
+        self.scrape_tool = tools.scrape_tool
+        self.read_resume = tools.read_resume
+        self.semantic_search_job = tools.semantic_search_job
+
+    def _output_file(self, task_name):
+        output_file = self.tasks_config[task_name].get("output_file")
+        if output_file and self.output_dir:
+            return os.path.join(self.output_dir, output_file)
+        return output_file
 
     @agent
     def researcher(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["researcher"],
             verbose=True,
-            llm=llm,
+            llm=get_llm("llm"),
             tools=[
                 self.scrape_tool,
                 self.search_tool,
             ],
-            function_calling_llm=function_calling_llm,
+            function_calling_llm=get_llm("function_calling_llm"),
         )
 
     @agent
     def profiler(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["profiler"],
             verbose=True,
-            llm=llm,
+            llm=get_llm("llm"),
             tools=[
                 # self.search_tool,
                 self.scrape_tool,
                 self.read_resume,
                 self.semantic_search_job,
             ],
-            function_calling_llm=function_calling_llm,
+            function_calling_llm=get_llm("function_calling_llm"),
         )
 
     @agent
     def resume_strategist(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["resume_strategist"],
             verbose=True,
-            llm=llm,
+            llm=get_llm("llm"),
             tools=[
                 self.read_resume,
                 self.search_tool,
                 self.scrape_tool,
                 self.semantic_search_job,
             ],
-            function_calling_llm=function_calling_llm,
+            function_calling_llm=get_llm("function_calling_llm"),
         )
 
     @agent
     def interview_preparer(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["interview_preparer"],
             verbose=True,
-            llm=llm,
+            llm=get_llm("llm"),
             tools=[
                 self.search_tool,
                 self.scrape_tool,
                 self.read_resume,
                 self.semantic_search_job,
             ],
-            function_calling_llm=function_calling_llm,
+            function_calling_llm=get_llm("function_calling_llm"),
         )
 
     @task
@@ -127,6 +202,7 @@ class AIjobhunter:
         self.profile_task_instance = Task(
             config=self.tasks_config["profile_task"],
             async_execution=True,
+            callback=self.store_profile,
         )
         return self.profile_task_instance
 
@@ -134,6 +210,7 @@ class AIjobhunter:
     def resume_strategy_task(self) -> Task:
         self.resume_strategy_task_instance = Task(
             config=self.tasks_config["resume_strategy_task"],
+            output_file=self._output_file("resume_strategy_task"),
             context=[self.profile_task_instance, self.research_task_instance],
             # async_execution=True,
         )
@@ -143,6 +220,7 @@ class AIjobhunter:
     def interview_preparation_task(self) -> Task:
         self.interview_preparation_task_instance = Task(
             config=self.tasks_config["interview_preparation_task"],
+            output_file=self._output_file("interview_preparation_task"),
             context=[
                 self.resume_strategy_task_instance,
                 self.profile_task_instance,
@@ -152,15 +230,129 @@ class AIjobhunter:
         )
         return self.interview_preparation_task_instance
 
+    def profile_prompt(self):
+        return self.tasks_config["profile_task"]["description"]
+
+    def _remember_candidate(self, inputs):
+        self._github_url = (inputs or {}).get("github_url")
+        return inputs
+
+    def _is_incremental(self):
+        return self.incremental and Environment.get_env_variable("AIJOBHUNTER_INCREMENTAL", "1") != "0"
+
+    @before_kickoff
+    def open_checkpoints(self, inputs):
+        """Resumes an earlier run with the same inputs from its completed tasks."""
+        if self.checkpoints and Environment.get_env_variable("AIJOBHUNTER_CHECKPOINTS", "1") != "0":
+            run = checkpoint_store.start(dict(inputs or {}), self.file_path)
+            if run is None:
+                return inputs
+            previous = checkpoint_store.previous(run) if self._is_incremental() else None
+            if previous is not None:
+                logger.info(f"Reusing unchanged outputs of run {previous.key}")
+            self._crew.use_checkpoints(run, previous)
+        return inputs
+
+    @before_kickoff
+    def load_cached_profile(self, inputs):
+        """Skips the profiler when a fresh profile for this candidate is stored."""
+        self._remember_candidate(inputs)
+        if self._github_url and "profile_task" not in self._crew.precomputed_outputs:
+            artifact = profile_store.get(self._github_url, self.file_path, self.profile_prompt())
+            if artifact is not None:
+                self._crew.precomputed_outputs["profile_task"] = artifact.profile
+        return inputs
+
+    @before_kickoff
+    def parse_job_posting(self, inputs):
+        """Skips the researcher when the posting's requirements can be parsed directly."""
+        url = (inputs or {}).get("job_posting_url")
+        enabled = Environment.get_env_variable("AIJOBHUNTER_JOB_PARSER", "1") != "0"
+        if url and enabled and "research_task" not in self._crew.precomputed_outputs:
+            self.job_requirements = fetch_job_requirements(url)
+            if self.job_requirements is not None:
+                self._crew.precomputed_outputs["research_task"] = self.job_requirements.to_markdown()
+        return inputs
+
+    @before_kickoff
+    def match_resume_to_posting(self, inputs):
+        """Scores the resume against the posting for the resume strategist."""
+        inputs = dict(inputs or {})
+        url = inputs.get("job_posting_url")
+        enabled = Environment.get_env_variable("AIJOBHUNTER_MATCHING", "1") != "0"
+        self.match_report = None
+        if url and enabled:
+            try:
+                self.match_report = match_resume(self.file_path, url, self.job_requirements)
+            except Exception as e:
+                logger.warning(f"Could not match the resume to {url}: {e}")
+        inputs["match_report"] = self.match_report.to_markdown() if self.match_report else ""
+        return inputs
+
+    @before_kickoff
+    def track_input_changes(self, inputs):
+        """Records what the tasks read from the resume and the posting, to detect what changed."""
+        if self._crew.checkpoints is None or not self._is_incremental():
+            return inputs
+        resume = resume_components("\n".join(chunk_pdf(self.file_path)))
+        posting = {}
+        url = (inputs or {}).get("job_posting_url")
+        if self.job_requirements is not None:
+            posting = posting_components(self.job_requirements)
+        elif url:
+            # Unparsed pages are compared by their text lines, which ignores markup and scripts.
+            try:
+                posting = {"posting:page": digest([r.text for r in fetch_job_target(url).requirements])}
+            except Exception as e:
+                logger.warning(f"Could not fetch {url} to detect changes: {e}")
+        resume_tools = {self.read_resume.name, self.semantic_search_job.name}
+        components = {}
+        for task in self._crew.tasks:
+            parts = {}
+            if task.agent and any(tool.name in resume_tools for tool in task.agent.tools):
+                parts.update(resume)
+            reads_posting = task is self.research_task_instance or any(
+                upstream is self.research_task_instance for upstream in task.context or []
+            )
+            if reads_posting:
+                parts.update(posting)
+            components[task.name] = parts
+        self._crew.use_input_components(components)
+        self._crew.incremental_tasks = ["resume_strategy_task"]
+        return inputs
+
+    def store_profile(self, output):
+        if self._github_url:
+            profile_store.put(self._github_url, self.file_path, output.raw, self.profile_prompt())
+
     @crew
     def crew(self) -> Crew:
         """Creates the Aijobhunter crew"""
 
-        return Crew(
+        self._crew = DAGCrew(
             agents=self.agents,  # Automatically created by the @agent decorator
             tasks=self.tasks,  # Automatically created by the @task decorator
             process=Process.sequential,
+            # Tasks run as soon as their context tasks finish, up to this many at once
+            max_parallel_tasks=int(
+                Environment.get_env_variable(
+                    "AIJOBHUNTER_MAX_PARALLEL_TASKS", str(DEFAULT_MAX_PARALLEL_TASKS)
+                )
+            ),
+            precomputed_outputs=self.precomputed_outputs,
             verbose=True,
-            manager_llm=manager_llm,
+            manager_llm=get_llm("manager_llm"),
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+        return self._crew
+
+    def profile_crew(self) -> Crew:
+        """Creates a crew that only builds the candidate profile"""
+
+        return DAGCrew(
+            agents=[self.profiler()],
+            tasks=[self.profile_task()],
+            process=Process.sequential,
+            before_kickoff_callbacks=[self._remember_candidate],
+            verbose=True,
+        )
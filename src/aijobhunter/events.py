@@ -0,0 +1,188 @@
+import asyncio
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_TOKEN_EVENTS = 2000
+
+
+@dataclass
+class RunEvent:
+    id: int
+    event: str
+    data: Dict[str, Any]
+    timestamp: float = field(default_factory=time.time)
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.event}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class RunEventStream:
+    """Append-only event log of one crew run that several readers can follow.
+
+    Producers call ``emit`` from any thread; readers iterate ``follow``, or
+    ``follow_async`` on an event loop, which replay past events and then wait
+    for new ones until the stream is closed. ``token`` events are only worth
+    producing while someone reads them (see ``subscribers``); at most
+    ``max_token_events`` of them are kept, and they are dropped from the log
+    once the run is over, since the task outputs hold the same text.
+    """
+
+    def __init__(self, max_token_events: int = DEFAULT_MAX_TOKEN_EVENTS):
+        self.max_token_events = max_token_events
+        self._events: List[RunEvent] = []
+        self._next_id = 0
+        self._token_events = 0
+        self._condition = threading.Condition()
+        self._listeners: List[Callable[[], None]] = []
+        self.subscribers = 0
+        self.closed = False
+
+    def emit(self, event: str, **data: Any) -> None:
+        with self._condition:
+            if self.closed:
+                return
+            self._events.append(RunEvent(id=self._next_id, event=event, data=data))
+            self._next_id += 1
+            if event == "token":
+                self._token_events += 1
+                if self._token_events > self.max_token_events:
+                    self._drop_oldest_token()
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def _drop_oldest_token(self) -> None:
+        for i, event in enumerate(self._events):
+            if event.event == "token":
+                del self._events[i]
+                self._token_events -= 1
+                return
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._events = [event for event in self._events if event.event not in ("token", "token_reset")]
+            self._token_events = 0
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def _since(self, position: int) -> List[RunEvent]:
+        # Event ids increase but have gaps where token events were dropped.
+        index = bisect.bisect_left([event.id for event in self._events], position)
+        return self._events[index:]
+
+    @contextmanager
+    def _subscribed(self, listener: Optional[Callable[[], None]] = None) -> Iterator[None]:
+        with self._condition:
+            self.subscribers += 1
+            if listener is not None:
+                self._listeners.append(listener)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+                if listener is not None:
+                    self._listeners.remove(listener)
+
+    def follow(self, start: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[RunEvent]]:
+        """Yields events from id ``start`` until the stream is closed.
+
+        Yields ``None`` when no event arrived for ``heartbeat`` seconds so the
+        caller can keep idle connections alive.
+        """
+        position = start
+        with self._subscribed():
+            while True:
+                with self._condition:
+                    if not self._since(position) and not self.closed:
+                        self._condition.wait(timeout=heartbeat)
+                    batch = self._since(position)
+                    closed = self.closed
+                if batch:
+                    position = batch[-1].id + 1
+                    yield from batch
+                elif closed:
+                    return
+                else:
+                    yield None
+
+    async def follow_async(self, start: int = 0, heartbeat: float = 15.0) -> AsyncIterator[Optional[RunEvent]]:
+        """Like ``follow``, but waits on the event loop instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+
+        def notify() -> None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # The loop is gone; the reader is too.
+
+        position = start
+        with self._subscribed(notify):
+            while True:
+                wakeup.clear()
+                with self._condition:
+                    batch = self._since(position)
+                    closed = self.closed
+                if batch:
+                    position = batch[-1].id + 1
+                    for event in batch:
+                        yield event
+                    continue
+                if closed:
+                    return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+
+
+_current = threading.local()
+
+
+@contextmanager
+def bind_stream(stream: Optional[RunEventStream], task: Optional[str] = None):
+    """Makes ``stream`` the event stream of the current thread.
+
+    Code running in this thread (tasks, tools, LLM calls) reports progress to
+    it through ``emit``. Worker threads must bind the stream themselves. The
+    task is bound even without a stream, as LLM routing and tracing use it.
+    """
+    previous = getattr(_current, "binding", None)
+    _current.binding = (stream, task) if stream is not None or task is not None else None
+    try:
+        yield
+    finally:
+        _current.binding = previous
+
+
+def current_stream() -> Optional[RunEventStream]:
+    binding = getattr(_current, "binding", None)
+    return binding[0] if binding else None
+
+
+def streaming_tokens() -> bool:
+    """Whether anyone is reading the current thread's stream, so tokens are worth emitting."""
+    stream = current_stream()
+    return stream is not None and stream.subscribers > 0
+
+
+def current_task() -> Optional[str]:
+    binding = getattr(_current, "binding", None)
+    return binding[1] if binding else None
+
+
+def emit(event: str, **data: Any) -> None:
+    """Emits an event on the current thread's stream, if one is bound."""
+    stream = current_stream()
+    if stream is not None:
+        stream.emit(event, **data)
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Keywords that identify a resume section by its heading.
+SECTION_KEYWORDS = {
+    "summary": ("summary", "profile", "objective", "about"),
+    "experience": ("experience", "employment", "work history", "projects", "career"),
+    "skills": ("skills", "technologies", "competencies", "tech stack", "tools"),
+    "education": ("education", "certification", "courses", "academic"),
+}
+# Whole lines that head a section of a plain-text resume. PDF text has no
+# markup, so anything else, however short, is section content.
+RESUME_HEADINGS = {
+    "summary": (
+        "summary", "profile", "objective", "about", "about me", "professional summary", "career summary",
+        "professional profile", "career objective", "personal profile",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience", "employment",
+        "employment history", "work history", "career history", "projects", "personal projects",
+        "selected projects", "experience & projects", "experience and projects",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "skills & tools", "skills and tools",
+        "technologies", "competencies", "core competencies", "tech stack", "tools", "tools & technologies",
+        "tools and technologies",
+    ),
+    "education": (
+        "education", "certifications", "certificates", "courses", "education & certifications",
+        "education and certifications", "academic background",
+    ),
+}
+
+# Inputs each section of a tailored resume is written from. A change to any
+# other input (the task prompt, an unparsed posting, an unsectioned resume)
+# rewrites the whole resume. The profile summarises the whole resume and
+# GitHub account, so it changes with any edit of the resume; only the summary
+# is written from it, and the other sections follow their own resume section.
+SECTION_INPUTS = {
+    "header": ("resume:header",),
+    "summary": (
+        "resume:header", "resume:summary", "posting:title", "posting:company", "posting:location",
+        "posting:skills", "posting:qualifications", "posting:preferred_qualifications",
+        "posting:experience", "context:profile_task",
+    ),
+    "skills": ("resume:skills", "posting:skills", "posting:qualifications", "posting:preferred_qualifications"),
+    "experience": (
+        "resume:experience", "posting:skills", "posting:qualifications", "posting:experience",
+        "posting:responsibilities",
+    ),
+    "education": ("resume:education", "posting:qualifications"),
+    "other": ("resume:other",),
+}
+# Inputs derived from the posting and the resume. When the posting was
+# parsed, their changes are already covered by its fields.
+DERIVED_INPUTS = ("input:job_posting_url", "input:match_report", "context:research_task")
+
+POSTING_FIELDS = (
+    "title", "company", "location", "skills", "qualifications", "preferred_qualifications",
+    "experience", "responsibilities",
+)
+
+_MARKDOWN_HEADING = re.compile(r"^\s*(#{1,6})\s+\S")
+_BOLD_LINE = re.compile(r"^\s*\*\*[^*]+\*\*:?\s*$")
+# Bold lines rank below every markdown heading.
+_BOLD_LEVEL = 7
+
+
+def digest(value: Any) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+def section_kind(heading: str) -> str:
+    """Classifies a heading as ``summary``, ``experience``, ``skills``, ``education`` or ``other``."""
+    text = re.sub(r"[#*:_]", " ", heading).lower()
+    for kind, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return kind
+    return "other"
+
+
+def _heading_level(line: str) -> Optional[int]:
+    match = _MARKDOWN_HEADING.match(line)
+    if match:
+        return len(match.group(1))
+    return _BOLD_LEVEL if _BOLD_LINE.match(line) else None
+
+
+def split_markdown(text: str) -> List[Tuple[str, str]]:
+    """Splits markdown at its section headings into ``(kind, block)`` pairs.
+
+    The first heading naming a known section sets the section level; deeper
+    headings, such as one per job, stay in their section. Bold lines only
+    start a section when they name a known one. Text before the first section
+    is the ``header`` block, e.g. the name and contact details. Joining the
+    blocks gives back ``text``.
+    """
+    blocks: List[Tuple[str, List[str]]] = [("header", [])]
+    section_level = None
+    for line in text.splitlines(keepends=True):
+        level = _heading_level(line)
+        if level is not None:
+            kind = section_kind(line)
+            if section_level is None:
+                starts = kind != "other"
+                if starts:
+                    section_level = level
+            else:
+                starts = level < section_level or (
+                    level == section_level and (level < _BOLD_LEVEL or kind != "other")
+                )
+            if starts:
+                blocks.append((kind, []))
+        blocks[-1][1].append(line)
+    return [(kind, "".join(lines)) for kind, lines in blocks if lines]
+
+
+def resume_heading_kind(line: str) -> Optional[str]:
+    """Returns the kind of section ``line`` heads in a plain-text resume, if it is a heading."""
+    text = " ".join(re.sub(r"[^\w&]+", " ", line).lower().split())
+    for kind, headings in RESUME_HEADINGS.items():
+        if text in headings:
+            return kind
+    return None
+
+
+def resume_components(text: str) -> Dict[str, str]:
+    """Digests of each kind of section of a plain-text resume.
+
+    PDF text has no markup, so only a line that is exactly a known heading
+    starts a section. If fewer than two kinds of section are found, the
+    sections are not trusted and the whole text is one ``resume:text``
+    component, whose changes rewrite the whole resume.
+    """
+    parts: Dict[str, List[str]] = {"header": []}
+    kind = "header"
+    for line in text.splitlines():
+        stripped = line.strip()
+        kind = resume_heading_kind(stripped) or kind
+        parts.setdefault(kind, []).append(stripped)
+    if len(set(parts) - {"header"}) < 2:
+        return {"resume:text": digest("\n".join(line.strip() for line in text.splitlines()))}
+    return {f"resume:{kind}": digest("\n".join(lines)) for kind, lines in parts.items() if lines}
+
+
+def posting_components(requirements: Any) -> Dict[str, str]:
+    """Digests of each field of a parsed posting (a ``JobRequirements``)."""
+    fields = asdict(requirements)
+    return {f"posting:{name}": digest(fields.get(name)) for name in POSTING_FIELDS}
+
+
+def changed_components(previous: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    return sorted(key for key in set(previous) | set(current) if previous.get(key) != current.get(key))
+
+
+def affected_sections(changed: List[str], components: Dict[str, str]) -> Optional[Set[str]]:
+    """Returns the kinds of section to rewrite, or None if everything must be."""
+    parsed_posting = any(key.startswith("posting:") for key in components)
+    affected: Set[str] = set()
+    for key in changed:
+        if parsed_posting and key in DERIVED_INPUTS:
+            continue
+        kinds = {kind for kind, inputs in SECTION_INPUTS.items() if key in inputs}
+        if not kinds:
+            return None
+        affected |= kinds
+    return affected
+
+
+def _describe(key: str) -> str:
+    source, _, name = key.partition(":")
+    name = name.replace("_", " ")
+    if source == "resume":
+        return f"the {name} section of the original resume"
+    if source == "posting":
+        return f"the job posting's {name}"
+    if source == "context":
+        return f"the output of {name}"
+    return f"the {name} input"
+
+
+@dataclass
+class Revision:
+    """An update of an earlier output in which only some sections are rewritten."""
+
+    previous: str
+    changed: List[str]
+    sections: Set[str]
+
+    def instructions(self) -> str:
+        sections = ", ".join(sorted(self.sections))
+        changes = "; ".join(_describe(key) for key in self.changed)
+        return (
+            "You tailored this resume before, from earlier versions of the inputs:\n\n"
+            f"{self.previous}\n\n"
+            f"Since then only these inputs changed: {changes}. Rewrite only the sections of that "
+            f"resume of these kinds: {sections}. Keep every other section exactly as it is and "
+            "return the complete resume in the same format."
+        )
+
+    def merge(self, regenerated: str) -> str:
+        """Takes the rewritten sections from ``regenerated`` and the rest from the previous output.
+
+        A section the new output lacks keeps its previous text.
+        """
+        new_blocks: Dict[str, List[str]] = {}
+        for kind, block in split_markdown(regenerated):
+            new_blocks.setdefault(kind, []).append(block)
+        merged = []
+        for kind, block in split_markdown(self.previous):
+            if kind in self.sections and new_blocks.get(kind):
+                merged.append(new_blocks[kind].pop(0))
+            else:
+                merged.append(block)
+        return "".join(merged)
+
+
+def plan_revision(previous_output: str, previous_components: Dict[str, str],
+                  components: Dict[str, str]) -> Optional[Revision]:
+    """Decides whether an output can be updated section by section.
+
+    Returns None when it cannot: nothing is known about the previous inputs,
+    a change affects the whole output, the previous output has no sections,
+    or every section is affected anyway.
+    """
+    if not previous_components or not previous_output:
+        return None
+    changed = changed_components(previous_components, components)
+    sections = affected_sections(changed, components)
+    if not changed or sections is None:
+        return None
+    present = {kind for kind, _ in split_markdown(previous_output)}
+    if len(present) < 2 or present <= sections:
+        return None
+    return Revision(previous_output, changed, sections & present)
@@ -0,0 +1,423 @@
+import html
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, Tag
+
+from aijobhunter.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Same browser headers as the scrape tool, so both share one cached response.
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+MIN_REQUIREMENTS = 3
+
+SKILL_VOCABULARY = (
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Golang", "Rust", "C", "C++", "C#", "Scala",
+    "Kotlin", "Swift", "Ruby", "PHP", "R", "MATLAB", "SQL", "NoSQL", "Bash", "Shell",
+    "React", "Angular", "Vue", "Node.js", "Next.js", "Django", "Flask", "FastAPI", "Spring",
+    ".NET", "GraphQL", "REST", "gRPC", "HTML", "CSS",
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible",
+    "Linux", "Git", "CI/CD", "Jenkins", "GitHub Actions", "Microservices", "Serverless",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "DynamoDB",
+    "Snowflake", "BigQuery", "Databricks", "Spark", "Hadoop", "Kafka", "Airflow", "dbt", "ETL",
+    "Machine Learning", "Deep Learning", "NLP", "Natural Language Processing", "Computer Vision",
+    "LLM", "LLMs", "Generative AI", "GenAI", "RAG", "Prompt Engineering", "Reinforcement Learning",
+    "PyTorch", "TensorFlow", "Keras", "JAX", "scikit-learn", "Pandas", "NumPy", "Hugging Face",
+    "Transformers", "LangChain", "LlamaIndex", "CrewAI", "OpenAI", "Vector Databases", "MLOps",
+    "SageMaker", "Bedrock", "Vertex AI", "MLflow", "Statistics", "Data Analysis", "Tableau",
+    "Power BI", "Agile", "Scrum", "System Design", "Distributed Systems",
+)
+# Skills that are also ordinary words ("a RESTful day", "Go to", "in the
+# spring"). They only count when written exactly and in a technical context:
+# in a sentence naming another skill, or next to a word such as "API" or
+# "developer".
+_AMBIGUOUS_SKILLS = {"C", "R", "Go", "Rust", "Swift", "Shell", "Bash", "Spring", "Spark", "REST", "Bedrock"}
+_SKILL_PATTERNS = [
+    (skill, re.compile(
+        r"(?<![\w+#.])" + re.escape(skill) + r"(?![\w+#])",
+        0 if skill in _AMBIGUOUS_SKILLS else re.IGNORECASE,
+    ))
+    for skill in SKILL_VOCABULARY
+]
+_TECH_CONTEXT = re.compile(
+    r"\b(?:apis?|boot|frameworks?|languages?|programming|developers?|engineers?|scripting|scripts?|"
+    r"services?|endpoints?|streaming|clusters?|ios|macos|swiftui|lang|stack|code|coding|backend|"
+    r"experience with|proficien\w*|knowledge of)\b",
+    re.IGNORECASE,
+)
+_CONTEXT_WINDOW = 30
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+|\n")
+
+_PREFERRED_HEADINGS = ("preferred", "nice to have", "nice-to-have", "bonus", "plus if", "desired")
+_QUALIFICATION_HEADINGS = (
+    "qualification", "requirement", "what you'll need", "what you will need", "what you need",
+    "what we're looking for", "what we are looking for", "you have", "you'll have", "must have",
+    "who you are", "about you", "skills", "experience", "you bring", "you should have",
+)
+_RESPONSIBILITY_HEADINGS = (
+    "responsibilit", "what you'll do", "what you will do", "the role", "duties", "day to day",
+    "day-to-day", "your impact", "in this role", "key tasks", "you will",
+)
+_EXPERIENCE_PATTERN = re.compile(r"\b\d{1,2}\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*)?\+?\s*years?\b", re.IGNORECASE)
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-•*·▪●]|\d{1,2}[.)])\s+")
+_HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+_BLOCK_TAGS = ["p", "div", "section", "ul", "ol", "tr", "article", "header"]
+
+
+@dataclass(frozen=True)
+class AtsSite:
+    """How to find a posting's title and description on one applicant tracking system."""
+
+    name: str
+    hosts: Tuple[str, ...]
+    title_selectors: Tuple[str, ...]
+    description_selectors: Tuple[str, ...]
+
+
+ATS_SITES = (
+    AtsSite(
+        name="lever",
+        hosts=("jobs.lever.co",),
+        title_selectors=("div.posting-headline h2",),
+        description_selectors=("div.posting-page div.content", "div.posting-page"),
+    ),
+    AtsSite(
+        name="greenhouse",
+        hosts=("boards.greenhouse.io", "job-boards.greenhouse.io"),
+        title_selectors=("h1.app-title", "div.job__title h1", "h1.section-header"),
+        description_selectors=("div.job__description", "#content"),
+    ),
+    AtsSite(
+        name="amazon",
+        hosts=("amazon.jobs",),
+        title_selectors=("h1.title", "#job-detail h1"),
+        description_selectors=("#job-detail-body", "div.job-detail-body", "#job-detail"),
+    ),
+    AtsSite(
+        name="glassdoor",
+        hosts=("glassdoor.com", "glassdoor.co.in", "glassdoor.co.uk", "glassdoor.ca"),
+        title_selectors=("[data-test=job-title]", "[class*=JobDetails_jobTitle]"),
+        description_selectors=("[class*=JobDetails_jobDescription]", "div.jobDescriptionContent"),
+    ),
+)
+
+
+def find_site(url: str) -> Optional[AtsSite]:
+    host = (urlparse(url).hostname or "").lower()
+    for site in ATS_SITES:
+        if any(host == h or host.endswith("." + h) for h in site.hosts):
+            return site
+    return None
+
+
+@dataclass
+class JobRequirements:
+    """Requirements of one job posting, parsed without an LLM."""
+
+    url: str
+    source: str
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    skills: List[str] = field(default_factory=list)
+    qualifications: List[str] = field(default_factory=list)
+    preferred_qualifications: List[str] = field(default_factory=list)
+    experience: List[str] = field(default_factory=list)
+    responsibilities: List[str] = field(default_factory=list)
+
+    def is_usable(self) -> bool:
+        """Whether the parse found enough to stand in for the research task.
+
+        Skills alone never do: a page that only mentions a few technologies
+        is not a posting the strategist can work from.
+        """
+        requirements = len(self.qualifications) + len(self.preferred_qualifications)
+        return bool(self.title) and requirements >= MIN_REQUIREMENTS
+
+    def to_markdown(self) -> str:
+        lines = [f"# Job requirements: {self.title}"]
+        if self.company:
+            lines.append(f"Company: {self.company}")
+        if self.location:
+            lines.append(f"Location: {self.location}")
+        lines.append(f"Posting: {self.url}")
+        for heading, items in (
+            ("Skills", self.skills),
+            ("Qualifications", self.qualifications),
+            ("Preferred qualifications", self.preferred_qualifications),
+            ("Experience", self.experience),
+            ("Responsibilities", self.responsibilities),
+        ):
+            if items:
+                lines += ["", f"## {heading}"] + [f"- {item}" for item in items]
+        return "\n".join(lines)
+
+
+def _json_ld_job_posting(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    def candidates(data: Any) -> Iterator[Dict[str, Any]]:
+        if isinstance(data, list):
+            for item in data:
+                yield from candidates(item)
+        elif isinstance(data, dict):
+            yield data
+            yield from candidates(data.get("@graph", []))
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "", strict=False)
+        except ValueError:
+            continue
+        for item in candidates(data):
+            types = item.get("@type")
+            if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+                return item
+    return None
+
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        text = BeautifulSoup(html.unescape(value), "html.parser").get_text("\n")
+        return [line.strip(" -•*\t") for line in text.splitlines() if line.strip(" -•*\t")]
+    if isinstance(value, list):
+        return [item for v in value for item in _as_list(v)]
+    if isinstance(value, dict):
+        if "monthsOfExperience" in value:
+            months = int(float(value["monthsOfExperience"]))
+            return [f"{months // 12}+ years" if months >= 12 else f"{months}+ months"]
+        return _as_list(value.get("name") or value.get("credentialCategory") or value.get("description"))
+    return [str(value)]
+
+
+def _location(posting: Dict[str, Any]) -> str:
+    locations = posting.get("jobLocation") or []
+    if isinstance(locations, dict):
+        locations = [locations]
+    names = []
+    for location in locations:
+        address = location.get("address", {}) if isinstance(location, dict) else {}
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [p.get("name", "") if isinstance(p, dict) else p for p in parts]
+            names.append(", ".join(p for p in parts if p))
+    if posting.get("jobLocationType") == "TELECOMMUTE":
+        names.append("Remote")
+    return "; ".join(n for n in names if n)
+
+
+def _is_bold_heading(bold: Tag) -> bool:
+    """Whether a bold run stands alone on its line, as job boards style section titles."""
+    parent = bold.parent
+    if parent is None or parent.name == "li" or bold.find_parent("li") is not None:
+        return False
+    if parent.get_text(strip=True) == bold.get_text(strip=True):
+        return True
+    following = bold.next_sibling
+    while isinstance(following, str) and not following.strip():
+        following = following.next_sibling
+    return isinstance(following, Tag) and following.name in ["br", "ul", "ol"] + _BLOCK_TAGS
+
+
+def _mark_structure(root: Tag) -> None:
+    """Inserts line markers so headings and bullets survive ``get_text``."""
+    for br in root.find_all("br"):
+        br.replace_with("\n")
+    for heading in root.find_all(_HEADING_TAGS):
+        heading.insert(0, "\n## ")
+        heading.append("\n")
+    for bold in root.find_all(["strong", "b"]):
+        if _is_bold_heading(bold):
+            bold.insert(0, "\n## ")
+            bold.append("\n")
+    for item in root.find_all("li"):
+        item.insert(0, "\n• ")
+        item.append("\n")
+    for block in root.find_all(_BLOCK_TAGS):
+        block.insert(0, "\n")
+        block.append("\n")
+
+
+def split_sections(root: Tag) -> List[Tuple[str, List[str]]]:
+    """Splits a job description into ``(heading, lines)`` pairs in document order."""
+    _mark_structure(root)
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for raw_line in root.get_text().splitlines():
+        line = " ".join(raw_line.split())
+        if not line or line in ("•", "##"):
+            continue
+        if line.startswith("## "):
+            sections.append((line[3:].strip(" :"), []))
+        elif len(line) <= 80 and line.endswith(":") and not _BULLET_PATTERN.match(line):
+            sections.append((line.rstrip(" :"), []))
+        else:
+            sections[-1][1].append(_BULLET_PATTERN.sub("", line.lstrip("• ")).strip())
+    return [(heading, lines) for heading, lines in sections if lines]
+
+
+def _classify(heading: str) -> Optional[str]:
+    heading = heading.lower()
+    if any(word in heading for word in _PREFERRED_HEADINGS):
+        return "preferred_qualifications"
+    if any(word in heading for word in _QUALIFICATION_HEADINGS):
+        return "qualifications"
+    if any(word in heading for word in _RESPONSIBILITY_HEADINGS):
+        return "responsibilities"
+    return None
+
+
+def _in_tech_context(sentence: str, start: int, end: int, names_skill: bool) -> bool:
+    if names_skill:
+        return True
+    window = sentence[max(start - _CONTEXT_WINDOW, 0):end + _CONTEXT_WINDOW]
+    return bool(_TECH_CONTEXT.search(window))
+
+
+def extract_skills(text: str) -> List[str]:
+    """Returns the skills of ``SKILL_VOCABULARY`` that ``text`` names, in vocabulary order."""
+    found = []
+    sentences = []
+    for sentence in _SENTENCE_END.split(text):
+        names_skill = False
+        for skill, pattern in _SKILL_PATTERNS:
+            if skill not in _AMBIGUOUS_SKILLS and pattern.search(sentence):
+                names_skill = True
+                if skill not in found:
+                    found.append(skill)
+        sentences.append((sentence, names_skill))
+
+    for skill, pattern in _SKILL_PATTERNS:
+        if skill not in _AMBIGUOUS_SKILLS:
+            continue
+        if any(
+            _in_tech_context(sentence, match.start(), match.end(), names_skill)
+            for sentence, names_skill in sentences
+            for match in pattern.finditer(sentence)
+        ):
+            found.append(skill)
+    order = {skill: i for i, skill in enumerate(SKILL_VOCABULARY)}
+    return sorted(found, key=order.__getitem__)
+
+
+def _dedupe(items: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for item in items:
+        key = item.lower()
+        if item and key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def _select_first(soup: BeautifulSoup, selectors: Tuple[str, ...]) -> Optional[Tag]:
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element is not None and element.get_text(strip=True):
+            return element
+    return None
+
+
+def parse_job_posting(url: str, page_html: str) -> Optional[JobRequirements]:
+    """Extracts the requirements of a job posting from its HTML.
+
+    Uses the schema.org ``JobPosting`` JSON-LD when the page has one and the
+    known layout of Lever, Greenhouse, Amazon Jobs and Glassdoor pages.
+
+    Args:
+        url (str): The posting URL, used to recognize the job board.
+        page_html (str): The page HTML.
+
+    Returns:
+        Optional[JobRequirements]: The requirements, or None if the page is
+            not recognized or too little could be extracted.
+    """
+    site = find_site(url)
+    soup = BeautifulSoup(page_html, "html.parser")
+    posting = _json_ld_job_posting(soup)
+    if site is None and posting is None:
+        return None
+
+    posting = posting or {}
+    organization = posting.get("hiringOrganization")
+    requirements = JobRequirements(
+        url=url,
+        source=site.name if site else "json-ld",
+        title=html.unescape(posting.get("title") or ""),
+        company=organization.get("name", "") if isinstance(organization, dict) else str(organization or ""),
+        location=_location(posting),
+    )
+
+    if site is not None:
+        title = _select_first(soup, site.title_selectors)
+        if title is not None and not requirements.title:
+            requirements.title = title.get_text(" ", strip=True)
+        description = _select_first(soup, site.description_selectors)
+    else:
+        description = None
+    if description is None and posting.get("description"):
+        description = BeautifulSoup(html.unescape(posting["description"]), "html.parser")
+    if description is None and site is not None:
+        description = soup.body
+    if not requirements.title:
+        heading = soup.find("h1")
+        requirements.title = heading.get_text(" ", strip=True) if heading else ""
+    if description is None:
+        return None
+
+    text = description.get_text(" ")
+    for heading, lines in split_sections(description):
+        category = _classify(heading)
+        if category is not None:
+            getattr(requirements, category).extend(lines)
+
+    requirements.qualifications += _as_list(posting.get("qualifications"))
+    requirements.qualifications += _as_list(posting.get("educationRequirements"))
+    requirements.responsibilities += _as_list(posting.get("responsibilities"))
+    requirements.skills = _dedupe(_as_list(posting.get("skills")) + extract_skills(text))
+    requirements.experience = _as_list(posting.get("experienceRequirements")) + [
+        line for line in requirements.qualifications + requirements.preferred_qualifications
+        if _EXPERIENCE_PATTERN.search(line)
+    ]
+    for name in ("qualifications", "preferred_qualifications", "experience", "responsibilities"):
+        setattr(requirements, name, _dedupe(getattr(requirements, name)))
+
+    return requirements if requirements.is_usable() else None
+
+
+def fetch_job_requirements(url: str) -> Optional[JobRequirements]:
+    """Fetches and parses a job posting, returning None whenever that fails.
+
+    The page goes through the shared FetchClient, so a later scrape of the
+    same URL by the researcher is served from cache.
+    """
+    from aijobhunter.tools.http_cache import get_fetch_client
+
+    site = find_site(url)
+    with span("parser", site.name if site else "json-ld") as record:
+        try:
+            response = get_fetch_client().get(url, headers=DEFAULT_HEADERS, timeout=15)
+            response.raise_for_status()
+            requirements = parse_job_posting(url, response.text)
+        except Exception as e:
+            logger.warning(f"Could not parse job posting {url}: {e}")
+            requirements = None
+        record.attributes["parsed"] = requirements is not None
+
+    if requirements is None:
+        logger.info(f"No structured requirements for {url}; the researcher will analyze it")
+    else:
+        logger.info(
+            f"Parsed {url} ({requirements.source}): {len(requirements.skills)} skills, "
+            f"{len(requirements.qualifications)} qualifications"
+        )
+    return requirements
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from aijobhunter.events import RunEventStream, bind_stream
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETAINED_JOBS = 1000
+DEFAULT_MAX_PENDING_JOBS = 100
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while ``max_pending`` jobs are waiting to start."""
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A single crew run submitted to the JobQueue."""
+
+    id: str
+    inputs: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    output: Any = None
+    error: Optional[str] = None
+    events: RunEventStream = field(default_factory=RunEventStream, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the job metadata without the (potentially large) output."""
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+_current = threading.local()
+
+
+def current_job() -> Optional[Job]:
+    """Returns the job the calling runner thread is executing, if any."""
+    return getattr(_current, "job", None)
+
+
+class JobQueue:
+    """Runs blocking crew kickoffs on a bounded thread pool.
+
+    Jobs are queued in submission order and at most ``max_workers`` of them run
+    at the same time, each publishing its progress on its ``events`` stream.
+    At most ``max_pending`` jobs wait for a worker; further submissions are
+    refused with a QueueFullError rather than queued without limit. Finished jobs are kept in memory so their status and output can be polled;
+    the oldest finished jobs are dropped once more than ``max_retained_jobs``
+    are held.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any]], Any],
+        max_workers: Optional[int] = None,
+        max_retained_jobs: int = DEFAULT_MAX_RETAINED_JOBS,
+        max_pending: Optional[int] = None,
+    ):
+        """Initializes the JobQueue.
+
+        Args:
+            runner (Callable): Blocking function executed with the job inputs.
+            max_workers (Optional[int]): Number of concurrent runs. Defaults to
+                the ``AIJOBHUNTER_MAX_WORKERS`` environment variable, or 4.
+            max_retained_jobs (int): Upper bound on jobs kept for polling.
+            max_pending (Optional[int]): Number of jobs that may wait for a
+                worker. Defaults to the ``AIJOBHUNTER_MAX_PENDING_JOBS``
+                environment variable, or 100.
+        """
+        if max_workers is None:
+            max_workers = int(
+                Environment.get_env_variable("AIJOBHUNTER_MAX_WORKERS", str(DEFAULT_MAX_WORKERS))
+            )
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_pending is None:
+            max_pending = int(
+                Environment.get_env_variable("AIJOBHUNTER_MAX_PENDING_JOBS", str(DEFAULT_MAX_PENDING_JOBS))
+            )
+
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_retained_jobs = max_retained_jobs
+        self.max_pending = max_pending
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aijobhunter-job"
+        )
+
+    def submit(self, inputs: Dict[str, Any]) -> Job:
+        """Queues a run and returns immediately.
+
+        Args:
+            inputs (Dict[str, Any]): Inputs passed to the runner.
+
+        Returns:
+            Job: The queued job; poll it with ``get``.
+
+        Raises:
+            QueueFullError: If ``max_pending`` jobs are already waiting.
+        """
+        job = Job(id=uuid.uuid4().hex, inputs=inputs)
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.status == JobStatus.QUEUED)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} jobs are already waiting; try again later")
+            self._jobs[job.id] = job
+            self._evict_finished()
+        job.events.emit("job_queued", job_id=job.id)
+        self._executor.submit(self._execute, job)
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def summary(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job's metadata, read consistently with its status, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.summary() if job is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of retained jobs per status."""
+        counts = {status.value: 0 for status in JobStatus}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _execute(self, job: Job) -> None:
+        with self._lock:
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+        job.events.emit("job_started", job_id=job.id)
+        _current.job = job
+        try:
+            with bind_stream(job.events):
+                output = self.runner(job.inputs)
+            with self._lock:
+                job.output = output
+                job.finished_at = time.time()
+                job.status = JobStatus.SUCCEEDED
+            job.events.emit("job_completed", job_id=job.id, output=getattr(output, "raw", output))
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            with self._lock:
+                job.error = str(e)
+                job.finished_at = time.time()
+                job.status = JobStatus.FAILED
+            job.events.emit("job_failed", job_id=job.id, error=job.error)
+        finally:
+            _current.job = None
+            job.events.close()
+
+    def _evict_finished(self) -> None:
+        excess = len(self._jobs) - self.max_retained_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
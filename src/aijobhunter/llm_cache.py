@@ -0,0 +1,300 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import litellm
+from crewai import LLM
+
+from aijobhunter.compaction import estimate_tokens
+from aijobhunter.completion_cache import CompletionCache, get_completion_cache
+from aijobhunter.events import current_task, emit, streaming_tokens
+from aijobhunter.llm_router import Backend, ModelRouter
+from aijobhunter.outbound import outbound_scheduler, provider_for_model
+from aijobhunter.tracing import Span, count_tokens, span
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Streamed deltas are sent on as one token event per this many characters or
+# seconds, whichever comes first.
+TOKEN_FLUSH_CHARS = 200
+TOKEN_FLUSH_SECONDS = 0.25
+
+# LLM attributes that change the completion and therefore belong in the key.
+_KEY_PARAMS = (
+    "model", "temperature", "top_p", "n", "stop", "max_tokens", "max_completion_tokens",
+    "presence_penalty", "frequency_penalty", "logit_bias", "response_format", "seed",
+    "logprobs", "top_logprobs", "base_url", "api_version",
+)
+# Sampling attributes a routed LLM hands on to the LLM of each backend.
+_SAMPLING_PARAMS = (
+    "temperature", "top_p", "n", "stop", "max_tokens", "max_completion_tokens",
+    "presence_penalty", "frequency_penalty", "logit_bias", "response_format", "seed",
+    "logprobs", "top_logprobs",
+)
+
+
+class StreamInterrupted(RuntimeError):
+    """Raised when a streamed completion fails after part of it was emitted.
+
+    It is not retried, since a retry would emit the same text again.
+    """
+
+
+class CachedLLM(LLM):
+    """crewAI LLM that answers repeated prompts from a CompletionCache.
+
+    Calls that pass ``available_functions`` are never cached, since their
+    result comes from executing a tool rather than from the model. Nor are
+    sampled calls (temperature above 0 or unset), whose answers are meant to
+    vary, unless ``AIJOBHUNTER_LLM_CACHE_SAMPLED=1``. When a client follows
+    the event stream bound to the calling thread, completions are streamed
+    and the deltas are emitted as ``token`` events. A streamed call that fails
+    after its first event is not retried; a ``token_reset`` event tells
+    readers to discard what it sent. Every call is recorded as an
+    ``llm`` span with its token counts and cache result. Completions go
+    through the outbound scheduler, which keeps them within the provider's
+    rate limit and retries transient failures.
+    """
+
+    def __init__(self, *args, cache: Optional[CompletionCache] = None, context_window: Optional[int] = None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+        # Prompt tokens the model accepts, which sizes the context budgets.
+        self.context_window = context_window
+
+    def model_for(self, task: Optional[str]) -> str:
+        """The model that serves ``task``'s calls, or first tries to."""
+        return self.model
+
+    def context_window_for(self, task: Optional[str]) -> Optional[int]:
+        """Prompt tokens the model serving ``task`` accepts."""
+        return self.context_window
+
+    def _cacheable(self) -> bool:
+        if self.temperature == 0:
+            return True
+        return Environment.get_env_variable("AIJOBHUNTER_LLM_CACHE_SAMPLED", "0") == "1"
+
+    def _namespace(self, messages: List[Dict[str, str]], tools: Optional[List[dict]]) -> str:
+        # Everything but the newest message must match exactly; only the
+        # newest message takes part in the similarity lookup.
+        params = {name: getattr(self, name, None) for name in _KEY_PARAMS}
+        params["tools"] = tools
+        params["history"] = messages[:-1]
+        return CompletionCache.make_namespace(params)
+
+    def _lookup_namespaces(self, messages: List[Dict[str, str]], tools: Optional[List[dict]],
+                           task: Optional[str]) -> List[str]:
+        """Namespaces a cached answer to ``messages`` may be stored under, most preferred first."""
+        return [self._namespace(messages, tools)]
+
+    def _answer_namespace(self, record: Span, messages: List[Dict[str, str]], tools: Optional[List[dict]]) -> str:
+        """Namespace of the model that just answered ``messages``."""
+        return self._namespace(messages, tools)
+
+    def call(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # crewAI passes the agent's TokenCalcHandler; its running totals give
+        # the tokens of this call.
+        token_process = next(
+            (cb.token_cost_process for cb in callbacks or [] if hasattr(cb, "token_cost_process")),
+            None,
+        )
+        task = current_task()
+        with span("llm", self.model_for(task), task=task) as record, count_tokens(record, token_process):
+            cache = self.cache if self.cache is not None else get_completion_cache()
+            if cache is None or available_functions or not messages or not self._cacheable():
+                record.attributes["cache"] = "bypass"
+                return self._complete(record, messages, tools, callbacks, available_functions)
+
+            last = messages[-1]
+            prompt = f"{last.get('role', '')}: {last.get('content', '')}"
+            response, record.attributes["cache"] = cache.lookup_any(
+                self._lookup_namespaces(messages, tools, task), prompt
+            )
+            if response is not None:
+                emit("token", task=task, text=response, cached=True)
+                return response
+
+            response = self._complete(record, messages, tools, callbacks, available_functions)
+            if isinstance(response, str) and response:
+                cache.put(self._answer_namespace(record, messages, tools), prompt, response)
+            return response
+
+    def _complete(
+        self,
+        record: Span,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> str:
+        return outbound_scheduler.call(
+            provider_for_model(self.model),
+            lambda: self._send(messages, tools, callbacks, available_functions),
+        )
+
+    def _send(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> str:
+        # Stream plain completions when someone is listening; tool calls need
+        # the full response, so they go through crewAI's regular path.
+        if not streaming_tokens() or tools or available_functions:
+            return super().call(messages, tools, callbacks, available_functions)
+        return self._stream(messages, callbacks)
+
+    def _stream(self, messages: List[Dict[str, str]], callbacks: Optional[List[Any]]) -> str:
+        """Runs a streaming completion and emits its deltas as ``token`` events, a few at a time."""
+        if callbacks:
+            self.set_callbacks(callbacks)
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+
+        task = current_task()
+        parts = []
+        pending = []
+        flushed_at = time.monotonic()
+        usage = None
+        emitted = False
+        try:
+            for chunk in litellm.completion(**params):
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    pending.append(delta)
+                    now = time.monotonic()
+                    if sum(map(len, pending)) >= TOKEN_FLUSH_CHARS or now - flushed_at >= TOKEN_FLUSH_SECONDS:
+                        emit("token", task=task, text="".join(pending))
+                        pending, flushed_at, emitted = [], now, True
+            if pending:
+                emit("token", task=task, text="".join(pending))
+        except Exception as e:
+            if not emitted:
+                raise
+            # Readers drop the partial text; crewAI's own retry of the agent
+            # step streams the answer again from the start.
+            emit("token_reset", task=task)
+            raise StreamInterrupted(f"Streamed completion failed after part of it was sent: {e}") from e
+
+        # Keep crewAI's token accounting working for streamed calls.
+        if usage:
+            for callback in callbacks or []:
+                if hasattr(callback, "log_success_event"):
+                    callback.log_success_event(
+                        kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0
+                    )
+        return "".join(parts)
+
+
+class RoutedLLM(CachedLLM):
+    """CachedLLM whose completions are dispatched by a ModelRouter.
+
+    The LLM stands for a route rather than a model: its ``model`` is the
+    route's first backend, which is what crewAI and the completion cache see,
+    while every completion goes to the backend the router picks, with this
+    LLM's sampling params. A task with a route of its own (``llm:<task>``)
+    takes its model and context window from that route's first backend, and
+    the ``llm`` span is labelled with the backend that actually answered.
+    Completions are cached under the backend that answered, and a lookup
+    tries the backends of the route in order; cache hits never reach the
+    router.
+    """
+
+    def __init__(self, *args, route: str, router: ModelRouter, **kwargs):
+        kwargs.setdefault("model", router.primary(route).model)
+        kwargs.setdefault("context_window", router.primary(route).context_window)
+        super().__init__(*args, **kwargs)
+        self.route = route
+        self.router = router
+        self._backend_llms: Dict[str, CachedLLM] = {}
+        self._backend_llms_lock = threading.Lock()
+
+    def model_for(self, task: Optional[str]) -> str:
+        return self.router.route_for(self.route, task)[0].model
+
+    def context_window_for(self, task: Optional[str]) -> Optional[int]:
+        return self.router.route_for(self.route, task)[0].context_window
+
+    def _lookup_namespaces(self, messages: List[Dict[str, str]], tools: Optional[List[dict]],
+                           task: Optional[str]) -> List[str]:
+        return [self._backend_llm(backend)._namespace(messages, tools)
+                for backend in self.router.route_for(self.route, task)]
+
+    def _answer_namespace(self, record: Span, messages: List[Dict[str, str]], tools: Optional[List[dict]]) -> str:
+        backend = self.router.backends[record.attributes["backend"]]
+        return self._backend_llm(backend)._namespace(messages, tools)
+
+    def _backend_llm(self, backend: Backend) -> CachedLLM:
+        with self._backend_llms_lock:
+            llm = self._backend_llms.get(backend.name)
+            if llm is None:
+                llm = CachedLLM(
+                    model=backend.model,
+                    context_window=backend.context_window,
+                    timeout=backend.timeout or self.timeout,
+                    base_url=backend.base_url,
+                    api_key=backend.api_key,
+                    **{name: getattr(self, name, None) for name in _SAMPLING_PARAMS},
+                )
+                self._backend_llms[backend.name] = llm
+            return llm
+
+    def _complete(
+        self,
+        record: Span,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> str:
+        prompt_tokens = sum(estimate_tokens(str(message.get("content") or "")) for message in messages)
+
+        def send(backend: Backend) -> str:
+            record.name = backend.model
+            record.attributes["backend"] = backend.name
+            # No retries per backend: the router fails over to the next one.
+            return outbound_scheduler.call(
+                provider_for_model(backend.model),
+                lambda: self._backend_llm(backend)._send(messages, tools, callbacks, available_functions),
+                max_retries=0,
+            )
+
+        # Only once every backend has failed is the route retried after a backoff.
+        return outbound_scheduler.retry(
+            f"route:{self.route}",
+            lambda: self.router.call(self.route, send, prompt_tokens=prompt_tokens, task=current_task()),
+        )
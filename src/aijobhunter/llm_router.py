@@ -0,0 +1,310 @@
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TypeVar
+
+from aijobhunter.outbound import classify_error, outbound_scheduler, provider_for_model, retry_after
+from aijobhunter.tracing import metrics
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_QUEUE_TIMEOUT = 300.0
+# How long a backend is skipped after a failure of each kind; doubled for
+# every further failure in a row, up to MAX_COOLDOWN.
+COOLDOWNS = {
+    "rate_limited": 30.0,
+    "timeout": 15.0,
+    "unavailable": 60.0,
+    "unauthorized": 600.0,
+}
+MAX_COOLDOWN = 600.0
+# Weight of the newest call in a backend's moving average latency.
+LATENCY_SMOOTHING = 0.3
+# A backend further down a route's list must be this much faster per place
+# before it is preferred over the ones above it.
+PREFERENCE_PENALTY = 0.5
+
+
+class RoutingError(RuntimeError):
+    """Raised when no backend of a route could take a call."""
+
+
+class Backend:
+    """One model endpoint the router can send calls to.
+
+    Tracks the calls in flight against ``max_concurrency``, a moving average
+    of the call latency, seeded with ``latency``, and the time until which
+    the backend is cooling down after rate limits, timeouts or outages.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        max_concurrency: int = 4,
+        context_window: int = 8192,
+        latency: float = 5.0,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ):
+        """Initializes the Backend.
+
+        Args:
+            name (str): Name used in routes, logs and metrics.
+            model (str): litellm model string, e.g. ``ollama/qwen2.5:3b``.
+            max_concurrency (int): Calls it may serve at once.
+            context_window (int): Prompt tokens it accepts.
+            latency (float): Expected seconds per call until calls are measured.
+            timeout (Optional[float]): Seconds before a call is abandoned.
+            base_url (Optional[str]): Endpoint overriding the provider default.
+            api_key (Optional[str]): Key overriding the provider's environment variable.
+        """
+        self.name = name
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.context_window = context_window
+        self.timeout = timeout
+        self.base_url = base_url
+        self.api_key = api_key
+        self.latency = latency
+        self.in_flight = 0
+        self.waiting = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def fits(self, prompt_tokens: int) -> bool:
+        return prompt_tokens <= self.context_window
+
+    def cooling_down(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.max_concurrency
+
+    def expected_seconds(self) -> float:
+        """Latency scaled by the queue a new call would join."""
+        return self.latency * max(1.0, (self.in_flight + self.waiting + 1) / self.max_concurrency)
+
+    def record_success(self, seconds: float) -> None:
+        self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self, kind: str, seconds: float, retry_after: Optional[float] = None) -> float:
+        """Puts the backend in cooldown and returns for how many seconds."""
+        if kind == "timeout":
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+        if kind not in COOLDOWNS:
+            return 0.0
+        self.failures += 1
+        cooldown = retry_after or min(COOLDOWNS[kind] * 2 ** (self.failures - 1), MAX_COOLDOWN)
+        self.cooldown_until = time.monotonic() + cooldown
+        return cooldown
+
+
+class ModelRouter:
+    """Dispatches LLM calls across backends by route, load and health.
+
+    A route (an LLM role such as ``llm`` or ``manager_llm``, optionally
+    narrowed to one task as ``llm:<task name>``) lists the backends that may
+    serve it, most preferred first. Each call goes to the backend with the
+    lowest expected time: its measured latency scaled by its queue, plus the
+    wait for its provider's rate limit quota, with a penalty for every place
+    further down the list. Backends whose context window is too small for the
+    prompt are skipped, and so are backends cooling down after a 429, a
+    timeout or an outage, unless every backend of the route is. A call that
+    fails that way is retried on the next backend.
+
+    Every backend serves at most ``max_concurrency`` calls at once. When all
+    of a route's backends are busy, callers wait for the first free slot on
+    any of them, up to ``queue_timeout`` seconds, so a saturated local model
+    spills over to a hosted one instead of queueing behind itself.
+    """
+
+    def __init__(
+        self,
+        backends: Iterable[Backend],
+        routes: Dict[str, List[str]],
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+    ):
+        self.backends = {backend.name: backend for backend in backends}
+        for route, names in routes.items():
+            unknown = [name for name in names if name not in self.backends]
+            if unknown or not names:
+                raise ValueError(f"Route {route!r} names unknown backends: {unknown or names}")
+        self.routes = routes
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        _routers.add(self)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ModelRouter":
+        """Builds a router from ``{"backends": {name: params}, "routes": {route: [names]}}``."""
+        return cls(
+            [Backend(name, **params) for name, params in config["backends"].items()],
+            config["routes"],
+            queue_timeout=float(config.get("queue_timeout", DEFAULT_QUEUE_TIMEOUT)),
+        )
+
+    def route_for(self, route: str, task: Optional[str] = None) -> List[Backend]:
+        names = (task and self.routes.get(f"{route}:{task}")) or self.routes.get(route)
+        if not names:
+            raise KeyError(f"No route {route!r}")
+        return [self.backends[name] for name in names]
+
+    def primary(self, route: str) -> Backend:
+        return self.route_for(route)[0]
+
+    def candidates(self, route: str, prompt_tokens: int = 0, task: Optional[str] = None,
+                   exclude: Set[str] = frozenset()) -> List[Backend]:
+        """The backends a call may go to, best first."""
+        backends = [b for b in self.route_for(route, task) if b.name not in exclude]
+        fitting = [b for b in backends if b.fits(prompt_tokens)]
+        if not fitting and backends:
+            # Nothing is large enough; the largest window truncates the least.
+            fitting = [max(backends, key=lambda b: b.context_window)]
+        now = time.monotonic()
+        healthy = [b for b in fitting if not b.cooling_down(now)]
+        if not healthy:
+            return sorted(fitting, key=lambda b: b.cooldown_until)
+        rank = {b.name: i for i, b in enumerate(fitting)}
+        quota_wait = {b.name: outbound_scheduler.wait_estimate(provider_for_model(b.model)) for b in healthy}
+        return sorted(healthy, key=lambda b: (
+            (b.expected_seconds() + quota_wait[b.name]) * (1 + PREFERENCE_PENALTY * rank[b.name])
+        ))
+
+    def _acquire(self, route: str, prompt_tokens: int, task: Optional[str], exclude: Set[str]) -> Optional[Backend]:
+        deadline = time.monotonic() + self.queue_timeout
+        with self._condition:
+            queued: List[Backend] = []
+            try:
+                while True:
+                    candidates = self.candidates(route, prompt_tokens, task, exclude)
+                    if not candidates:
+                        return None
+                    for backend in candidates:
+                        if backend.has_capacity():
+                            backend.in_flight += 1
+                            return backend
+                    if not queued:
+                        queued = candidates
+                        for backend in queued:
+                            backend.waiting += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RoutingError(
+                            f"All backends of route {route!r} stayed busy for {self.queue_timeout:.0f}s"
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                for backend in queued:
+                    backend.waiting -= 1
+
+    def _release(self, backend: Backend) -> None:
+        with self._condition:
+            backend.in_flight -= 1
+            self._condition.notify_all()
+
+    def call(self, route: str, send: Callable[[Backend], T], prompt_tokens: int = 0, task: Optional[str] = None) -> T:
+        """Runs ``send`` on the best backend of ``route``, failing over on errors.
+
+        Args:
+            route (str): The route name, usually the LLM role.
+            send (Callable[[Backend], T]): Performs the call on the given backend.
+            prompt_tokens (int): Estimated size of the prompt.
+            task (Optional[str]): The task making the call, for task-specific routes.
+
+        Returns:
+            T: What ``send`` returned for the first backend that succeeded.
+
+        Raises:
+            RoutingError: If every backend was busy for ``queue_timeout``.
+            Exception: The last backend's error once every backend has failed,
+                or at once for errors that are not worth retrying elsewhere.
+        """
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            backend = self._acquire(route, prompt_tokens, task, tried)
+            if backend is None:
+                break
+            tried.add(backend.name)
+            start = time.monotonic()
+            try:
+                result = send(backend)
+            except Exception as e:
+                elapsed = time.monotonic() - start
+                kind = classify_error(e)
+                with self._condition:
+                    cooldown = backend.record_failure(kind, elapsed, retry_after(e)) if kind else 0.0
+                self._release(backend)
+                self._record(backend, route, kind or "error", elapsed)
+                if kind is None:
+                    raise
+                logger.warning(
+                    f"LLM backend {backend.name} failed on route {route} ({kind}: {e}); "
+                    f"cooling down for {cooldown:.0f}s and failing over"
+                )
+                last_error = e
+                continue
+            elapsed = time.monotonic() - start
+            with self._condition:
+                backend.record_success(elapsed)
+            self._release(backend)
+            self._record(backend, route, "ok", elapsed)
+            return result
+        if last_error is not None:
+            raise last_error
+        raise RoutingError(f"No backend of route {route!r} can take the call")
+
+    @staticmethod
+    def _record(backend: Backend, route: str, outcome: str, seconds: float) -> None:
+        metrics.inc("aijobhunter_llm_backend_calls_total", "LLM calls by backend, route and outcome.",
+                    {"backend": backend.name, "route": route, "outcome": outcome})
+        metrics.observe("aijobhunter_llm_backend_seconds", "Duration of LLM calls by backend.",
+                        {"backend": backend.name}, seconds)
+
+
+def load_routing_config(backends: Dict[str, Dict[str, Any]], routes: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Returns the routing config, read from ``AIJOBHUNTER_LLM_ROUTING_CONFIG`` if set.
+
+    The file is JSON with ``backends`` and ``routes`` replacing the defaults
+    given, e.g. to point the crew at local fake servers through ``base_url``.
+    """
+    config: Dict[str, Any] = {"backends": backends, "routes": routes}
+    path = Environment.get_env_variable("AIJOBHUNTER_LLM_ROUTING_CONFIG")
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+    return config
+
+
+_routers: "weakref.WeakSet[ModelRouter]" = weakref.WeakSet()
+
+
+def _collect_metrics():
+    samples = []
+    now = time.monotonic()
+    for router in list(_routers):
+        for backend in router.backends.values():
+            labels = {"backend": backend.name}
+            samples += [
+                ("aijobhunter_llm_backend_in_flight", "LLM calls being served by each backend.",
+                 "gauge", labels, backend.in_flight),
+                ("aijobhunter_llm_backend_waiting", "LLM calls waiting for a slot, by the backends they wait on.",
+                 "gauge", labels, backend.waiting),
+                ("aijobhunter_llm_backend_latency_seconds", "Moving average latency of each LLM backend.",
+                 "gauge", labels, round(backend.latency, 3)),
+                ("aijobhunter_llm_backend_cooling_down", "1 while a backend is skipped after failures.",
+                 "gauge", labels, int(backend.cooling_down(now))),
+            ]
+    return samples
+
+
+metrics.register_collector(_collect_metrics)
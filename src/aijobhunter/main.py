@@ -4,7 +4,7 @@ import warnings
 
 from datetime import datetime
 
-from aijobhunter.crew import AIjobhunter
+from aijobhunter.utils import configure_logging
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -13,21 +13,27 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+RESUME_PATH = "./knowledge/CV_YuvalMehta.pdf"
+
+job_application_inputs = {
+    # 'job_posting_url': 'https://amazon.jobs/en/jobs/2821385/worldwide-specialist-solutions-architect-genai',
+    # "job_posting_url": "https://jobs.lever.co/Federato/ca664080-ae5b-4cac-88f9-137d3d9f0c78",
+    "job_posting_url": "https://www.glassdoor.co.in/job-listing/ai-applications-engineer-prolegion-private-limited-JV_IC2851180_KO0,24_KE25,50.htm?jl=1009653091477&utm_campaign=google_jobs_apply&utm_source=google_jobs_apply&utm_medium=organic",
+    "github_url": "https://github.com/Yuval728",
+    # 'personal_website': 'your_personal_website_url' # Replace with your personal website UR,
+}
+
 def run():
     """
     Run the crew.
     """
-    job_application_inputs = {
-        # 'job_posting_url': 'https://amazon.jobs/en/jobs/2821385/worldwide-specialist-solutions-architect-genai',
-        # "job_posting_url": "https://jobs.lever.co/Federato/ca664080-ae5b-4cac-88f9-137d3d9f0c78",
-        "job_posting_url": "https://www.glassdoor.co.in/job-listing/ai-applications-engineer-prolegion-private-limited-JV_IC2851180_KO0,24_KE25,50.htm?jl=1009653091477&utm_campaign=google_jobs_apply&utm_source=google_jobs_apply&utm_medium=organic",
-        "github_url": "https://github.com/Yuval728",
-        # 'personal_website': 'your_personal_website_url' # Replace with your personal website UR,
-    }
-    
+    from aijobhunter.crew import AIjobhunter
+
+    configure_logging()
+
     try:
         
-        ai_job_hunter = AIjobhunter(file_path="./knowledge/CV_YuvalMehta.pdf")
+        ai_job_hunter = AIjobhunter(file_path=RESUME_PATH)
         # ai_job_hunter.set_tools(file_path="../knowledge/CV_YuvalMehta.pdf")
         output = ai_job_hunter.crew().kickoff(inputs=job_application_inputs)
         # Ai().crew().kickoff(inputs=job_application_inputs)
@@ -35,25 +41,73 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def batch():
+    """
+    Apply the resume to every job posting in a JSONL file.
+
+    Usage: batch <postings.jsonl> <results.jsonl> [github_url]
+
+    Without ``github_url`` every posting must set its own.
+    """
+    from aijobhunter.batch import run_batch
+
+    configure_logging()
+
+    github_url = sys.argv[3] if len(sys.argv) > 3 else None
+    try:
+        run_batch(
+            input_path=sys.argv[1],
+            output_path=sys.argv[2],
+            file_path=RESUME_PATH,
+            github_url=github_url,
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
+
+
 def train():
     """
     Train the crew for a given number of iterations.
     """
-    inputs = {
-        "topic": "AI LLMs"
-    }
+    from aijobhunter.crew import AIjobhunter
+
+    configure_logging()
+
     try:
-        AIjobhunter().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        # Every iteration has to run the tasks, so nothing is restored from checkpoints.
+        AIjobhunter(file_path=RESUME_PATH, checkpoints=False).crew().train(
+            n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=job_application_inputs
+        )
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
 def replay():
     """
-    Replay the crew execution from a specific task.
+    Resume a checkpointed run, optionally re-running it from a specific task.
+
+    Usage: replay <run_key> [task_name]
     """
+    from aijobhunter.checkpoints import checkpoint_store
+    from aijobhunter.crew import AIjobhunter
+
+    configure_logging()
+
+    run = checkpoint_store.get(sys.argv[1])
+    if run is None:
+        raise Exception(f"No checkpointed run {sys.argv[1]}")
+    rerun = len(sys.argv) > 2
+    # A task asked to rerun must not be filled in from an earlier run instead.
+    ai_job_hunter = AIjobhunter(file_path=run.file_path, incremental=not rerun)
+    if rerun:
+        task_names = list(ai_job_hunter.tasks_config)
+        if sys.argv[2] not in task_names:
+            raise ValueError(f"Unknown task {sys.argv[2]!r}; expected one of {', '.join(task_names)}")
+        # Later tasks rerun by themselves when this task's output changes.
+        run.discard(sys.argv[2])
+
     try:
-        AIjobhunter().crew().replay(task_id=sys.argv[1])
+        ai_job_hunter.crew().kickoff(inputs=run.inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -62,11 +116,14 @@ def test():
     """
     Test the crew execution and returns the results.
     """
-    inputs = {
-        "topic": "AI LLMs"
-    }
+    from aijobhunter.crew import AIjobhunter
+
+    configure_logging()
+
     try:
-        AIjobhunter().crew().test(n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs)
+        AIjobhunter(file_path=RESUME_PATH, checkpoints=False).crew().test(
+            n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=job_application_inputs
+        )
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
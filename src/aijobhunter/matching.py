@@ -0,0 +1,285 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from aijobhunter.job_parser import DEFAULT_HEADERS, JobRequirements, extract_skills, fetch_job_requirements
+from aijobhunter.tools.resume_index import (
+    DEFAULT_EMBEDDING_MODEL,
+    HASHING_EMBEDDING_MODEL,
+    get_embedder,
+    resume_index_store,
+)
+from aijobhunter.tracing import span
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# How much each kind of requirement counts towards the semantic score.
+REQUIREMENT_WEIGHTS = {
+    "qualification": 1.0,
+    "posting": 1.0,
+    "preferred": 0.5,
+    "responsibility": 0.25,
+}
+SKILL_WEIGHT = 0.3
+MAX_POSTING_LINES = 60
+DEFAULT_FETCH_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class Requirement:
+    text: str
+    kind: str
+
+    @property
+    def weight(self) -> float:
+        return REQUIREMENT_WEIGHTS[self.kind]
+
+
+@dataclass
+class JobTarget:
+    """What one posting asks for: requirement lines and named skills."""
+
+    url: str
+    requirements: List[Requirement]
+    skills: List[str]
+
+
+@dataclass
+class Alignment:
+    requirement: str
+    kind: str
+    section: str
+    score: float
+
+
+@dataclass
+class MatchReport:
+    """How well the resume covers one posting.
+
+    ``fit_score`` blends the weighted mean of each requirement's best
+    similarity to a resume section with the share of named skills the resume
+    mentions. All scores are in ``[0, 1]``.
+    """
+
+    url: str
+    fit_score: float
+    semantic_score: float
+    skill_coverage: float
+    matched_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+    alignments: List[Alignment] = field(default_factory=list)
+
+    def to_markdown(self, top: int = 8) -> str:
+        lines = [
+            f"Resume match for this posting: overall fit {self.fit_score:.0%} "
+            f"(requirement similarity {self.semantic_score:.0%}, skill coverage {self.skill_coverage:.0%})."
+        ]
+        if self.matched_skills:
+            lines.append(f"Skills the resume already shows: {', '.join(self.matched_skills)}.")
+        if self.missing_skills:
+            lines.append(f"Skills the posting names that the resume does not: {', '.join(self.missing_skills)}.")
+        if self.alignments:
+            lines.append("Strongest requirement matches (requirement -> resume section):")
+            lines += [f"- {a.requirement} -> {a.section} ({a.score:.2f})" for a in self.alignments[:top]]
+            weakest = [a for a in self.alignments[-top:] if a not in self.alignments[:top]]
+            if weakest:
+                lines.append("Weakest requirement matches:")
+                lines += [f"- {a.requirement} ({a.score:.2f})" for a in reversed(weakest)]
+        return "\n".join(lines)
+
+
+def target_from_requirements(requirements: JobRequirements) -> JobTarget:
+    lines = (
+        [Requirement(text, "qualification") for text in requirements.qualifications]
+        + [Requirement(text, "preferred") for text in requirements.preferred_qualifications]
+        + [Requirement(text, "responsibility") for text in requirements.responsibilities]
+    )
+    return JobTarget(url=requirements.url, requirements=lines, skills=requirements.skills)
+
+
+def target_from_text(url: str, text: str) -> JobTarget:
+    """Treats the sentence-length lines of an unparsed page as requirements."""
+    lines = []
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split()).lstrip("-•* ")
+        if 25 <= len(line) <= 300 and line not in lines:
+            lines.append(line)
+    return JobTarget(
+        url=url,
+        requirements=[Requirement(line, "posting") for line in lines[:MAX_POSTING_LINES]],
+        skills=extract_skills(text),
+    )
+
+
+def fetch_job_target(url: str, requirements: Optional[JobRequirements] = None) -> JobTarget:
+    """Returns what a posting asks for, parsing it when possible.
+
+    Pages the job parser does not recognize fall back to their visible text.
+    Both fetches go through the shared FetchClient, so the second is cached.
+    """
+    from aijobhunter.tools.http_cache import get_fetch_client
+
+    if requirements is None:
+        requirements = fetch_job_requirements(url)
+    if requirements is not None:
+        return target_from_requirements(requirements)
+    response = get_fetch_client().get(url, headers=DEFAULT_HEADERS, timeout=15)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return target_from_text(url, soup.get_text("\n"))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _section_label(chunk: str) -> str:
+    first_line = chunk.strip().splitlines()[0] if chunk.strip() else ""
+    return first_line if len(first_line) <= 80 else first_line[:77] + "..."
+
+
+class ResumeMatcher:
+    """Scores job postings against the sections of one resume.
+
+    Resume sections are the chunks of the resume index, so their embeddings
+    come from the same on-disk index as the resume search tool. Requirement
+    lines are embedded in one batch and all similarities are computed with a
+    single matrix product, which is what makes ranking hundreds of postings
+    cheap.
+    """
+
+    def __init__(self, file_path: str, model_name: Optional[str] = None):
+        model_name = model_name or Environment.get_env_variable(
+            "AIJOBHUNTER_MATCH_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL
+        )
+        try:
+            index = resume_index_store.load(file_path, model_name)
+        except (ImportError, OSError) as e:
+            logger.warning(f"Embedding model {model_name} unavailable ({e}); matching with hashed words")
+            model_name = HASHING_EMBEDDING_MODEL
+            index = resume_index_store.load(file_path, model_name)
+        self.model_name = model_name
+        self.sections = [_section_label(chunk) for chunk in index.chunks]
+        embeddings = np.asarray(index.embeddings, dtype=np.float32)
+        if not index.chunks:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.section_embeddings = _normalize(embeddings)
+        self.skills = set(extract_skills("\n".join(index.chunks)))
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.section_embeddings.shape[1]), dtype=np.float32)
+        vectors = get_embedder(self.model_name).embed_documents(list(texts))
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+    def score(self, targets: Sequence[JobTarget]) -> List[MatchReport]:
+        """Scores every posting; the reports are in the order of ``targets``."""
+        if not targets:
+            return []
+
+        # Postings share a lot of boilerplate, so each distinct line is embedded once.
+        texts: Dict[str, int] = {}
+        for target in targets:
+            for requirement in target.requirements:
+                texts.setdefault(requirement.text, len(texts))
+        requirement_embeddings = self._embed(list(texts))
+
+        rows = np.array([texts[r.text] for t in targets for r in t.requirements], dtype=np.int64)
+        weights = np.array([r.weight for t in targets for r in t.requirements], dtype=np.float32)
+        if len(self.sections) and len(rows):
+            # (requirement lines) x (resume sections) cosine similarities.
+            similarities = requirement_embeddings[rows] @ self.section_embeddings.T
+            best_section = similarities.argmax(axis=1)
+            best_score = np.clip(similarities[np.arange(len(rows)), best_section], 0, 1)
+        else:
+            best_section = np.zeros(len(rows), dtype=np.int64)
+            best_score = np.zeros(len(rows), dtype=np.float32)
+
+        counts = np.array([len(t.requirements) for t in targets], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        # Sums per target; unlike reduceat, bincount gives 0 for targets without requirements.
+        owner = np.repeat(np.arange(len(targets)), counts)
+        weighted = np.bincount(owner, weights=best_score * weights, minlength=len(targets))
+        total_weight = np.bincount(owner, weights=weights, minlength=len(targets))
+        semantic = weighted / np.maximum(total_weight, 1e-9)
+
+        reports = []
+        for i, target in enumerate(targets):
+            matched = [skill for skill in target.skills if skill in self.skills]
+            missing = [skill for skill in target.skills if skill not in self.skills]
+            coverage = len(matched) / len(target.skills) if target.skills else 0.0
+            skill_weight = SKILL_WEIGHT if target.skills else 0.0
+            if not target.requirements:
+                skill_weight = 1.0 if target.skills else 0.0
+            order = starts[i] + np.argsort(-best_score[starts[i]:starts[i] + counts[i]], kind="stable")
+            reports.append(MatchReport(
+                url=target.url,
+                fit_score=float((1 - skill_weight) * semantic[i] + skill_weight * coverage),
+                semantic_score=float(semantic[i]),
+                skill_coverage=coverage,
+                matched_skills=matched,
+                missing_skills=missing,
+                alignments=[
+                    Alignment(
+                        requirement=target.requirements[j - starts[i]].text,
+                        kind=target.requirements[j - starts[i]].kind,
+                        section=self.sections[best_section[j]] if self.sections else "",
+                        score=float(best_score[j]),
+                    )
+                    for j in order
+                ],
+            ))
+        return reports
+
+    def match(self, target: JobTarget) -> MatchReport:
+        return self.score([target])[0]
+
+
+def match_resume(file_path: str, url: str, requirements: Optional[JobRequirements] = None) -> MatchReport:
+    """Scores the resume against one posting."""
+    with span("matching", "posting"):
+        return ResumeMatcher(file_path).match(fetch_job_target(url, requirements))
+
+
+def rank_postings(
+    file_path: str,
+    postings: Sequence[Dict[str, Any]],
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+) -> List[Tuple[Dict[str, Any], Optional[MatchReport]]]:
+    """Ranks postings by how well the resume fits them, without any LLM call.
+
+    Args:
+        file_path (str): Path to the resume PDF.
+        postings (Sequence[Dict[str, Any]]): Postings with a ``job_posting_url``.
+        max_workers (int): Concurrent page fetches.
+
+    Returns:
+        List[Tuple[Dict[str, Any], Optional[MatchReport]]]: The postings with
+            their reports, best fit first. Postings whose page could not be
+            fetched come last with a None report.
+    """
+    def fetch(posting: Dict[str, Any]) -> Optional[JobTarget]:
+        try:
+            return fetch_job_target(posting["job_posting_url"])
+        except Exception as e:
+            logger.warning(f"Could not fetch {posting['job_posting_url']} for ranking: {e}")
+            return None
+
+    with span("matching", "rank", postings=len(postings)):
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aijobhunter-rank") as executor:
+            targets = list(executor.map(fetch, postings))
+        fetched = [(posting, target) for posting, target in zip(postings, targets) if target is not None]
+        reports = ResumeMatcher(file_path).score([target for _, target in fetched])
+
+    ranked = sorted(zip(fetched, reports), key=lambda item: -item[1].fit_score)
+    return [(posting, report) for (posting, _), report in ranked] + [
+        (posting, None) for posting, target in zip(postings, targets) if target is None
+    ]
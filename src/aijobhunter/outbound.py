@@ -0,0 +1,313 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from aijobhunter.tracing import metrics, record_retry
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Requests per minute allowed for each provider unless
+# AIJOBHUNTER_RATE_LIMIT_<PROVIDER> says otherwise. Providers not listed,
+# such as a local Ollama, are not rate limited.
+DEFAULT_QUOTAS = {
+    "groq": 30,
+    "serper": 300,
+}
+# Requests a provider may receive at once after being idle, as a share of its
+# per-minute quota.
+BURST_SHARE = 0.1
+DEFAULT_MAX_RETRIES = 3
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Lower runs first: requests of a waiting /apply caller go ahead of batch runs.
+LANES = {
+    "interactive": 0,
+    "batch": 1,
+}
+DEFAULT_LANE = "interactive"
+
+# Failure kinds worth retrying after a pause.
+RETRYABLE = ("rate_limited", "timeout", "unavailable")
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Says whether a failed call may succeed later or elsewhere.
+
+    Looks at the status code and the exception class name rather than at
+    litellm's or requests' types, so fake backends only need to raise
+    something similar.
+
+    Returns:
+        Optional[str]: ``"rate_limited"``, ``"timeout"``, ``"unavailable"``,
+            ``"unauthorized"`` or ``"context_length"``, or None for errors
+            that would fail anywhere (bad requests, bugs).
+    """
+    name = type(error).__name__
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if "ContextWindowExceeded" in name or "ContextLengthExceeded" in name:
+        return "context_length"
+    if status == 429 or "RateLimit" in name:
+        return "rate_limited"
+    if isinstance(error, TimeoutError) or "Timeout" in name:
+        return "timeout"
+    if status in (401, 403) or name in ("AuthenticationError", "PermissionDeniedError"):
+        return "unauthorized"
+    if isinstance(status, int) and status >= 500:
+        return "unavailable"
+    if isinstance(error, ConnectionError) or name in (
+        "ConnectionError", "APIConnectionError", "ServiceUnavailableError", "InternalServerError",
+    ):
+        return "unavailable"
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked to wait before retrying, if it said."""
+    seconds = getattr(error, "retry_after", None)
+    if seconds is not None:
+        return float(seconds)
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def provider_for_model(model: str) -> str:
+    """The provider of a litellm model string, e.g. ``groq`` for ``groq/llama-3.3-70b-versatile``."""
+    return model.split("/", 1)[0] if "/" in model else model
+
+
+_current = threading.local()
+
+
+@contextmanager
+def bind_lane(lane: str) -> Iterator[None]:
+    """Queues the outbound requests of the current thread in ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane!r}")
+    previous = getattr(_current, "lane", None)
+    _current.lane = lane
+    try:
+        yield
+    finally:
+        _current.lane = previous
+
+
+def current_lane() -> str:
+    return getattr(_current, "lane", None) or DEFAULT_LANE
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average and ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def take(self, now: float) -> float:
+        """Takes a token and returns 0, or returns how long until one is free."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def wait_estimate(self, now: float, queued: int) -> float:
+        """Seconds until a request joining a queue of ``queued`` would be sent."""
+        self._refill(now)
+        return max(self.paused_until - now, 0.0) + max(queued + 1 - self.tokens, 0.0) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Stops handing out tokens for ``seconds`` and empties the bucket."""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+class _Provider:
+    def __init__(self, name: str, bucket: TokenBucket):
+        self.name = name
+        self.bucket = bucket
+        self.queue: List[Tuple[int, int]] = []
+        self.queued_by_lane = {lane: 0 for lane in LANES}
+        self.condition = threading.Condition()
+
+
+class OutboundScheduler:
+    """Shares each provider's request quota between every caller in the process.
+
+    Requests to a rate-limited provider take a token from its bucket first.
+    Without a token they queue, ordered by lane and then by arrival, so
+    interactive runs go ahead of batch runs and the provider receives a
+    steady stream within its quota instead of bursts that end in 429s. A
+    request that still fails with a rate limit, timeout or outage is retried
+    after an exponential backoff with full jitter, and a 429 also pauses the
+    provider's bucket for everyone, for the server's ``Retry-After`` if it
+    gave one.
+    """
+
+    def __init__(self, quotas: Optional[Dict[str, float]] = None, max_retries: Optional[int] = None):
+        """Initializes the OutboundScheduler.
+
+        Args:
+            quotas (Optional[Dict[str, float]]): Requests per minute by
+                provider. Read from ``DEFAULT_QUOTAS`` and the
+                ``AIJOBHUNTER_RATE_LIMIT_<PROVIDER>`` variables when omitted;
+                0 disables the limit.
+            max_retries (Optional[int]): Retries per request. Read from
+                ``AIJOBHUNTER_OUTBOUND_RETRIES`` (default 3) when omitted.
+        """
+        self._quotas = quotas
+        self._max_retries = max_retries
+        self._providers: Dict[str, Optional[_Provider]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def max_retries(self) -> int:
+        if self._max_retries is not None:
+            return self._max_retries
+        return int(Environment.get_env_variable("AIJOBHUNTER_OUTBOUND_RETRIES", str(DEFAULT_MAX_RETRIES)))
+
+    def _quota(self, name: str) -> float:
+        if self._quotas is not None:
+            return float(self._quotas.get(name, 0))
+        default = DEFAULT_QUOTAS.get(name, 0)
+        return float(Environment.get_env_variable(f"AIJOBHUNTER_RATE_LIMIT_{name.upper()}", str(default)))
+
+    def _provider(self, name: str) -> Optional[_Provider]:
+        with self._lock:
+            if name not in self._providers:
+                per_minute = self._quota(name)
+                self._providers[name] = _Provider(
+                    name, TokenBucket(per_minute / 60, max(1.0, per_minute * BURST_SHARE))
+                ) if per_minute > 0 else None
+            return self._providers[name]
+
+    def wait_estimate(self, name: str) -> float:
+        """Seconds a request to ``name`` made now would wait for its quota."""
+        provider = self._provider(name)
+        if provider is None:
+            return 0.0
+        with provider.condition:
+            return provider.bucket.wait_estimate(time.monotonic(), len(provider.queue))
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[None]:
+        """Waits until a request to provider ``name`` fits its quota."""
+        provider = self._provider(name)
+        if provider is None:
+            yield
+            return
+        lane = current_lane()
+        ticket = (LANES[lane], next(self._sequence))
+        started = time.monotonic()
+        with provider.condition:
+            heapq.heappush(provider.queue, ticket)
+            provider.queued_by_lane[lane] += 1
+            try:
+                while True:
+                    timeout = None
+                    if provider.queue[0] == ticket:
+                        timeout = provider.bucket.take(time.monotonic())
+                        if timeout == 0:
+                            break
+                    provider.condition.wait(timeout)
+            finally:
+                provider.queue.remove(ticket)
+                heapq.heapify(provider.queue)
+                provider.queued_by_lane[lane] -= 1
+                provider.condition.notify_all()
+        metrics.inc("aijobhunter_outbound_requests_total", "Outbound API requests by provider and lane.",
+                    {"provider": name, "lane": lane})
+        metrics.observe("aijobhunter_outbound_wait_seconds", "Time outbound requests waited for their quota.",
+                        {"provider": name, "lane": lane}, time.monotonic() - started)
+        yield
+
+    def _penalize(self, name: str, error: BaseException) -> None:
+        provider = self._provider(name)
+        if provider is None or classify_error(error) != "rate_limited":
+            return
+        with provider.condition:
+            provider.bucket.pause(retry_after(error) or BASE_BACKOFF)
+            provider.condition.notify_all()
+
+    def retry(self, name: str, send: Callable[[], T], max_retries: Optional[int] = None) -> T:
+        """Runs ``send``, retrying retryable failures with jittered exponential backoff."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in itertools.count():
+            try:
+                return send()
+            except Exception as e:
+                kind = classify_error(e)
+                if kind not in RETRYABLE or attempt >= max_retries:
+                    raise
+                delay = max(random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)), retry_after(e) or 0)
+                logger.warning(f"Request to {name} failed ({kind}: {e}); retry {attempt + 1} in {delay:.1f}s")
+                record_retry("outbound", name)
+                time.sleep(delay)
+
+    def call(self, name: str, send: Callable[[], T], max_retries: Optional[int] = None) -> T:
+        """Sends a request to provider ``name`` within its quota, with retries.
+
+        Args:
+            name (str): The provider, e.g. ``groq`` or ``serper``.
+            send (Callable[[], T]): Makes the request.
+            max_retries (Optional[int]): Overrides the scheduler's retries.
+
+        Returns:
+            T: What ``send`` returned.
+        """
+        def attempt() -> T:
+            with self.acquire(name):
+                try:
+                    return send()
+                except Exception as e:
+                    self._penalize(name, e)
+                    raise
+
+        return self.retry(name, attempt, max_retries)
+
+    def queue_depths(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            providers = [p for p in self._providers.values() if p is not None]
+        depths = {}
+        for provider in providers:
+            with provider.condition:
+                depths.update({(provider.name, lane): n for lane, n in provider.queued_by_lane.items()})
+        return depths
+
+
+outbound_scheduler = OutboundScheduler()
+
+
+def _collect_metrics():
+    return [
+        ("aijobhunter_outbound_queue_depth", "Outbound requests waiting for their provider's quota.",
+         "gauge", {"provider": provider, "lane": lane}, depth)
+        for (provider, lane), depth in outbound_scheduler.queue_depths().items()
+    ]
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional
+
+from aijobhunter.tools.resume_index import file_sha256
+from aijobhunter.utils import Environment, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored profile format or the way it is produced changes.
+PROFILE_SCHEMA_VERSION = 1
+DEFAULT_PROFILE_TTL = 7 * 24 * 3600
+
+
+@dataclass
+class ProfileArtifact:
+    """A stored profiler output and what it was built from."""
+
+    github_url: str
+    resume_hash: str
+    prompt_hash: str
+    profile: str
+    created_at: float
+    version: int
+    schema_version: int = PROFILE_SCHEMA_VERSION
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class ProfileArtifactStore:
+    """On-disk store of candidate profiles.
+
+    A profile is keyed by the GitHub URL, the sha256 of the resume PDF and a
+    hash of the profile task prompt, so it is rebuilt when any of them change.
+    Profiles older than ``ttl`` seconds are treated as missing. Every rebuild
+    of the same key increments the artifact's ``version``.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl: Optional[float] = None):
+        self._root = root
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = get_cache_dir("profiles")
+        else:
+            os.makedirs(self._root, exist_ok=True)
+        return self._root
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is None:
+            self._ttl = float(
+                Environment.get_env_variable("AIJOBHUNTER_PROFILE_TTL", str(DEFAULT_PROFILE_TTL))
+            )
+        return self._ttl
+
+    @staticmethod
+    def _key(github_url: str, resume_hash: str, prompt_hash: str) -> str:
+        raw = json.dumps([PROFILE_SCHEMA_VERSION, github_url.rstrip("/").lower(), resume_hash, prompt_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def prompt_hash(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _path(self, github_url: str, resume_hash: str, prompt_hash: str) -> str:
+        return os.path.join(self.root, f"{self._key(github_url, resume_hash, prompt_hash)}.json")
+
+    def _read(self, path: str) -> Optional[ProfileArtifact]:
+        try:
+            with open(path) as f:
+                return ProfileArtifact(**json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def get(self, github_url: str, resume_path: str, prompt: str = "") -> Optional[ProfileArtifact]:
+        """Returns the stored profile if it exists and is still fresh.
+
+        Args:
+            github_url (str): Candidate GitHub URL.
+            resume_path (str): Path to the resume PDF.
+            prompt (str): The profile task prompt the profile was built with.
+
+        Returns:
+            Optional[ProfileArtifact]: The artifact, or None if missing or stale.
+        """
+        artifact = self._read(self._path(github_url, file_sha256(resume_path), self.prompt_hash(prompt)))
+        if artifact is None:
+            return None
+        if artifact.age() > self.ttl:
+            logger.info(f"Stored profile for {github_url} is stale ({artifact.age():.0f}s old)")
+            return None
+        return artifact
+
+    def put(self, github_url: str, resume_path: str, profile: str, prompt: str = "") -> ProfileArtifact:
+        """Stores a freshly built profile and returns the new artifact."""
+        resume_hash = file_sha256(resume_path)
+        prompt_hash = self.prompt_hash(prompt)
+        path = self._path(github_url, resume_hash, prompt_hash)
+        with self._lock:
+            previous = self._read(path)
+            artifact = ProfileArtifact(
+                github_url=github_url,
+                resume_hash=resume_hash,
+                prompt_hash=prompt_hash,
+                profile=profile,
+                created_at=time.time(),
+                version=previous.version + 1 if previous else 1,
+            )
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(artifact), f, indent=2)
+            os.replace(tmp_path, path)
+        logger.info(f"Stored profile v{artifact.version} for {github_url}")
+        return artifact
+
+    def forget(self, resume_hashes: Iterable[str]) -> int:
+        """Deletes the profiles built from any of these resumes. Returns how many."""
+        resume_hashes = set(resume_hashes)
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                artifact = self._read(path) if name.endswith(".json") else None
+                if artifact is not None and artifact.resume_hash in resume_hashes:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+profile_store = ProfileArtifactStore()
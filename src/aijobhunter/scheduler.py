@@ -0,0 +1,328 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from crewai import Agent, Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field, PrivateAttr
+
+from aijobhunter.checkpoints import RunCheckpoints, task_fingerprint
+from aijobhunter.compaction import bind_context_window, compact_context
+from aijobhunter.events import RunEventStream, bind_stream, current_stream, emit
+from aijobhunter.incremental import Revision, digest, plan_revision
+from aijobhunter.outbound import bind_lane, current_lane
+from aijobhunter.task_graph import ScheduleReport, build_dependencies, run_graph
+from aijobhunter.tracing import RunTrace, bind_trace, count_tokens, record_retry, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLEL_TASKS = 2
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+
+_executing = threading.local()
+
+
+def _context_window(llm: Any, task: Optional[str]) -> Optional[int]:
+    """The context window of the backend that serves ``task`` for ``llm``, if it declares one."""
+    window_for = getattr(llm, "context_window_for", None)
+    return window_for(task) if window_for else None
+
+
+class TracedAgent(Agent):
+    """crewAI Agent that records an ``agent`` span per task execution.
+
+    crewAI retries a failed execution by calling ``execute_task`` again from
+    inside the failing call, so a nested call for the same agent is counted
+    as a retry.
+    """
+
+    def execute_task(self, task: Any, context: Optional[str] = None, tools: Optional[List[Any]] = None) -> str:
+        active = getattr(_executing, "agents", None)
+        if active is None:
+            active = _executing.agents = set()
+        retry = id(self) in active
+        if retry:
+            record_retry("agent", self.role)
+        active.add(id(self))
+        try:
+            with span("agent", self.role, task=task.name, retry=retry), bind_context_window(_context_window(self.llm, task.name)):
+                return super().execute_task(task, context, tools)
+        finally:
+            if not retry:
+                active.discard(id(self))
+
+
+class DAGCrew(Crew):
+    """Crew that runs sequential-process tasks as a dependency graph.
+
+    Dependencies come from each task's ``context`` list. Every task starts as
+    soon as all of its context tasks have finished, with at most
+    ``max_parallel_tasks`` running at once, so independent stages overlap and
+    the run takes about as long as its longest chain. The timings of the last
+    run are kept in ``schedule_report`` and its spans (tasks, agents, tools,
+    LLM calls) in ``run_trace``, which is also written to a JSON file. Tasks
+    named in ``precomputed_outputs`` are not executed; their stored output is
+    used as context instead. With ``use_checkpoints``, every task output is
+    saved as the task completes, and a task whose prompt and context match a
+    saved output is restored from it instead of running again.
+
+    Given a previous run of the same application, a task whose inputs did not
+    change reuses that run's output, and the tasks in ``incremental_tasks``
+    rewrite only the sections of their previous output that the changed
+    inputs affect (see ``aijobhunter.incremental``).
+    """
+
+    max_parallel_tasks: int = Field(
+        default=DEFAULT_MAX_PARALLEL_TASKS,
+        description="Maximum number of tasks executed concurrently.",
+    )
+    precomputed_outputs: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Raw outputs by task name for tasks that should not be executed.",
+    )
+    incremental_tasks: List[str] = Field(
+        default_factory=list,
+        description="Tasks whose previous output is updated section by section when only some inputs changed.",
+    )
+    _schedule_report: Optional[ScheduleReport] = PrivateAttr(default=None)
+    _run_trace: Optional[RunTrace] = PrivateAttr(default=None)
+    _log_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _agent_locks: Dict[int, threading.Lock] = PrivateAttr(default_factory=dict)
+    _checkpoints: Optional[RunCheckpoints] = PrivateAttr(default=None)
+    _previous_checkpoints: Optional[RunCheckpoints] = PrivateAttr(default=None)
+    _input_components: Dict[str, Dict[str, str]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def schedule_report(self) -> Optional[ScheduleReport]:
+        return self._schedule_report
+
+    @property
+    def checkpoints(self) -> Optional[RunCheckpoints]:
+        return self._checkpoints
+
+    def use_checkpoints(self, checkpoints: Optional[RunCheckpoints], previous: Optional[RunCheckpoints] = None) -> None:
+        self._checkpoints = checkpoints
+        self._previous_checkpoints = previous
+
+    def use_input_components(self, components: Dict[str, Dict[str, str]]) -> None:
+        """Sets digests of what each task reads through its tools, by task name."""
+        self._input_components = components
+
+    @property
+    def run_trace(self) -> Optional[RunTrace]:
+        return self._run_trace
+
+    def _execute_tasks(
+        self,
+        tasks: List[Task],
+        start_index: Optional[int] = 0,
+        was_replayed: bool = False,
+    ) -> CrewOutput:
+        if self.process != Process.sequential:
+            return super()._execute_tasks(tasks, start_index, was_replayed)
+
+        stream = current_stream()
+        trace = self._run_trace = RunTrace()
+        checkpoints = self._checkpoints
+        try:
+            output = self._execute_graph(tasks, start_index, was_replayed, stream, trace)
+            if checkpoints is not None:
+                checkpoints.mark("succeeded")
+            return output
+        except BaseException as e:
+            if checkpoints is not None:
+                checkpoints.mark("failed", error=str(e) or type(e).__name__)
+                logger.error(f"Run {checkpoints.key} failed; completed tasks are checkpointed. Resume with: replay {checkpoints.key}")
+            raise
+        finally:
+            if checkpoints is not None:
+                checkpoints.release()
+            try:
+                path = trace.write()
+                logger.info(f"Wrote run trace to {path}")
+            except OSError as e:
+                logger.warning(f"Could not write run trace: {e}")
+
+    def _execute_graph(
+        self,
+        tasks: List[Task],
+        start_index: Optional[int],
+        was_replayed: bool,
+        stream: Optional[RunEventStream],
+        trace: RunTrace,
+    ) -> CrewOutput:
+        dependencies = build_dependencies(tasks)
+        done = {
+            i for i, task in enumerate(tasks)
+            if start_index is not None and i < start_index and task.output
+        }
+        for i, task in enumerate(tasks):
+            if task.name in self.precomputed_outputs:
+                task.output = TaskOutput(
+                    description=task.description,
+                    name=task.name,
+                    expected_output=task.expected_output,
+                    raw=self.precomputed_outputs[task.name],
+                    agent=task.agent.role if task.agent else "",
+                )
+                done.add(i)
+                if stream is not None:
+                    stream.emit("task_completed", task=task.name, output=task.output.raw, precomputed=True)
+        lane = current_lane()
+
+        def run(i: int) -> TaskOutput:
+            with bind_stream(stream, task=self._task_label(tasks[i], i)), bind_trace(trace), bind_lane(lane):
+                return self._execute_task(tasks[i], i, was_replayed)
+
+        labels = [self._task_label(task, i) for i, task in enumerate(tasks)]
+        _, self._schedule_report = run_graph(labels, dependencies, run, self.max_parallel_tasks, done)
+        logger.info(self._schedule_report.summary())
+        return self._create_crew_output([tasks[-1].output])
+
+    def _get_context(self, task: Task, task_outputs: List[TaskOutput]) -> str:
+        """Joins the context tasks' outputs, compacted to the agent model's token budget."""
+        outputs = [t.output for t in task.context if t.output is not None] if task.context else task_outputs
+        context_window = _context_window(getattr(task.agent, "llm", None), task.name)
+        result = compact_context([output.raw for output in outputs], context_window, CONTEXT_DIVIDER)
+        if result.tokens_saved:
+            logger.info(f"Context of {task.name}: {result.tokens_before} -> {result.tokens_after} tokens")
+        return result.text
+
+    @staticmethod
+    def _task_label(task: Task, index: int) -> str:
+        return task.name or f"task_{index}"
+
+    def _task_components(self, task: Task, name: str) -> Dict[str, str]:
+        """Digests of everything the task's output is made from.
+
+        That is its prompt template, the inputs interpolated into it, the
+        outputs of its context tasks and what its tools read.
+        """
+        template = "\0".join([
+            task._original_description or task.description,
+            task._original_expected_output or task.expected_output,
+        ])
+        components = {"template": digest(template)}
+        for key in sorted(set(re.findall(r"\{(\w+)\}", template))):
+            components[f"input:{key}"] = digest(str((self._inputs or {}).get(key, "")))
+        for upstream in task.context or []:
+            components[f"context:{upstream.name}"] = digest(upstream.output.raw if upstream.output else "")
+        components.update(self._input_components.get(name, {}))
+        return components
+
+    def _execute_task(self, task: Task, task_index: int, was_replayed: bool) -> TaskOutput:
+        agent_to_use = self._get_agent_to_use(task)
+        if agent_to_use is None:
+            raise ValueError(
+                f"No agent available for task: {task.description}. Ensure that either the task has an assigned agent or a manager agent is provided."
+            )
+
+        name = self._task_label(task, task_index)
+        context = self._get_context(task, [])
+        components = self._task_components(task, name)
+        tool_inputs = sorted(self._input_components.get(name, {}).items())
+        fingerprint = task_fingerprint(
+            task.description, task.expected_output, context, *(f"{key}={value}" for key, value in tool_inputs)
+        )
+        revision = None
+        if self._checkpoints is not None:
+            restored = self._restore_checkpoint(task, task_index, agent_to_use, fingerprint, components)
+            if restored is not None:
+                return restored
+            revision = self._plan_revision(name, components)
+            if revision is not None and not revision.sections:
+                logger.info(f"Reused {name}; none of its sections depend on what changed ({', '.join(revision.changed)})")
+                self._checkpoints.save(name, fingerprint, revision.previous, agent_to_use.role, components)
+                return self._reuse_output(task, agent_to_use, revision.previous, agent_to_use.role)
+
+        tools_for_task = task.tools or agent_to_use.tools or []
+        tools_for_task = self._prepare_tools(agent_to_use, task, tools_for_task)
+
+        emit("task_started", task=task.name, agent=agent_to_use.role)
+        with self._log_lock:
+            self._log_task_start(task, agent_to_use.role)
+            # An agent keeps per-execution state, so tasks sharing one run one at a time.
+            agent_lock = self._agent_locks.setdefault(id(agent_to_use), threading.Lock())
+        if revision is not None:
+            logger.info(
+                f"Rewriting the {', '.join(sorted(revision.sections))} sections of {name}; "
+                f"changed: {', '.join(revision.changed)}"
+            )
+            # Tasks are shared between threads, so the instructions travel
+            # with this execution's context rather than the task description.
+            context = CONTEXT_DIVIDER.join(part for part in (context, revision.instructions()) if part)
+        with agent_lock, span("task", name, agent=agent_to_use.role) as record:
+            # The agent lock keeps other tasks off this agent's token counter.
+            with count_tokens(record, getattr(agent_to_use, "_token_process", None)):
+                task_output = task.execute_sync(
+                    agent=agent_to_use,
+                    context=context,
+                    tools=tools_for_task,
+                )
+        if revision is not None:
+            task_output.raw = revision.merge(task_output.raw)
+            if task.output_file:
+                task._save_file(task_output.raw)
+        if self._checkpoints is not None:
+            self._checkpoints.save(name, fingerprint, task_output.raw, agent_to_use.role, components)
+        with self._log_lock:
+            self._process_task_result(task, task_output)
+            self._store_execution_log(task, task_output, task_index, was_replayed)
+        emit(
+            "task_completed",
+            task=task.name,
+            agent=agent_to_use.role,
+            output=task_output.raw,
+            output_file=task.output_file,
+        )
+        return task_output
+
+    def _restore_checkpoint(
+        self, task: Task, task_index: int, agent: Any, fingerprint: str, components: Dict[str, str]
+    ) -> Optional[TaskOutput]:
+        name = self._task_label(task, task_index)
+        checkpoint = self._checkpoints.load(name, fingerprint)
+        if checkpoint is not None:
+            logger.info(f"Restored {name} from run {self._checkpoints.key}")
+            return self._reuse_output(task, agent, checkpoint.raw, checkpoint.agent)
+        previous = self._previous_checkpoints
+        checkpoint = previous.load(name, fingerprint) if previous is not None else None
+        if checkpoint is not None:
+            logger.info(f"Reused {name} from run {previous.key}; its inputs have not changed")
+            self._checkpoints.save(name, fingerprint, checkpoint.raw, checkpoint.agent, components)
+            return self._reuse_output(task, agent, checkpoint.raw, checkpoint.agent)
+        return None
+
+    def _plan_revision(self, name: str, components: Dict[str, str]) -> Optional[Revision]:
+        """Plans a section-wise update of the task's latest output, from this run or the previous one."""
+        if name not in self.incremental_tasks:
+            return None
+        for run in (self._checkpoints, self._previous_checkpoints):
+            checkpoint = run.latest(name) if run is not None else None
+            if checkpoint is not None:
+                return plan_revision(checkpoint.raw, checkpoint.components, components)
+        return None
+
+    def _reuse_output(self, task: Task, agent: Any, raw: str, agent_role: str) -> TaskOutput:
+        task.output = TaskOutput(
+            description=task.description,
+            name=task.name,
+            expected_output=task.expected_output,
+            raw=raw,
+            agent=agent_role,
+        )
+        if task.output_file:
+            # The run may write to a new output directory; the file must still be there.
+            task._save_file(raw)
+        emit(
+            "task_completed",
+            task=task.name,
+            agent=agent.role,
+            output=raw,
+            output_file=task.output_file,
+            resumed=True,
+        )
+        return task.output
@@ -0,0 +1,89 @@
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Optional
+
+DEFAULT_MODULES = ["aijobhunter.crew"]
+DEFAULT_TOP = 20
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\| ( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".")[0]
+
+
+def measure_imports(module: str) -> List[ImportTiming]:
+    """Imports ``module`` in a fresh interpreter and returns its import timings.
+
+    Uses ``python -X importtime``, so nothing already imported in the
+    current process skews the numbers.
+
+    Raises:
+        RuntimeError: If the module cannot be imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            timings.append(ImportTiming(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2,
+            ))
+    return timings
+
+
+def format_report(module: str, timings: List[ImportTiming], top: int = DEFAULT_TOP) -> str:
+    """Summarizes the timings by top-level package and by slowest import."""
+    total = sum(t.cumulative_us for t in timings if t.depth == 0)
+    by_package = defaultdict(int)
+    for timing in timings:
+        by_package[timing.package] += timing.self_us
+
+    lines = [f"import {module}: {total / 1e6:.3f}s, {len(timings)} modules", "", "By package (self time):"]
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {self_us / 1e6:8.3f}s  {100 * self_us / max(total, 1):5.1f}%  {package}")
+    lines += ["", "Slowest imports (cumulative):"]
+    for timing in sorted(timings, key=lambda t: -t.cumulative_us)[:top]:
+        lines.append(f"  {timing.cumulative_us / 1e6:8.3f}s  {timing.module}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Prints the import-time breakdown of the given modules."""
+    parser = argparse.ArgumentParser(prog="startup_profile", description="Import-time breakdown")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES,
+                        help="modules to import, e.g. app or aijobhunter.crew")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args(argv)
+
+    for i, module in enumerate(args.modules):
+        if i:
+            print()
+        print(format_report(module, measure_imports(module), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
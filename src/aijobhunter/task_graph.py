@@ -0,0 +1,147 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def build_dependencies(tasks: Sequence[Any]) -> Dict[int, List[int]]:
+    """Maps each task index to the indices of the tasks listed in its ``context``.
+
+    Tasks without a context have no dependencies and may start immediately.
+
+    Raises:
+        ValueError: If a task depends on a task that is not part of ``tasks``.
+    """
+    index_of = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = {}
+    for i, task in enumerate(tasks):
+        deps = []
+        for upstream in task.context or []:
+            if id(upstream) not in index_of:
+                raise ValueError(
+                    f"Task {task.name or i} depends on a task that is not part of the crew"
+                )
+            deps.append(index_of[id(upstream)])
+        dependencies[i] = deps
+    return dependencies
+
+
+@dataclass
+class TaskTiming:
+    name: str
+    started_at: float
+    finished_at: float
+    dependencies: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class ScheduleReport:
+    """Timings of one DAG execution and the chain that bounded its wall time."""
+
+    started_at: float
+    finished_at: float
+    timings: Dict[str, TaskTiming]
+    critical_path: List[str]
+
+    @property
+    def wall_time(self) -> float:
+        return self.finished_at - self.started_at
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(self.timings[name].duration for name in self.critical_path)
+
+    def summary(self) -> str:
+        lines = [f"Wall time {self.wall_time:.1f}s, critical path {self.critical_path_time:.1f}s:"]
+        lines += [f"  {name}: {self.timings[name].duration:.1f}s" for name in self.critical_path]
+        return "\n".join(lines)
+
+
+def critical_path(timings: Dict[str, TaskTiming]) -> List[str]:
+    """Returns the dependency chain with the largest total duration."""
+    longest: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+
+    def visit(name: str) -> float:
+        if name not in longest:
+            best, best_dep = 0.0, None
+            for dep in timings[name].dependencies:
+                if dep in timings and visit(dep) > best:
+                    best, best_dep = visit(dep), dep
+            longest[name] = best + timings[name].duration
+            previous[name] = best_dep
+        return longest[name]
+
+    if not timings:
+        return []
+    end = max(timings, key=visit)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = previous[end]
+    return path[::-1]
+
+
+def run_graph(
+    labels: List[str],
+    dependencies: Dict[int, List[int]],
+    run: Callable[[int], Any],
+    max_workers: int,
+    done: Iterable[int] = (),
+) -> Tuple[List[Any], ScheduleReport]:
+    """Calls ``run(i)`` for every task ``i`` not in ``done``, each once its dependencies are done.
+
+    At most ``max_workers`` tasks run at once. Results are returned in the
+    order of ``labels``, whatever order the tasks finished in, with ``None``
+    for the tasks that were already done. The first error a task raises is
+    re-raised once it is seen, and tasks that have not started by then never
+    start.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle.
+    """
+    done = set(done)
+    pending = [i for i in range(len(labels)) if i not in done]
+    results: List[Any] = [None] * len(labels)
+    running: Dict[Future, int] = {}
+    started: Dict[int, float] = {}
+    timings: Dict[str, TaskTiming] = {}
+    run_started = time.time()
+
+    def timed(i: int) -> Any:
+        started[i] = time.time()
+        return run(i)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aijobhunter-task") as executor:
+        while pending or running:
+            ready = [i for i in pending if all(dep in done for dep in dependencies[i])]
+            for i in ready:
+                pending.remove(i)
+                running[executor.submit(timed, i)] = i
+
+            if not running:
+                raise ValueError("Task dependencies contain a cycle")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = running.pop(future)
+                results[i] = future.result()
+                done.add(i)
+                timings[labels[i]] = TaskTiming(
+                    name=labels[i],
+                    started_at=started[i],
+                    finished_at=time.time(),
+                    dependencies=[labels[d] for d in dependencies[i]],
+                )
+
+    report = ScheduleReport(
+        started_at=run_started,
+        finished_at=time.time(),
+        timings=timings,
+        critical_path=critical_path(timings),
+    )
+    return results, report
@@ -0,0 +1,105 @@
+import json
+import logging
+import re
+from typing import Any
+
+import requests
+from bs4 import BeautifulSoup
+from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+
+from aijobhunter.compaction import compact_page
+from aijobhunter.tools.http_cache import get_fetch_client
+from aijobhunter.tracing import TracedToolMixin
+from aijobhunter.utils import Environment, MissingEnvironmentVariableError
+
+logger = logging.getLogger(__name__)
+
+SERPER_URL = "https://google.serper.dev"
+SERPER_SEARCH_TYPES = ("search", "news")
+
+
+class CachedScrapeWebsiteTool(TracedToolMixin, ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that fetches through the shared FetchClient.
+
+    Repeated reads of the same page within a run (the job posting, the GitHub
+    profile) are served from the response cache over pooled connections. The
+    page text leaves out scripts, styles, navigation and job board boilerplate,
+    and is compacted to the calling model's tool output budget.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url)
+        page = get_fetch_client().get(
+            website_url,
+            timeout=15,
+            headers=self.headers,
+            cookies=self.cookies if self.cookies else {},
+        )
+
+        parsed = BeautifulSoup(page.text, "html.parser")
+        for tag in parsed(["script", "style", "noscript", "svg", "template", "nav", "footer"]):
+            tag.decompose()
+
+        text = parsed.get_text(" ")
+        text = re.sub("[ \t]+", " ", text)
+        text = re.sub("\\s+\n\\s+", "\n", text)
+        return compact_page(self.name, text)
+
+
+class CachedSerperDevTool(TracedToolMixin, SerperDevTool):
+    """SerperDevTool whose API calls go through the shared FetchClient.
+
+    Identical queries reuse the cached response instead of spending Serper
+    quota again, and new ones are sent within the Serper rate limit. The
+    search runs in ``_run`` against the documented Serper API rather than
+    through SerperDevTool's internal helpers; the response is returned as
+    Serper sent it, with every list cut to ``n_results`` entries.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        search_query = kwargs.get("search_query") or kwargs.get("query")
+        search_type = kwargs.get("search_type", self.search_type)
+        results = self._search(search_query, search_type)
+        formatted = {"searchParameters": {"q": search_query, "type": search_type,
+                                          **results.get("searchParameters", {})}}
+        for key, value in results.items():
+            if key != "searchParameters":
+                formatted[key] = value[:self.n_results] if isinstance(value, list) else value
+        return formatted
+
+    def _search(self, search_query: str, search_type: str) -> dict:
+        api_key = Environment.get_env_variable("SERPER_API_KEY")
+        if not api_key:
+            logger.error("SERPER_API_KEY is missing or empty!")
+            raise MissingEnvironmentVariableError("SERPER_API_KEY")
+        if search_type not in SERPER_SEARCH_TYPES:
+            raise ValueError(f"Invalid search type {search_type!r}; expected one of {SERPER_SEARCH_TYPES}")
+        headers = {
+            "X-API-KEY": api_key,
+            "content-type": "application/json",
+        }
+        response = None
+        try:
+            response = get_fetch_client().post_json(
+                f"{SERPER_URL}/{search_type}", {"q": search_query, "num": self.n_results}, headers=headers,
+                timeout=10, provider="serper",
+            )
+            response.raise_for_status()
+            results = response.json()
+            if not results:
+                logger.error("Empty response from Serper API")
+                raise ValueError("Empty response from Serper API")
+            return results
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Error making request to Serper API: {e}"
+            if response is not None:
+                error_msg += f"\nResponse content: {response.text}"
+            logger.error(error_msg)
+            raise
+        except json.JSONDecodeError as e:
+            if response is not None:
+                logger.error(f"Error decoding JSON response: {e}")
+                logger.error(f"Response content: {response.text}")
+            else:
+                logger.error(f"Error decoding JSON response: {e} (No response available)")
+            raise
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from aijobhunter.outbound import outbound_scheduler
+from aijobhunter.tracing import metrics
+from aijobhunter.utils import Environment, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_POOL_SIZE = 16
+
+
+@dataclass
+class CachedResponse:
+    """The parts of an HTTP response the tools need, in a cacheable form."""
+
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    text: str
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+@dataclass
+class FetchStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    deduplicated: int = 0
+
+
+class FetchClient:
+    """Shared HTTP layer for the web tools.
+
+    All requests go through one ``requests.Session`` whose connection pool keeps
+    connections alive across tool calls. Successful responses are cached in an
+    in-memory LRU with a TTL and, when ``disk_dir`` is set, in JSON files that
+    survive restarts. Concurrent requests for the same key wait for the one
+    already in flight instead of issuing their own.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_dir: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        session: Optional[requests.Session] = None,
+    ):
+        """Initializes the FetchClient.
+
+        Args:
+            ttl (float): Seconds a cached response stays valid. 0 disables caching.
+            max_entries (int): Maximum responses kept in memory.
+            disk_dir (Optional[str]): Directory for the on-disk cache, if any.
+            pool_size (int): Keep-alive connections kept per host.
+            session (Optional[requests.Session]): Session to use instead of a new one.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.stats = FetchStats()
+        self._memory: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(method: str, url: str, body: Any = None, cookies: Optional[dict] = None) -> str:
+        raw = json.dumps([method.upper(), url, body, cookies or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, headers: Optional[dict] = None, cookies: Optional[dict] = None,
+            timeout: float = 15, use_cache: bool = True, provider: Optional[str] = None) -> CachedResponse:
+        """Fetches ``url`` with GET, serving it from cache when possible."""
+        key = self._make_key("GET", url, cookies=cookies)
+        return self._fetch(key, use_cache, self._scheduled(provider, lambda: self.session.get(
+            url, headers=headers, cookies=cookies or {}, timeout=timeout
+        )))
+
+    def post_json(self, url: str, payload: Any, headers: Optional[dict] = None,
+                  timeout: float = 10, use_cache: bool = True, provider: Optional[str] = None) -> CachedResponse:
+        """POSTs a JSON payload. Headers (e.g. API keys) are not part of the cache key."""
+        key = self._make_key("POST", url, body=payload)
+        return self._fetch(key, use_cache, self._scheduled(provider, lambda: self.session.post(
+            url, headers=headers, json=payload, timeout=timeout
+        )))
+
+    @staticmethod
+    def _scheduled(provider: Optional[str], send):
+        """Sends requests to an API ``provider`` through the outbound scheduler.
+
+        Only cache misses reach the provider, so only they count against its
+        quota. 429 and 5xx responses are raised so that they are retried.
+        """
+        if provider is None:
+            return send
+
+        def attempt():
+            response = send()
+            if response.status_code == 429 or response.status_code >= 500:
+                response.raise_for_status()
+            return response
+
+        return lambda: outbound_scheduler.call(provider, attempt)
+
+    def _fetch(self, key: str, use_cache: bool, send) -> CachedResponse:
+        use_cache = use_cache and self.ttl > 0
+        # The memory lookup and the in-flight registration happen under one
+        # lock, so a request either finds the response, joins the request in
+        # flight or becomes the one that sends it.
+        with self._lock:
+            cached = self._lookup_memory(key) if use_cache else None
+            if cached is not None:
+                return cached
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats.deduplicated += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._lookup_disk(key) if use_cache else None
+            if result is None:
+                with self._lock:
+                    self.stats.misses += 1
+                response = send()
+                response.encoding = response.apparent_encoding
+                result = CachedResponse(
+                    url=response.url,
+                    status_code=response.status_code,
+                    headers=dict(response.headers),
+                    text=response.text,
+                )
+                if use_cache and result.ok:
+                    self._store(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _lookup_memory(self, key: str) -> Optional[CachedResponse]:
+        """Returns the unexpired response in memory. The caller holds the lock."""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        self.stats.hits += 1
+        return response
+
+    def _lookup_disk(self, key: str) -> Optional[CachedResponse]:
+        if not self.disk_dir:
+            return None
+        path = os.path.join(self.disk_dir, f"{key}.json")
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data["expires_at"] <= time.time():
+            return None
+        response = CachedResponse(**data["response"])
+        self._remember(key, data["expires_at"], response)
+        with self._lock:
+            self.stats.disk_hits += 1
+        return response
+
+    def _remember(self, key: str, expires_at: float, response: CachedResponse) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, response)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, key: str, response: CachedResponse) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, response)
+        if self.disk_dir:
+            path = os.path.join(self.disk_dir, f"{key}.json")
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"expires_at": expires_at, "response": asdict(response)}, f)
+            os.replace(tmp_path, path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+_default_client: Optional[FetchClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_fetch_client() -> FetchClient:
+    """Returns the process-wide FetchClient, configured from the environment.
+
+    ``AIJOBHUNTER_HTTP_CACHE_TTL`` sets the TTL in seconds (default 3600) and
+    ``AIJOBHUNTER_HTTP_CACHE_DISK=1`` enables the on-disk cache.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                ttl = float(Environment.get_env_variable("AIJOBHUNTER_HTTP_CACHE_TTL", str(DEFAULT_TTL)))
+                use_disk = Environment.get_env_variable("AIJOBHUNTER_HTTP_CACHE_DISK", "0") == "1"
+                _default_client = FetchClient(
+                    ttl=ttl, disk_dir=get_cache_dir("http") if use_disk else None
+                )
+    return _default_client
+
+
+def set_fetch_client(client: Optional[FetchClient]) -> None:
+    """Replaces the process-wide FetchClient; None restores the default on next use."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def _collect_metrics():
+    if _default_client is None:
+        return []
+    stats = _default_client.stats
+    description = "HTTP fetches of the web tools by how they were served."
+    return [
+        ("aijobhunter_http_fetches_total", description, "counter", {"result": "hit"}, stats.hits),
+        ("aijobhunter_http_fetches_total", description, "counter", {"result": "disk_hit"}, stats.disk_hits),
+        ("aijobhunter_http_fetches_total", description, "counter", {"result": "deduplicated"}, stats.deduplicated),
+        ("aijobhunter_http_fetches_total", description, "counter", {"result": "miss"}, stats.misses),
+    ]
+
+
+metrics.register_collector(_collect_metrics)
@@ -1,24 +1,31 @@
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
-import fitz
 from typing import Optional
 
+from aijobhunter.compaction import compact_document
+from aijobhunter.tools.pdf_extraction import extraction_cache
+from aijobhunter.tracing import TracedToolMixin
+
 class PDFContentReaderInput(BaseModel):
     """Input schema for PDFContentReader."""
     file_path: str = Field(..., description="Path to the PDF file.")
+    pages: Optional[str] = Field(
+        None,
+        description="Optional pages to read, e.g. '1-2' or '1,3'. Reads every page when omitted.",
+    )
 
-class PDFContentReader(BaseTool):
+class PDFContentReader(TracedToolMixin, BaseTool):
     name: str = "PDF Content Reader"
     description: str = (
         "A tool that reads and extracts text from a given PDF file."
     )
     args_schema: Type[BaseModel] = PDFContentReaderInput
     file_path: Optional[str] = None
-    
+
     def __init__(self, file_path: Optional[str] = None, **kwargs):
         """Initializes the PDFContentReader tool.
-        
+
         Args:
             file_path (Optional[str]): Path to the PDF file to read.
             **kwargs: Additional keyword arguments passed to BaseTool.
@@ -26,32 +33,41 @@ class PDFContentReader(BaseTool):
         if file_path is not None:
             kwargs["description"] = (
                 f"A tool that reads and extracts text from a given PDF file. "
-                f"The default file path is {file_path}, but you can provide a different 'file_path' parameter to read another file."
+                f"The default file path is {file_path}, but you can provide a different 'file_path' "
+                f"parameter to read another file. "
+                f"Pass 'pages' (e.g. '1-2') to read only part of the document."
             )
-        
+
         super().__init__(**kwargs)
         self.file_path = file_path
 
     def _run(self, **kwargs) -> str:
         """Reads and extracts text from a given PDF file.
-        
+
         Args:
-            **kwargs: Additional keyword arguments.
-        
+            **kwargs: Additional keyword arguments. ``file_path`` overrides the
+                default file and ``pages`` selects a page range.
+
         Returns:
-            str: Extracted text from the PDF file.
+            str: Extracted text from the PDF file, one section per page,
+                without page numbers and repeated lines if it is over the
+                calling model's tool output budget.
         """
         file_path = kwargs.get("file_path", self.file_path)
         if file_path is None:
-            return "Error: No file path provided. Please provide a file path either in the constructor or as an argument."
-        
-        text = ""
-        with fitz.open(file_path) as pdf_file:
-            for page in pdf_file:
-                text += page.get_text()
-        
-        return text
-    
+            return (
+                "Error: No file path provided. "
+                "Please provide a file path either in the constructor or as an argument."
+            )
+
+        try:
+            pages = extraction_cache.get_pages(file_path, kwargs.get("pages"))
+        except ValueError as e:
+            return f"Error: {e}"
+
+        texts = compact_document(self.name, [page.text for page in pages])
+        return "\n".join(f"--- Page {page.number} ---\n{text}" for page, text in zip(pages, texts))
+
 if __name__ == "__main__":
     # Example usage
     file_path = "./knowledge/CV_YuvalMehta.pdf"
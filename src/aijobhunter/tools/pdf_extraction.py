@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz
+
+from aijobhunter.tools.resume_index import file_sha256
+
+DEFAULT_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class PageText:
+    """Text of a single PDF page; ``number`` is 1-based."""
+    number: int
+    text: str
+
+
+def parse_page_range(pages: Optional[str], page_count: int) -> List[int]:
+    """Parses a page selection such as ``"1-2,4"`` into 0-based page indices.
+
+    Args:
+        pages (Optional[str]): Comma separated page numbers or ranges. ``None``
+            or an empty string selects every page.
+        page_count (int): Number of pages in the document.
+
+    Returns:
+        List[int]: Sorted, de-duplicated 0-based indices within the document.
+
+    Raises:
+        ValueError: If a part is malformed or selects pages outside the document.
+    """
+    if not pages or not pages.strip():
+        return list(range(page_count))
+
+    selected = set()
+    for part in pages.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start) if start.strip() else 1
+            last = (int(end) if end.strip() else page_count) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(
+                f"Pages {part!r} are outside the document, which has {page_count} pages"
+            )
+        selected.update(range(first - 1, last))
+    return sorted(selected)
+
+
+class PDFExtractionCache:
+    """LRU cache of extracted page text.
+
+    Files are identified by their content hash, which ``file_sha256``
+    remembers by (path, mtime, size), so unchanged files are never re-read
+    and a copy of the same PDF under another path reuses the stored text.
+    Pages are filled in as they are requested, so reading a page range only
+    extracts those pages.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, Tuple[int, Dict[int, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def iter_pages(self, file_path: str, pages: Optional[str] = None) -> Iterator[PageText]:
+        """Yields the text of the selected pages lazily.
+
+        Args:
+            file_path (str): Path to the PDF file.
+            pages (Optional[str]): Page selection, e.g. ``"1-2"``. Defaults to
+                all pages.
+
+        Yields:
+            PageText: One entry per selected page, in page order.
+        """
+        content_hash = file_sha256(file_path)
+        with self._lock:
+            entry = self._documents.get(content_hash)
+            if entry is not None:
+                self._documents.move_to_end(content_hash)
+
+        if entry is not None:
+            page_count, cached = entry
+            indices = parse_page_range(pages, page_count)
+            if all(i in cached for i in indices):
+                for i in indices:
+                    yield PageText(i + 1, cached[i])
+                return
+
+        with fitz.open(file_path) as pdf_file:
+            with self._lock:
+                entry = self._documents.get(content_hash)
+                if entry is None:
+                    entry = (pdf_file.page_count, {})
+                    self._documents[content_hash] = entry
+                    while len(self._documents) > self.max_entries:
+                        self._documents.popitem(last=False)
+            page_count, cached = entry
+            for i in parse_page_range(pages, page_count):
+                text = cached.get(i)
+                if text is None:
+                    text = pdf_file[i].get_text()
+                    cached[i] = text
+                yield PageText(i + 1, text)
+
+    def get_pages(self, file_path: str, pages: Optional[str] = None) -> List[PageText]:
+        return list(self.iter_pages(file_path, pages))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+
+
+extraction_cache = PDFExtractionCache()
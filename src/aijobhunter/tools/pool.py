@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from aijobhunter.tools.resume_index import DEFAULT_EMBEDDING_MODEL, DEFAULT_MAX_LOADED_RESUMES
+from aijobhunter.utils import Environment
+
+if TYPE_CHECKING:
+    from aijobhunter.tools.cached_web_tools import CachedScrapeWebsiteTool, CachedSerperDevTool
+    from aijobhunter.tools.pdf_content_reader import PDFContentReader
+    from aijobhunter.tools.resume_search_tool import ResumeSearchTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESUME_SEARCH_CONFIG: Dict[str, Any] = dict(
+    embedder=dict(
+        provider="huggingface",
+        config=dict(
+            model=DEFAULT_EMBEDDING_MODEL,
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ToolSet:
+    """The tools handed to the AIjobhunter agents for one resume."""
+
+    search_tool: "CachedSerperDevTool"
+    scrape_tool: "CachedScrapeWebsiteTool"
+    read_resume: "PDFContentReader"
+    semantic_search_job: "ResumeSearchTool"
+
+
+class ToolPool:
+    """Process-wide cache of initialized tool sets.
+
+    Building the resume search tool may load the embedding model and embed the
+    resume, which takes seconds. The pool builds each tool set once per
+    (resume file, config) pair and hands the same instances to every crew, so
+    concurrent runs share one embedder instead of loading their own. At most
+    ``max_entries`` tool sets are kept; the least recently used is dropped
+    first, so serving many candidates does not grow memory without bound.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(
+                Environment.get_env_variable("AIJOBHUNTER_MAX_LOADED_RESUMES", str(DEFAULT_MAX_LOADED_RESUMES))
+            )
+        self.max_entries = max_entries
+        self._tool_sets: "OrderedDict[Tuple[str, str, int, int], ToolSet]" = OrderedDict()
+        self._key_locks: Dict[Tuple[str, str, int, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(file_path: str, config: Dict[str, Any]) -> Tuple[str, str, int, int]:
+        # The file's mtime and size are part of the key, so a resume replaced
+        # in place gets fresh tools and the stale set ages out of the LRU.
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), json.dumps(config, sort_keys=True), stat.st_mtime_ns, stat.st_size
+
+    def get(self, file_path: str, config: Optional[Dict[str, Any]] = None) -> ToolSet:
+        """Returns the tool set for a resume, building it on first use.
+
+        Args:
+            file_path (str): Path to the resume PDF.
+            config (Optional[Dict[str, Any]]): Resume search config. Defaults to
+                ``DEFAULT_RESUME_SEARCH_CONFIG``.
+
+        Returns:
+            ToolSet: Shared, ready-to-use tools.
+        """
+        if config is None:
+            config = DEFAULT_RESUME_SEARCH_CONFIG
+        key = self._make_key(file_path, config)
+
+        tool_set = self._get_cached(key)
+        if tool_set is not None:
+            return tool_set
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Build under a per-key lock so a slow embedder load for one resume
+        # does not block lookups for others.
+        with key_lock:
+            tool_set = self._get_cached(key)
+            if tool_set is None:
+                logger.info(f"Initializing tools for {key[0]}")
+                tool_set = self._build(file_path, config)
+                with self._lock:
+                    self._tool_sets[key] = tool_set
+                    while len(self._tool_sets) > self.max_entries:
+                        evicted, _ = self._tool_sets.popitem(last=False)
+                        self._key_locks.pop(evicted, None)
+        return tool_set
+
+    def _get_cached(self, key: Tuple[str, str, int, int]) -> Optional[ToolSet]:
+        with self._lock:
+            tool_set = self._tool_sets.get(key)
+            if tool_set is not None:
+                self._tool_sets.move_to_end(key)
+            return tool_set
+
+    def _build(self, file_path: str, config: Dict[str, Any]) -> ToolSet:
+        # crewai_tools pulls in langchain, embedchain and chromadb; only pay
+        # for that once tools are actually needed.
+        from aijobhunter.tools.cached_web_tools import CachedScrapeWebsiteTool, CachedSerperDevTool
+        from aijobhunter.tools.pdf_content_reader import PDFContentReader
+        from aijobhunter.tools.resume_search_tool import ResumeSearchTool
+
+        return ToolSet(
+            search_tool=CachedSerperDevTool(),
+            scrape_tool=CachedScrapeWebsiteTool(),
+            read_resume=PDFContentReader(file_path),
+            semantic_search_job=ResumeSearchTool(
+                file_path, model_name=config["embedder"]["config"]["model"]
+            ),
+        )
+
+    def evict(self, file_path: str, config: Optional[Dict[str, Any]] = None) -> None:
+        """Drops the cached tool sets for a resume, e.g. after it was replaced or deleted."""
+        path = os.path.abspath(file_path)
+        config_key = json.dumps(config if config is not None else DEFAULT_RESUME_SEARCH_CONFIG, sort_keys=True)
+        with self._lock:
+            for key in [key for key in self._tool_sets if key[:2] == (path, config_key)]:
+                self._tool_sets.pop(key, None)
+                self._key_locks.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tool_sets.clear()
+            self._key_locks.clear()
+
+
+tool_pool = ToolPool()
@@ -0,0 +1,378 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from aijobhunter.utils import Environment, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-large-en-v1.5"
+DEFAULT_CHUNK_SIZE = 1000
+HASHING_EMBEDDING_MODEL = "hashing"
+HASHING_DIMENSIONS = 256
+DEFAULT_MAX_LOADED_RESUMES = 256
+MAX_FILE_HASHES = 1024
+
+_embedders: Dict[str, object] = {}
+_embedders_lock = threading.Lock()
+
+
+class HashingEmbedder:
+    """Deterministic, CPU-only stand-in for the HuggingFace embedder.
+
+    Words are hashed into a fixed number of buckets. It needs no model
+    download, so it serves offline runs (the benchmark harness) and hosts
+    where the embedding model cannot be loaded.
+    """
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimensions] += 1
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def get_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Returns a process-wide HuggingFace embedder for ``model_name``.
+
+    The model is loaded on first use only, so building an index that is
+    already on disk never pays for it. ``HASHING_EMBEDDING_MODEL`` names the
+    ``HashingEmbedder``.
+    """
+    embedder = _embedders.get(model_name)
+    if embedder is None:
+        with _embedders_lock:
+            embedder = _embedders.get(model_name)
+            if embedder is None and model_name == HASHING_EMBEDDING_MODEL:
+                embedder = _embedders[model_name] = HashingEmbedder()
+            elif embedder is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+
+                logger.info(f"Loading embedding model {model_name}")
+                embedder = HuggingFaceEmbeddings(
+                    model_name=model_name,
+                    encode_kwargs={"normalize_embeddings": True},
+                )
+                _embedders[model_name] = embedder
+    return embedder
+
+
+def register_embedder(model_name: str, embedder) -> None:
+    """Makes ``get_embedder(model_name)`` return ``embedder`` instead of loading the model.
+
+    ``embedder`` needs ``embed_documents`` and ``embed_query`` like the
+    HuggingFace embedder. Used to run offline, e.g. by the benchmark harness.
+    """
+    with _embedders_lock:
+        _embedders[model_name] = embedder
+
+
+_file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_file_hashes_lock = threading.Lock()
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's content.
+
+    Remembered by (path, mtime, size) for the last ``MAX_FILE_HASHES`` files,
+    so looking up an unchanged file again does not re-read it.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        content_hash = _file_hashes.get(key)
+        if content_hash is not None:
+            _file_hashes.move_to_end(key)
+            return content_hash
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    content_hash = digest.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[key] = content_hash
+        while len(_file_hashes) > MAX_FILE_HASHES:
+            _file_hashes.popitem(last=False)
+    return content_hash
+
+
+def _text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_pdf(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+    """Splits a PDF into chunks of whole text blocks.
+
+    Chunks never span pages and are packed from consecutive layout blocks, so
+    editing one part of a document only changes the chunks around the edit.
+    """
+    import fitz
+
+    chunks = []
+    with fitz.open(file_path) as pdf_file:
+        for page in pdf_file:
+            current: List[str] = []
+            current_len = 0
+            for block in page.get_text("blocks"):
+                text = block[4].strip()
+                if not text:
+                    continue
+                if current and current_len + len(text) > chunk_size:
+                    chunks.append("\n".join(current))
+                    current, current_len = [], 0
+                current.append(text)
+                current_len += len(text) + 1
+            if current:
+                chunks.append("\n".join(current))
+    return chunks
+
+
+@dataclass
+class ResumeIndex:
+    """Chunks of one document and their (memory-mapped) embeddings."""
+
+    doc_hash: str
+    model_name: str
+    chunks: List[str]
+    chunk_hashes: List[str]
+    embeddings: np.ndarray
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """Returns the ``top_k`` chunks most similar to ``query``."""
+        if not self.chunks:
+            return []
+        query_vector = np.asarray(get_embedder(self.model_name).embed_query(query), dtype=np.float32)
+        scores = self.embeddings @ query_vector
+        top_k = min(top_k, len(self.chunks))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.chunks[i], float(scores[i])) for i in best]
+
+
+class ResumeIndexStore:
+    """On-disk vector indices keyed by document content hash and model name.
+
+    Each index lives in ``<root>/<model>/<sha256 of the PDF>/`` as a
+    ``chunks.json`` file plus an ``embeddings.npy`` matrix that is opened with
+    ``mmap_mode="r"``, so every worker process shares the same pages. When a
+    known file changes, chunks whose text is unchanged reuse the embeddings of
+    the previous version and only new chunks are embedded.
+
+    At most ``max_loaded`` indices are kept in memory; the least recently used
+    is dropped first and simply reopened from disk when needed again.
+    """
+
+    def __init__(self, root: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_loaded: Optional[int] = None):
+        if max_loaded is None:
+            max_loaded = int(
+                Environment.get_env_variable("AIJOBHUNTER_MAX_LOADED_RESUMES", str(DEFAULT_MAX_LOADED_RESUMES))
+            )
+        self._root = root
+        self.chunk_size = chunk_size
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[Tuple[str, str], ResumeIndex]" = OrderedDict()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = get_cache_dir("resume_index")
+        return self._root
+
+    @staticmethod
+    def _dir_name(model_name: str) -> str:
+        # Not reversible ("a--b" and "a/b" share a directory), so directories
+        # are never turned back into model names.
+        return model_name.replace("/", "--")
+
+    def _model_dir(self, model_name: str) -> str:
+        path = os.path.join(self.root, self._dir_name(model_name))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _read_sources(model_dir: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(model_dir, "sources.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _write_sources(model_dir: str, sources: Dict[str, Any]) -> None:
+        path = os.path.join(model_dir, "sources.json")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(sources, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _source_hashes(sources: Dict[str, Any], path: str) -> List[str]:
+        # Oldest first; older stores kept only the latest hash as a string.
+        hashes = sources.get(path, [])
+        return [hashes] if isinstance(hashes, str) else list(hashes)
+
+    def _record_source(self, model_name: str, file_path: str, doc_hash: str) -> None:
+        model_dir = self._model_dir(model_name)
+        sources = self._read_sources(model_dir)
+        path = os.path.abspath(file_path)
+        hashes = [h for h in self._source_hashes(sources, path) if h != doc_hash]
+        sources[path] = hashes + [doc_hash]
+        self._write_sources(model_dir, sources)
+
+    def _read_index(self, model_name: str, doc_hash: str) -> Optional[ResumeIndex]:
+        index_dir = os.path.join(self._model_dir(model_name), doc_hash)
+        try:
+            with open(os.path.join(index_dir, "chunks.json")) as f:
+                meta = json.load(f)
+            embeddings = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r")
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return None
+        return ResumeIndex(
+            doc_hash=doc_hash,
+            model_name=model_name,
+            chunks=meta["chunks"],
+            chunk_hashes=meta["chunk_hashes"],
+            embeddings=embeddings,
+        )
+
+    def _write_index(self, model_name: str, doc_hash: str, chunks: List[str],
+                     chunk_hashes: List[str], embeddings: np.ndarray) -> None:
+        model_dir = self._model_dir(model_name)
+        final_dir = os.path.join(model_dir, doc_hash)
+        tmp_dir = os.path.join(model_dir, f".{doc_hash}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(tmp_dir)
+        with open(os.path.join(tmp_dir, "chunks.json"), "w") as f:
+            json.dump({"chunks": chunks, "chunk_hashes": chunk_hashes}, f)
+        np.save(os.path.join(tmp_dir, "embeddings.npy"), embeddings)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Another worker published the same index first; theirs is identical.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def load(self, file_path: str, model_name: str = DEFAULT_EMBEDDING_MODEL) -> ResumeIndex:
+        """Returns the index for a PDF, building or updating it if needed.
+
+        Args:
+            file_path (str): Path to the PDF file.
+            model_name (str): HuggingFace embedding model name.
+
+        Returns:
+            ResumeIndex: The loaded index.
+        """
+        doc_hash = file_sha256(file_path)
+        key = (model_name, doc_hash)
+        index = self._get_loaded(key)
+        if index is not None:
+            return index
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Build under a per-document lock so indexing one resume does not
+        # block lookups of the others.
+        with key_lock:
+            index = self._get_loaded(key)
+            if index is None:
+                index = self._read_index(model_name, doc_hash)
+                if index is None:
+                    self._build(file_path, model_name, doc_hash)
+                    index = self._read_index(model_name, doc_hash)
+                with self._lock:
+                    self._record_source(model_name, file_path, doc_hash)
+                    self._loaded[key] = index
+                    while len(self._loaded) > self.max_loaded:
+                        evicted, _ = self._loaded.popitem(last=False)
+                        self._key_locks.pop(evicted, None)
+        return index
+
+    def _get_loaded(self, key: Tuple[str, str]) -> Optional[ResumeIndex]:
+        with self._lock:
+            index = self._loaded.get(key)
+            if index is not None:
+                self._loaded.move_to_end(key)
+            return index
+
+    def forget(self, file_path: str) -> None:
+        """Deletes the stored indices of a file, e.g. when its owner is removed.
+
+        Covers every version of the file that was indexed, using the hashes
+        recorded at the time, so it works after the file itself is gone. An
+        index another file still uses (a byte-identical copy) is kept.
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for dir_name in os.listdir(self.root):
+                model_dir = os.path.join(self.root, dir_name)
+                if not os.path.isdir(model_dir):
+                    continue
+                sources = self._read_sources(model_dir)
+                if path not in sources:
+                    continue
+                hashes = self._source_hashes(sources, path)
+                del sources[path]
+                in_use = {h for other in sources for h in self._source_hashes(sources, other)}
+                for doc_hash in hashes:
+                    if doc_hash in in_use:
+                        continue
+                    shutil.rmtree(os.path.join(model_dir, doc_hash), ignore_errors=True)
+                    for key in [key for key in self._loaded
+                                if key[1] == doc_hash and self._dir_name(key[0]) == dir_name]:
+                        del self._loaded[key]
+                self._write_sources(model_dir, sources)
+
+    def _build(self, file_path: str, model_name: str, doc_hash: str) -> None:
+        chunks = chunk_pdf(file_path, self.chunk_size)
+        chunk_hashes = [_text_sha256(chunk) for chunk in chunks]
+
+        known: Dict[str, np.ndarray] = {}
+        previous_hashes = self._source_hashes(
+            self._read_sources(self._model_dir(model_name)), os.path.abspath(file_path)
+        )
+        previous_hash = previous_hashes[-1] if previous_hashes else None
+        if previous_hash and previous_hash != doc_hash:
+            previous = self._read_index(model_name, previous_hash)
+            if previous is not None:
+                known = dict(zip(previous.chunk_hashes, previous.embeddings))
+
+        missing = [i for i, h in enumerate(chunk_hashes) if h not in known]
+        logger.info(
+            f"Indexing {file_path}: {len(chunks)} chunks, "
+            f"{len(chunks) - len(missing)} reused, {len(missing)} to embed"
+        )
+        if missing:
+            vectors = get_embedder(model_name).embed_documents([chunks[i] for i in missing])
+            for i, vector in zip(missing, vectors):
+                known[chunk_hashes[i]] = np.asarray(vector, dtype=np.float32)
+
+        if chunks:
+            embeddings = np.stack([known[h] for h in chunk_hashes]).astype(np.float32)
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._write_index(model_name, doc_hash, chunks, chunk_hashes, embeddings)
+
+
+resume_index_store = ResumeIndexStore()
@@ -0,0 +1,59 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from aijobhunter.tools.resume_index import (
+    DEFAULT_EMBEDDING_MODEL,
+    resume_index_store,
+)
+from aijobhunter.tracing import TracedToolMixin
+
+
+class ResumeSearchToolInput(BaseModel):
+    """Input schema for ResumeSearchTool."""
+    query: str = Field(..., description="Mandatory query you want to use to search the PDF's content")
+
+class ResumeSearchTool(TracedToolMixin, BaseTool):
+    name: str = "Search a PDF's content"
+    description: str = (
+        "A tool that can be used to semantic search a query from a PDF's content."
+    )
+    args_schema: Type[BaseModel] = ResumeSearchToolInput
+    file_path: Optional[str] = None
+    model_name: str = DEFAULT_EMBEDDING_MODEL
+    top_k: int = 3
+
+    def __init__(self, file_path: str, model_name: str = DEFAULT_EMBEDDING_MODEL, **kwargs):
+        """Initializes the ResumeSearchTool.
+
+        The PDF is indexed through the persistent resume index store, so a
+        document that was embedded before is loaded from disk instead of being
+        embedded again.
+
+        Args:
+            file_path (str): Path to the PDF file to search.
+            model_name (str): HuggingFace embedding model name.
+            **kwargs: Additional keyword arguments passed to BaseTool.
+        """
+        kwargs["description"] = (
+            f"A tool that can be used to semantic search a query the {file_path} PDF's content."
+        )
+        super().__init__(**kwargs)
+        self.file_path = file_path
+        self.model_name = model_name
+        resume_index_store.load(file_path, model_name)
+
+    def _run(self, query: str, **kwargs) -> str:
+        """Returns the resume chunks most relevant to the query.
+
+        Args:
+            query (str): The search query.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            str: The matching chunks, best match first.
+        """
+        index = resume_index_store.load(self.file_path, self.model_name)
+        results = index.search(query, top_k=self.top_k)
+        return "Relevant Content:\n" + "\n\n".join(chunk for chunk, _ in results)
@@ -0,0 +1,249 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_DIR = os.path.join("outputs", "traces")
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in Prometheus text format.
+
+    Components that keep their own statistics (caches, the job queue) register
+    a collector returning ``(name, description, type, labels, value)`` samples that
+    are read when the metrics are rendered.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {}
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, Dict[str, Any], float]]]] = []
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, description: str, labels: Dict[str, Any], value: float = 1) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._descriptions.setdefault(name, (description, "counter"))
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, description: str, labels: Dict[str, Any], value: float) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._descriptions.setdefault(name, (description, "histogram"))
+            series = self._histograms.setdefault(name, {})
+            # Bucket counts followed by the running sum and count.
+            state = series.setdefault(key, [0] * (len(DURATION_BUCKETS) + 2))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, str, str, Dict[str, Any], float]]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (
+            k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for k, v in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                description, kind = self._descriptions[name]
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{self._format_labels(k)} {v}" for k, v in series.items()]
+            for name, series in self._histograms.items():
+                description, kind = self._descriptions[name]
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+                for key, state in series.items():
+                    for bound, count in zip(DURATION_BUCKETS, state):
+                        lines.append(f"{name}_bucket{self._format_labels(key, (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{self._format_labels(key, (('le', '+Inf'),))} {state[-1]}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {state[-2]}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {state[-1]}")
+            collectors = list(self._collectors)
+
+        seen = set()
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, description, kind, labels, value in samples:
+                if name not in seen:
+                    lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+                    seen.add(name)
+                lines.append(f"{name}{self._format_labels(_labels(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    started_at: float
+    duration: float = 0.0
+    status: str = "ok"
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class RunTrace:
+    """Spans recorded during one crew run, written out as a JSON file."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [asdict(span) for span in self.spans]
+        return {"run_id": self.run_id, "started_at": self.started_at, "spans": spans}
+
+    def write(self, directory: Optional[str] = None) -> str:
+        """Writes the trace to ``<directory>/<run id>.json`` and returns the path.
+
+        The directory defaults to the ``AIJOBHUNTER_TRACE_DIR`` environment
+        variable, or ``outputs/traces``.
+        """
+        directory = directory or Environment.get_env_variable("AIJOBHUNTER_TRACE_DIR", DEFAULT_TRACE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.run_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+_current = threading.local()
+
+
+@contextmanager
+def bind_trace(trace: Optional[RunTrace]) -> Iterator[None]:
+    """Makes ``trace`` receive the spans recorded in the current thread."""
+    previous = getattr(_current, "trace", None)
+    _current.trace = trace
+    try:
+        yield
+    finally:
+        _current.trace = previous
+
+
+def current_trace() -> Optional[RunTrace]:
+    return getattr(_current, "trace", None)
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes: Any) -> Iterator[Span]:
+    """Times a block as a span of ``kind`` (agent, task, tool, llm).
+
+    The span is added to the current run trace and aggregated into the
+    ``aijobhunter_span_*`` metrics. Callers may add attributes such as token
+    counts or the cache result while the block runs, and may rename the span
+    once they know what served it.
+    """
+    record = Span(kind=kind, name=name, started_at=time.time(), attributes=attributes)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record.status = "error"
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        labels = {"kind": kind, "name": record.name}
+        metrics.inc("aijobhunter_spans_total", "Spans recorded by kind, name and status.",
+                    {**labels, "status": record.status})
+        metrics.observe("aijobhunter_span_duration_seconds", "Wall time of spans.", labels, record.duration)
+        for token_type in ("prompt_tokens", "completion_tokens"):
+            if record.attributes.get(token_type):
+                metrics.inc("aijobhunter_tokens_total", "LLM tokens by span and type.",
+                            {**labels, "type": token_type}, record.attributes[token_type])
+        if "cache" in record.attributes:
+            metrics.inc("aijobhunter_cache_lookups_total", "Cache lookups by span and result.",
+                        {**labels, "result": record.attributes["cache"]})
+        trace = current_trace()
+        if trace is not None:
+            trace.add(record)
+
+
+@contextmanager
+def count_tokens(record: Span, token_process: Any) -> Iterator[None]:
+    """Adds the tokens ``token_process`` accumulates during the block to ``record``.
+
+    ``token_process`` is a crewAI ``TokenProcess``; nothing is counted if it
+    is None. The counts are only exact while no other call shares it.
+    """
+    if token_process is None:
+        yield
+        return
+    prompt_tokens, completion_tokens = token_process.prompt_tokens, token_process.completion_tokens
+    try:
+        yield
+    finally:
+        record.attributes["prompt_tokens"] = token_process.prompt_tokens - prompt_tokens
+        record.attributes["completion_tokens"] = token_process.completion_tokens - completion_tokens
+
+
+def record_retry(kind: str, name: str) -> None:
+    metrics.inc("aijobhunter_retries_total", "Retried executions by kind and name.", {"kind": kind, "name": name})
+
+
+class TracedToolMixin:
+    """Records a ``tool`` span around every ``_run`` of a crewAI tool.
+
+    crewAI hands the bound ``_run`` straight to the agent, so ``_run`` itself
+    is wrapped when each tool class is created.
+    """
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        run = cls._run
+        if getattr(run, "__traced__", False):
+            return
+
+        @functools.wraps(run)
+        def traced_run(self, *args: Any, **kwargs: Any) -> Any:
+            with span("tool", self.name):
+                return run(self, *args, **kwargs)
+
+        traced_run.__traced__ = True
+        cls._run = traced_run
+
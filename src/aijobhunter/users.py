@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from aijobhunter.utils import Environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_DATA_DIR = os.path.join("data", "users")
+DEFAULT_MAX_RESUME_BYTES = 10 * 1024 * 1024
+
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class InvalidResumeError(ValueError):
+    """Raised when an uploaded file is not a readable resume PDF."""
+
+
+@dataclass
+class UserResume:
+    """Metadata of the resume stored for one user."""
+
+    user_id: str
+    sha256: str
+    size: int
+    pages: int
+    uploaded_at: float
+
+
+class UserStore:
+    """Per-user resume storage on disk.
+
+    Every user gets a directory ``<root>/<user id>/`` holding ``resume.pdf``,
+    the extracted ``resume.txt``, a ``resume.json`` metadata file, the hashes
+    of every upload in ``uploads.json`` and the output files of the user's
+    runs under ``runs/``. Files are replaced atomically, so a run reading a
+    resume never sees a partial upload. Embeddings live in the resume index,
+    which is keyed by content hash, so two users never share an index unless
+    their PDFs are byte-identical. Deleting a user removes all of it, along
+    with the embeddings, candidate profiles and checkpoints of every upload.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = Environment.get_env_variable("AIJOBHUNTER_USER_DATA_DIR", DEFAULT_USER_DATA_DIR)
+        return self._root
+
+    def _user_dir(self, user_id: str) -> str:
+        if not _USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user id: {user_id!r}")
+        return os.path.join(self.root, user_id)
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    @property
+    def max_resume_bytes(self) -> int:
+        return int(Environment.get_env_variable("AIJOBHUNTER_MAX_RESUME_BYTES", str(DEFAULT_MAX_RESUME_BYTES)))
+
+    def runs_dir(self, user_id: str) -> str:
+        """Returns the directory for the output files of the user's runs."""
+        return os.path.join(self._user_dir(user_id), "runs")
+
+    def resume_path(self, user_id: str) -> str:
+        """Returns the path of the user's resume PDF.
+
+        Raises:
+            KeyError: If the user has not uploaded a resume.
+        """
+        path = os.path.join(self._user_dir(user_id), "resume.pdf")
+        if not os.path.exists(path):
+            raise KeyError(user_id)
+        return path
+
+    def get(self, user_id: str) -> Optional[UserResume]:
+        try:
+            with open(os.path.join(self._user_dir(user_id), "resume.json")) as f:
+                return UserResume(**json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def save_resume(self, user_id: str, content: bytes) -> UserResume:
+        """Stores ``content`` as the user's resume, replacing any previous one.
+
+        Args:
+            user_id (str): Letters, digits, ``_`` and ``-``, at most 64 characters.
+            content (bytes): The PDF file.
+
+        Returns:
+            UserResume: Metadata of the stored resume.
+
+        Raises:
+            ValueError: If the user id is invalid.
+            InvalidResumeError: If the file is too large, not a PDF or has no text.
+        """
+        user_dir = self._user_dir(user_id)
+        max_bytes = self.max_resume_bytes
+        if len(content) > max_bytes:
+            raise InvalidResumeError(f"Resume is larger than {max_bytes} bytes")
+        text, pages = _extract_text(content)
+
+        resume = UserResume(
+            user_id=user_id,
+            sha256=hashlib.sha256(content).hexdigest(),
+            size=len(content),
+            pages=pages,
+            uploaded_at=time.time(),
+        )
+        with self._user_lock(user_id):
+            os.makedirs(user_dir, exist_ok=True)
+            _write_atomic(os.path.join(user_dir, "resume.pdf"), content)
+            _write_atomic(os.path.join(user_dir, "resume.txt"), text.encode("utf-8"))
+            _write_atomic(os.path.join(user_dir, "resume.json"), json.dumps(asdict(resume)).encode("utf-8"))
+            uploads = self._uploads(user_id)
+            if resume.sha256 not in uploads:
+                uploads.append(resume.sha256)
+                _write_atomic(os.path.join(user_dir, "uploads.json"), json.dumps(uploads).encode("utf-8"))
+        logger.info(f"Stored resume for user {user_id}: {resume.pages} pages, {resume.size} bytes")
+        return resume
+
+    def _uploads(self, user_id: str) -> List[str]:
+        try:
+            with open(os.path.join(self._user_dir(user_id), "uploads.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def delete(self, user_id: str) -> bool:
+        """Removes everything stored for the user. Returns False if there was nothing.
+
+        That is the user's directory (every resume version and run output),
+        the embeddings, the candidate profiles built from any of the uploads
+        and the checkpoints of the user's runs. Shared caches keyed by content
+        (HTTP responses, LLM completions) expire on their own.
+        """
+        from aijobhunter.checkpoints import checkpoint_store
+        from aijobhunter.profile_cache import profile_store
+        from aijobhunter.tools.pool import tool_pool
+        from aijobhunter.tools.resume_index import resume_index_store
+
+        user_dir = self._user_dir(user_id)
+        with self._user_lock(user_id):
+            if not os.path.isdir(user_dir):
+                return False
+            resume_path = os.path.join(user_dir, "resume.pdf")
+            hashes = set(self._uploads(user_id))
+            current = self.get(user_id)
+            if current is not None:
+                hashes.add(current.sha256)
+            tool_pool.evict(resume_path)
+            resume_index_store.forget(resume_path)
+            profile_store.forget(hashes)
+            checkpoint_store.forget(resume_path)
+            shutil.rmtree(user_dir)
+        with self._lock:
+            self._locks.pop(user_id, None)
+        logger.info(f"Deleted user {user_id}")
+        return True
+
+
+def _extract_text(content: bytes) -> Tuple[str, int]:
+    import fitz
+
+    try:
+        with fitz.open(stream=content, filetype="pdf") as pdf_file:
+            text = "\n".join(page.get_text() for page in pdf_file)
+            pages = pdf_file.page_count
+    except Exception as e:
+        raise InvalidResumeError(f"Not a readable PDF: {e}") from e
+    if not text.strip():
+        raise InvalidResumeError("The PDF contains no extractable text")
+    return text, pages
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+user_store = UserStore()
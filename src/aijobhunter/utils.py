@@ -4,11 +4,14 @@ import threading
 import time
 import re
 import json
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
 class MissingEnvironmentVariableError(Exception):
     """Custom exception for missing environment variables."""
     def __init__(self, env_var_name: str):
@@ -35,57 +38,144 @@ class InvalidEnvValueError(Exception):
         self.reason = reason
         super().__init__(f"Invalid value for environment variable {env_var_name}: {reason}")
 
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """An immutable view of the parsed ``.env`` values and the files they came from."""
+    values: Mapping[str, str]
+    dotenv_paths: Tuple[str, ...]
+    file_mtimes: Tuple[Optional[int], ...]
+
 class Environment:
-    _loaded = False
-    _env_cache: Dict[str, Optional[str]] = {}
-    _lock = threading.RLock()
-    _last_load_time = 0
+    """
+    Process-wide configuration read from the environment and ``.env`` files.
+
+    Variables are read from ``os.environ`` on every lookup, so changes made
+    at runtime are seen at once. The ``.env`` files are parsed once into a
+    frozen snapshot that lookups fall back to, and their variables are
+    exported to the process environment for libraries that read it directly;
+    a variable removed from the files is removed from it again on reload.
+    Reads never take a lock. At most every ``_check_interval`` seconds one
+    reader checks the files' modification times, and a new snapshot is
+    swapped in only when a file changed.
+    """
+    _snapshot: Optional[EnvSnapshot] = None
+    _next_check = 0.0
+    _lock = threading.Lock()
     _immutable = False
-    _default_config = {}
+    _default_config: Dict[str, Any] = {}
     _env_source_priorities = ['.env.local', '.env', 'env']
-    _cache_expiration_time = 300
+    _check_interval = 2.0
 
     @staticmethod
-    def _load_env_files(dotenv_paths: Optional[list] = None) -> None:
-        """
-        Loads environment variables from multiple .env files in a prioritized order.
-        
-        :param dotenv_paths: List of custom paths for .env files to load.
+    def _file_mtimes(dotenv_paths: Tuple[str, ...]) -> Tuple[Optional[int], ...]:
+        mtimes = []
+        for dotenv_path in dotenv_paths:
+            try:
+                mtimes.append(os.stat(dotenv_path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    @staticmethod
+    def _load_env_files(dotenv_paths: Tuple[str, ...]) -> Dict[str, str]:
         """
-        if dotenv_paths is None:
-            dotenv_paths = Environment._env_source_priorities
+        Parses the .env files and exports their variables to the process environment.
+
+        Files are read in order, so a later file overrides an earlier one.
 
+        :param dotenv_paths: Paths of the .env files; missing files are skipped.
+        :return: The parsed variables.
+        """
+        values: Dict[str, str] = {}
         for dotenv_path in dotenv_paths:
-            if os.path.exists(dotenv_path):
-                logger.info(f"Loading .env file from: {dotenv_path}")
-                with open(dotenv_path) as f:
-                    for line in f:
-                        if line.strip() and not line.startswith('#'):
-                            key, value = line.strip().split('=', 1)
-                            os.environ[key] = value
-            else:
-                logger.warning(f"Environment file not found: {dotenv_path}")
+            if not os.path.exists(dotenv_path):
+                continue
+            logger.info(f"Loading .env file from: {dotenv_path}")
+            with open(dotenv_path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    if '=' not in line:
+                        logger.warning(f"Skipping malformed line in {dotenv_path}: {line}")
+                        continue
+                    key, value = line.split('=', 1)
+                    values[key.strip()] = value.strip()
+        os.environ.update(values)
+        return values
+
+    @staticmethod
+    def _build_snapshot(dotenv_paths: Tuple[str, ...]) -> None:
+        # Callers hold the lock. Stat before reading so a write racing with
+        # the load is picked up by the next check.
+        file_mtimes = Environment._file_mtimes(dotenv_paths)
+        previous = Environment._snapshot
+        values = Environment._load_env_files(dotenv_paths)
+        if previous is not None:
+            # Unexport variables the files no longer set, unless they were changed since.
+            for key, value in previous.values.items():
+                if key not in values and os.environ.get(key) == value:
+                    del os.environ[key]
+        Environment._snapshot = EnvSnapshot(
+            values=MappingProxyType(values),
+            dotenv_paths=dotenv_paths,
+            file_mtimes=file_mtimes,
+        )
+        Environment._next_check = time.monotonic() + Environment._check_interval
 
     @staticmethod
     def load_env(force_reload=False, dotenv_paths: Optional[list] = None) -> None:
         """
         Loads environment variables from .env files in the specified order.
 
+        The snapshot is only rebuilt if it does not exist yet, if other files
+        are requested, if one of the files changed, or when forced.
+
         :param force_reload: Forces reloading of the .env files and cache.
         :param dotenv_paths: List of custom paths for .env files.
         """
-        if Environment._immutable:
-            logger.debug("Environment configuration is immutable, skipping load.")
+        if Environment._immutable and Environment._snapshot is not None:
             return
 
+        paths = tuple(dotenv_paths if dotenv_paths is not None else Environment._env_source_priorities)
         with Environment._lock:
-            current_time = time.time()
-            if not Environment._loaded or force_reload or (current_time - Environment._last_load_time) > Environment._cache_expiration_time:
-                Environment._load_env_files(dotenv_paths)
-                Environment._loaded = True
-                Environment._last_load_time = current_time
-            else:
-                logger.debug("Environment variables already loaded and up-to-date.")
+            snapshot = Environment._snapshot
+            if (
+                force_reload
+                or snapshot is None
+                or snapshot.dotenv_paths != paths
+                or snapshot.file_mtimes != Environment._file_mtimes(paths)
+            ):
+                Environment._build_snapshot(paths)
+
+    @staticmethod
+    def _refresh_if_changed() -> None:
+        # Only one reader checks; the others keep using the current snapshot.
+        if not Environment._lock.acquire(blocking=False):
+            return
+        try:
+            snapshot = Environment._snapshot
+            Environment._next_check = time.monotonic() + Environment._check_interval
+            if snapshot.file_mtimes != Environment._file_mtimes(snapshot.dotenv_paths):
+                Environment._build_snapshot(snapshot.dotenv_paths)
+        finally:
+            Environment._lock.release()
+
+    @staticmethod
+    def snapshot() -> EnvSnapshot:
+        """
+        Returns the current snapshot of the .env files, loading it on first use.
+
+        :return: The snapshot; it never changes, a refresh replaces it.
+        """
+        snapshot = Environment._snapshot
+        if snapshot is None:
+            Environment.load_env()
+            return Environment._snapshot
+        if not Environment._immutable and time.monotonic() >= Environment._next_check:
+            Environment._refresh_if_changed()
+            snapshot = Environment._snapshot
+        return snapshot
 
     @staticmethod
     def set_default_config(default_config: Dict[str, Any]) -> None:
@@ -105,27 +195,11 @@ class Environment:
         :param default: The default value to return if the variable is not found.
         :return: The value of the environment variable, or default if not found.
         """
-        if env_var_name in Environment._env_cache:
-            logger.debug(f"Using cached value for {env_var_name}")
-            return Environment._env_cache[env_var_name]
-
-        Environment.load_env()
-
-        api_key = os.getenv(env_var_name)
-        
-        if api_key:
-            logger.debug(f"Found {env_var_name} in system environment variables.")
-        else:
-            api_key = os.getenv(env_var_name, default)
-
-            if api_key:
-                logger.debug(f"Found {env_var_name} in .env files.")
-            else:
-                api_key = Environment._default_config.get(env_var_name, default)
-                logger.debug(f"Using default fallback for {env_var_name}.")
-            
-        Environment._env_cache[env_var_name] = api_key
-        return api_key
+        snapshot = Environment.snapshot()
+        value = os.environ.get(env_var_name) or snapshot.values.get(env_var_name)
+        if value:
+            return value
+        return Environment._default_config.get(env_var_name, default)
 
     @staticmethod
     def validate_api_key(api_key: Optional[str], env_var_name: str) -> None:
@@ -180,8 +254,35 @@ class Environment:
         """
         Makes the environment configuration immutable, preventing further loading or changes.
         """
+        Environment.load_env()
         Environment._immutable = True
-        logger.debug("Environment configuration is now immutable.")
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Configures root logging for an entry point (CLI command, API server).
+
+    Library modules never configure logging themselves; the level defaults to
+    the ``AIJOBHUNTER_LOG_LEVEL`` environment variable, or INFO.
+
+    :param level: Logging level name, e.g. "DEBUG".
+    """
+    level = level or Environment.get_env_variable("AIJOBHUNTER_LOG_LEVEL", "INFO")
+    logging.basicConfig(level=level.upper(), format=LOG_FORMAT)
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Returns (and creates) a directory under the project cache root.
+
+    The root defaults to ``.cache/aijobhunter`` and can be moved with the
+    ``AIJOBHUNTER_CACHE_DIR`` environment variable.
+
+    :param parts: Sub-directory names below the cache root.
+    :return: The absolute path of the directory.
+    """
+    root = Environment.get_env_variable("AIJOBHUNTER_CACHE_DIR", os.path.join(".cache", "aijobhunter"))
+    path = os.path.abspath(os.path.join(root, *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
 
 def pretty_print_result(result: str, line_length: int = 80, format_json: bool = False) -> str:
     """
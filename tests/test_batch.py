@@ -0,0 +1,164 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from aijobhunter import batch
+from aijobhunter.profile_cache import ProfileArtifactStore
+
+GITHUB_URL = "https://github.com/someone"
+
+
+class FakeCrew:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def kickoff(self, inputs):
+        return SimpleNamespace(raw=self.answer(inputs))
+
+
+class FakeHunter:
+    """Stands in for AIjobhunter; counts profiler runs across instances."""
+
+    profiler_runs = 0
+    lock = threading.Lock()
+
+    def __init__(self, file_path, output_dir=None, precomputed_outputs=None):
+        self.precomputed_outputs = precomputed_outputs or {}
+
+    def profile_prompt(self):
+        return "Profile the candidate"
+
+    def profile_crew(self):
+        with FakeHunter.lock:
+            FakeHunter.profiler_runs += 1
+        return FakeCrew(lambda inputs: f"profile of {inputs['github_url']}")
+
+    def crew(self):
+        profile = self.precomputed_outputs["profile_task"]
+        return FakeCrew(lambda inputs: f"resume for {inputs['job_posting_url']} from {profile}")
+
+
+@pytest.fixture
+def resume(tmp_path, monkeypatch):
+    profiles = tmp_path / "profiles"
+    profiles.mkdir()
+    monkeypatch.setattr(batch, "profile_store", ProfileArtifactStore(root=str(profiles), ttl=60))
+    FakeHunter.profiler_runs = 0
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 resume")
+    return str(path)
+
+
+def write_postings(path, *urls):
+    lines = [json.dumps({"job_posting_url": url}) if url else "" for url in urls]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def read_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_postings_stream_from_jsonl(tmp_path):
+    path = tmp_path / "postings.jsonl"
+    path.write_text('{"job_posting_url": "https://jobs.example.com/1"}\n\n{"id": "x", "job_posting_url": "u"}\n')
+
+    postings = batch.iter_postings(str(path))
+    assert next(postings) == {"job_posting_url": "https://jobs.example.com/1", "id": "1"}
+    assert next(postings) == {"id": "x", "job_posting_url": "u"}
+
+
+@pytest.mark.parametrize("line, error", [("{not json", "invalid JSON"), ('{"id": "1"}', "missing job_posting_url")])
+def test_bad_lines_name_their_line_number(tmp_path, line, error):
+    path = tmp_path / "postings.jsonl"
+    path.write_text('{"job_posting_url": "u"}\n' + line + "\n")
+    with pytest.raises(ValueError, match=f":2: {error}"):
+        list(batch.iter_postings(str(path)))
+
+
+def test_postings_share_one_profile_and_append_results(tmp_path, resume):
+    postings = write_postings(tmp_path / "postings.jsonl", *(f"https://jobs.example.com/{i}" for i in range(5)))
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"id": "earlier", "status": "success"}) + "\n")
+
+    summary = batch.run_batch(postings, str(output), resume, github_url=GITHUB_URL, max_workers=3, rank=False,
+                              output_root=str(tmp_path / "out"), make_hunter=FakeHunter)
+
+    assert (summary.succeeded, summary.failed, summary.skipped) == (5, 0, 0)
+    assert FakeHunter.profiler_runs == 1
+    results = read_results(output)
+    assert results[0]["id"] == "earlier"
+    assert sorted(result["id"] for result in results[1:]) == ["1", "2", "3", "4", "5"]
+    assert all(result["output"].endswith(f"from profile of {GITHUB_URL}") for result in results[1:])
+    assert all("fit_score" not in result for result in results[1:])
+
+
+def test_posting_without_github_url_fails_alone(tmp_path, resume):
+    postings = tmp_path / "postings.jsonl"
+    postings.write_text(json.dumps({"job_posting_url": "a", "github_url": GITHUB_URL}) + "\n"
+                        + json.dumps({"job_posting_url": "b"}) + "\n")
+    output = tmp_path / "results.jsonl"
+
+    summary = batch.run_batch(str(postings), str(output), resume, rank=False, output_root=str(tmp_path / "out"),
+                              make_hunter=FakeHunter)
+
+    assert (summary.succeeded, summary.failed) == (1, 1)
+    statuses = {result["job_posting_url"]: result["status"] for result in read_results(output)}
+    assert statuses == {"a": "success", "b": "error"}
+
+
+def test_stored_profile_skips_the_profiler(tmp_path, resume):
+    batch.profile_store.put(GITHUB_URL, resume, "stored profile", prompt="Profile the candidate")
+    postings = write_postings(tmp_path / "postings.jsonl", "a")
+    output = tmp_path / "results.jsonl"
+
+    batch.run_batch(postings, str(output), resume, github_url=GITHUB_URL, rank=False,
+                    output_root=str(tmp_path / "out"), make_hunter=FakeHunter)
+
+    assert FakeHunter.profiler_runs == 0
+    assert read_results(output)[0]["output"] == "resume for a from stored profile"
+
+
+FITS = {"a": 0.9, "b": 0.4, "c": 0.7, "d": None}
+
+
+def fake_rank(file_path, postings):
+    # Best fit first, unscored postings last, as rank_postings returns them.
+    scored = sorted((p for p in postings if FITS[p["job_posting_url"]] is not None),
+                    key=lambda p: -FITS[p["job_posting_url"]])
+    unscored = [p for p in postings if FITS[p["job_posting_url"]] is None]
+    return ([(p, SimpleNamespace(fit_score=FITS[p["job_posting_url"]])) for p in scored]
+            + [(p, None) for p in unscored])
+
+
+@pytest.mark.parametrize("top, min_fit, selected", [
+    (None, None, ["a", "c", "b", "d"]),
+    (2, None, ["a", "c"]),
+    (None, 0.5, ["a", "c", "d"]),
+    (1, 0.5, ["a"]),
+])
+def test_rank_batch_filters_by_top_and_min_fit(monkeypatch, top, min_fit, selected):
+    monkeypatch.setattr(batch, "rank_postings", fake_rank)
+    postings = [{"id": url, "job_posting_url": url} for url in FITS]
+
+    kept, skipped = batch.rank_batch(postings, "resume.pdf", top=top, min_fit=min_fit)
+
+    assert [posting["id"] for posting, _ in kept] == selected
+    assert sorted(posting["id"] for posting, _ in skipped) == sorted(set(FITS) - set(selected))
+
+
+def test_ranked_batch_records_skipped_postings_first(tmp_path, resume, monkeypatch):
+    monkeypatch.setattr(batch, "rank_postings", fake_rank)
+    postings = write_postings(tmp_path / "postings.jsonl", *FITS)
+    output = tmp_path / "results.jsonl"
+
+    summary = batch.run_batch(postings, str(output), resume, github_url=GITHUB_URL, min_fit=0.5, max_workers=1,
+                              output_root=str(tmp_path / "out"), make_hunter=FakeHunter)
+
+    assert (summary.succeeded, summary.skipped) == (3, 1)
+    results = read_results(output)
+    assert results[0] == {"id": "2", "job_posting_url": "b", "fit_score": 0.4, "status": "skipped"}
+    assert {result["job_posting_url"]: result["fit_score"] for result in results[1:]} == {"a": 0.9, "c": 0.7, "d": None}
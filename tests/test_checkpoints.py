@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+from aijobhunter.checkpoints import CheckpointStore, task_fingerprint
+
+INPUTS = {"github_url": "https://github.com/someone", "job_posting_url": "https://jobs.example.com/1"}
+FINGERPRINT = task_fingerprint("Research the posting", "A list of requirements", "")
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 first version")
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(root=str(tmp_path / "checkpoints"), ttl=60)
+
+
+def test_same_inputs_reopen_the_run_and_its_outputs(store, resume):
+    first = store.start(INPUTS, resume)
+    first.save("research_task", FINGERPRINT, "Python, SQL", "researcher")
+    first.mark("failed", "profile_task timed out")
+    first.release()
+
+    again = store.start(INPUTS, resume)
+    assert again.key == first.key
+    assert (again.status, again.file_path) == ("running", os.path.abspath(resume))
+    assert again.completed_tasks() == ["research_task"]
+    assert again.load("research_task", FINGERPRINT).raw == "Python, SQL"
+    again.release()
+
+
+def test_an_edited_resume_starts_a_new_run(store, resume):
+    first = store.start(INPUTS, resume)
+    first.release()
+    with open(resume, "wb") as f:
+        f.write(b"%PDF-1.4 edited version")
+    assert store.start(INPUTS, resume).key != first.key
+
+
+def test_concurrent_runs_with_the_same_inputs_do_not_share_checkpoints(store, resume):
+    first = store.start(INPUTS, resume)
+    assert first is not None
+    assert store.start(INPUTS, resume) is None
+
+    first.release()
+    second = store.start(INPUTS, resume)
+    assert second is not None and second.key == first.key
+    second.release()
+
+
+def test_previous_finds_the_latest_run_of_the_same_application(store, resume):
+    first = store.start(INPUTS, resume)
+    first.release()
+    other = store.start({**INPUTS, "job_posting_url": "https://jobs.example.com/2"}, resume)
+    other.release()
+
+    with open(resume, "wb") as f:
+        f.write(b"%PDF-1.4 edited version")
+    os.utime(resume, ns=(time.time_ns(), time.time_ns() + 1000))
+    current = store.start(INPUTS, resume)
+
+    assert current.key != first.key
+    assert store.previous(current).key == first.key
+    current.release()
+
+
+def test_prune_deletes_expired_runs_but_not_running_ones(store, resume):
+    expired = store.start(INPUTS, resume)
+    expired.release()
+    running = store.start({**INPUTS, "job_posting_url": "https://jobs.example.com/2"}, resume)
+    store._ttl = 0
+
+    assert store.prune() == 1
+    assert store.get(expired.key) is None
+    assert store.get(running.key) is not None
+    assert store.previous(running) is None
+    running.release()
+
+
+class TestLoad:
+    def test_changed_prompt_or_context_is_not_restored(self, store, resume):
+        run = store.start(INPUTS, resume)
+        run.save("research_task", FINGERPRINT, "Python, SQL", "researcher")
+        run.release()
+        changed = task_fingerprint("Research the posting", "A list of requirements", "new upstream output")
+        assert run.load("research_task", changed) is None
+
+    def test_expired_outputs_are_not_restored(self, store, resume, monkeypatch):
+        run = store.start(INPUTS, resume)
+        run.save("research_task", FINGERPRINT, "Python, SQL", "researcher")
+        run.release()
+        later = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert run.load("research_task", FINGERPRINT) is None
+
+    def test_discarded_tasks_run_again(self, store, resume):
+        run = store.start(INPUTS, resume)
+        run.save("research_task", FINGERPRINT, "Python, SQL", "researcher")
+        run.release()
+        assert run.discard("research_task")
+        assert not run.discard("research_task")
+        assert run.load("research_task", FINGERPRINT) is None
@@ -0,0 +1,80 @@
+from aijobhunter.compaction import bind_context_window, budgets_for, compact_document, compact_page, compact_parts
+
+RESEARCH = "\n".join([
+    "Requirements",
+    "5+ years of Python and SQL",
+    "Experience with Airflow and dbt",
+])
+
+
+def test_budgets_follow_the_context_window():
+    assert budgets_for(32768) == (8192, 4915)
+    assert budgets_for(131072)[0] > budgets_for(32768)[0]
+
+
+def test_lines_repeated_from_an_earlier_part_are_dropped():
+    profile = "\n".join(["Requirements", "5+ years of Python and SQL", "Built an open source Airflow provider"])
+    result = compact_parts([RESEARCH, profile], budget=1000, separator="\n\n")
+
+    # Short lines such as headings stay, as they carry the structure.
+    assert result.text == RESEARCH + "\n\nRequirements\nBuilt an open source Airflow provider"
+    assert result.tokens_saved > 0
+
+
+def test_every_part_keeps_its_beginning_when_over_budget():
+    long_part = "\n".join(f"Detail {i} of the candidate's many open source projects." for i in range(100))
+    result = compact_parts([long_part, RESEARCH], budget=200, separator="\n\n")
+
+    first, second = result.text.split("\n\n")
+    assert first.startswith("Detail 0 ") and first.endswith("more lines omitted to fit the context budget]")
+    assert second == RESEARCH
+    assert result.tokens_after <= 200
+
+
+def test_budget_zero_turns_compaction_off():
+    parts = [RESEARCH, RESEARCH]
+    assert compact_parts(parts, budget=0, separator="\n").text == "\n".join(parts)
+
+
+def test_page_keeps_requirements_and_drops_boilerplate():
+    filler = "\n".join(f"We describe part {i} of our product, its history and customers in detail." for i in range(60))
+    page = "\n".join([
+        "Skip to main content", "Sign in", "Senior Data Engineer", "Apply now",
+        "About us", filler,
+        "Requirements", "5+ years of Python and SQL", "Experience with Airflow",
+        "Share this job", "We use cookies to improve your experience.",
+        "Similar jobs", "Data Analyst", "ML Engineer",
+    ])
+    with bind_context_window(4096):
+        text = compact_page("scrape", page)
+
+    assert "5+ years of Python and SQL" in text
+    assert "Experience with Airflow" in text
+    assert "About us" in text and "part 0 of our product" not in text
+    for boilerplate in ("Sign in", "Apply now", "Share this job", "cookies", "ML Engineer"):
+        assert boilerplate not in text
+
+
+def test_page_under_budget_keeps_employer_sections():
+    page = "Data Engineer\nBenefits\nHealth insurance for the whole family\nRequirements\nPython"
+    with bind_context_window(32768):
+        assert compact_page("scrape", page) == page
+
+
+def test_documents_lose_only_page_numbers_and_repeated_lines():
+    footer = "Jane Doe - Senior Data Engineer - jane@example.com"
+    bullets = [f"Built pipeline number {i} that moved data between teams every night." for i in range(40)]
+    pages = [
+        "\n".join(["Experience", *bullets[:20], footer, "Page 1 of 2"]),
+        "\n".join(["- 2 -", *bullets[20:], "Built pipeline number 3 that moved data between teams every night.",
+                   "2019", footer]),
+    ]
+    with bind_context_window(2048):
+        compacted = compact_document("PDF Content Reader", pages)
+
+    assert compacted[0].splitlines() == ["Experience", *bullets[:20], footer]
+    # Over budget even so, but every other line of the resume is kept.
+    assert compacted[1].splitlines() == [*bullets[20:], "2019"]
+
+    with bind_context_window(32768):
+        assert compact_document("PDF Content Reader", pages) == pages
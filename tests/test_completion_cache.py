@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from aijobhunter.completion_cache import CompletionCache
+
+
+def embed(text):
+    # Prompts that differ only in the posting URL embed the same.
+    return [1.0, float(len(text.split()))]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompletionCache(str(tmp_path / "completions.sqlite3"))
+
+
+def test_hits_are_per_namespace(cache):
+    cache.put("ollama", "user: summarise the resume", "A data engineer.")
+
+    assert cache.lookup("ollama", "user: summarise the resume") == ("A data engineer.", "exact")
+    assert cache.lookup("groq", "user: summarise the resume") == (None, "miss")
+    assert cache.lookup("ollama", "user: summarise the posting") == (None, "miss")
+    assert cache.lookup_any(["groq", "ollama"], "user: summarise the resume")[0] == "A data engineer."
+    assert (cache.stats.exact_hits, cache.stats.misses) == (2, 2)
+
+
+def test_similar_prompts_only_match_for_the_same_urls(tmp_path):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite3"), embed=embed)
+    cache.put("ns", "user: tailor for https://jobs.example.com/1", "Resume for job 1")
+
+    assert cache.lookup("ns", "user: Tailor for https://jobs.example.com/1.") == ("Resume for job 1", "semantic")
+    assert cache.lookup("ns", "user: tailor for https://jobs.example.com/2") == (None, "miss")
+
+
+def test_unused_completions_expire(tmp_path, monkeypatch):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite3"), ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.put("ns", "old prompt", "old answer")
+
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    assert cache.get("ns", "old prompt") == "old answer"
+
+    # The hit renewed the entry, so it lives 60s from then.
+    monkeypatch.setattr(time, "time", lambda: now + 80)
+    assert cache.get("ns", "old prompt") == "old answer"
+
+    monkeypatch.setattr(time, "time", lambda: now + 200)
+    assert cache.get("ns", "old prompt") is None
+    cache.put("ns", "new prompt", "new answer")
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite3"), max_entries=2)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(time, "time", lambda: next(clock))
+    cache.put("ns", "a", "A")
+    cache.put("ns", "b", "B")
+    cache.get("ns", "a")
+    cache.put("ns", "c", "C")
+
+    assert [cache.get("ns", prompt) for prompt in "abc"] == ["A", None, "C"]
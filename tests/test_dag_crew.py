@@ -0,0 +1,57 @@
+"""Runs DAGCrew against the pinned crewAI, whose private task loop it reuses."""
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai import LLM, Crew, Process, Task  # noqa: E402
+
+from aijobhunter.scheduler import DAGCrew, TracedAgent  # noqa: E402
+
+
+class ScriptedLLM(LLM):
+    """Gives each task a fixed final answer without calling a model."""
+
+    def __init__(self, **kwargs):
+        super().__init__(model="gpt-4o-mini", temperature=0, **kwargs)
+        self.prompts = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        prompt = "\n".join(message["content"] for message in messages)
+        self.prompts.append(prompt)
+        for name in ("research", "profile", "strategy"):
+            if f"Do the {name}" in prompt:
+                return f"Thought: I now know the final answer\nFinal Answer: {name} done"
+        raise AssertionError(f"unexpected prompt: {prompt}")
+
+
+def test_crew_helpers_used_by_dag_crew_exist():
+    for name in ("_get_agent_to_use", "_prepare_tools", "_log_task_start", "_process_task_result",
+                 "_store_execution_log", "_create_crew_output", "_get_context", "_execute_tasks"):
+        assert callable(getattr(Crew, name, None)), name
+    assert callable(getattr(Task, "_save_file", None))
+    assert {"_original_description", "_original_expected_output"} <= set(Task.__private_attributes__)
+
+
+def test_tasks_run_as_a_graph(tmp_path, monkeypatch):
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setenv("AIJOBHUNTER_TRACE_DIR", str(tmp_path))
+    llm = ScriptedLLM()
+    agent = TracedAgent(role="Writer", goal="Write", backstory="Writes", llm=llm, allow_delegation=False)
+    research = Task(name="research", description="Do the research", expected_output="Notes", agent=agent)
+    profile = Task(name="profile", description="Do the profile", expected_output="Notes", agent=agent)
+    strategy = Task(name="strategy", description="Do the strategy", expected_output="Resume", agent=agent,
+                    context=[research, profile])
+    crew = DAGCrew(agents=[agent], tasks=[research, profile, strategy], process=Process.sequential,
+                   max_parallel_tasks=2)
+
+    output = crew.kickoff()
+
+    assert output.raw == "strategy done"
+    assert [task_output.raw for task_output in output.tasks_output] == ["research done", "profile done",
+                                                                        "strategy done"]
+    strategy_prompt = next(prompt for prompt in llm.prompts if "Do the strategy" in prompt)
+    assert "research done" in strategy_prompt and "profile done" in strategy_prompt
+    assert strategy.description == "Do the strategy"
+    assert crew.schedule_report.critical_path[-1] == "strategy"
+    assert list(tmp_path.glob("*.json"))
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+from aijobhunter.events import RunEventStream, bind_stream, current_stream, emit, streaming_tokens
+
+
+def test_follow_async_receives_events_from_other_threads():
+    stream = RunEventStream()
+
+    def produce():
+        for i in range(3):
+            stream.emit("task_started", task=f"task_{i}")
+        stream.close()
+
+    async def consume():
+        threading.Timer(0.05, produce).start()
+        return [event async for event in stream.follow_async(heartbeat=5)]
+
+    events = asyncio.run(consume())
+    assert [event.data["task"] for event in events] == ["task_0", "task_1", "task_2"]
+    assert stream.subscribers == 0
+
+
+def test_follow_resumes_after_a_given_event():
+    stream = RunEventStream()
+    for task in ("research_task", "profile_task"):
+        stream.emit("task_completed", task=task)
+    stream.close()
+    stream.emit("task_started", task="ignored")
+
+    assert [event.id for event in stream.follow()] == [0, 1]
+    assert [event.data["task"] for event in stream.follow(1)] == ["profile_task"]
+
+
+def test_emit_goes_to_the_stream_bound_to_this_thread():
+    stream = RunEventStream()
+    emit("task_started", task="unbound")
+    with bind_stream(stream, task="research_task"):
+        assert current_stream() is stream
+        emit("task_started", task="research_task")
+    assert current_stream() is None
+    stream.close()
+
+    assert [event.data["task"] for event in stream.follow()] == ["research_task"]
+
+
+def test_tokens_are_streamed_only_to_subscribers():
+    stream = RunEventStream()
+    with bind_stream(stream):
+        assert not streaming_tokens()
+        reader = stream.follow(heartbeat=0.01)
+        next(reader)
+        assert streaming_tokens()
+        reader.close()
+        assert not streaming_tokens()
+
+
+def test_token_events_are_capped_and_dropped_on_close():
+    stream = RunEventStream(max_token_events=2)
+    stream.emit("task_started", task="research_task")
+    for i in range(5):
+        stream.emit("token", text=str(i))
+    stream.emit("token_reset")
+    stream.emit("task_completed", task="research_task")
+
+    live = list(stream._since(0))
+    assert [event.data.get("text") for event in live if event.event == "token"] == ["3", "4"]
+
+    stream.close()
+    events = list(stream.follow())
+    assert [event.event for event in events] == ["task_started", "task_completed"]
+    # Ids stay stable, so Last-Event-ID still resumes at the right place.
+    assert [event.id for event in stream.follow(events[0].id + 1)] == [7]
@@ -0,0 +1,91 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from aijobhunter.tools.http_cache import FetchClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = 0
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def do_GET(self):
+        with StubHandler.lock:
+            StubHandler.hits += 1
+        StubHandler.release.wait(5)
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubHandler.hits = 0
+    StubHandler.release.clear()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    StubHandler.release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_concurrent_requests_share_one_fetch(server):
+    client = FetchClient(ttl=60)
+    url = f"{server}/posting"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(client.get, url) for _ in range(8)]
+        # Let every caller register before the stub answers.
+        threading.Event().wait(0.3)
+        StubHandler.release.set()
+        responses = [future.result() for future in futures]
+
+    assert StubHandler.hits == 1
+    assert {response.json()["path"] for response in responses} == {"/posting"}
+    assert client.stats.misses == 1
+    assert client.stats.hits + client.stats.deduplicated == 7
+
+
+def test_cached_response_is_served_without_a_request(server):
+    StubHandler.release.set()
+    client = FetchClient(ttl=60)
+    url = f"{server}/profile"
+    first = client.get(url)
+    second = client.get(url)
+
+    assert StubHandler.hits == 1
+    assert second.text == first.text
+    assert client.stats.hits == 1
+
+
+def test_ttl_zero_always_fetches(server):
+    StubHandler.release.set()
+    client = FetchClient(ttl=0)
+    url = f"{server}/profile"
+    client.get(url)
+    client.get(url)
+
+    assert StubHandler.hits == 2
+
+
+def test_disk_cache_survives_a_new_client(server, tmp_path):
+    StubHandler.release.set()
+    url = f"{server}/profile"
+    FetchClient(ttl=60, disk_dir=str(tmp_path)).get(url)
+    client = FetchClient(ttl=60, disk_dir=str(tmp_path))
+    response = client.get(url)
+
+    assert StubHandler.hits == 1
+    assert response.json() == {"path": "/profile"}
+    assert client.stats.disk_hits == 1
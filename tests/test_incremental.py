@@ -0,0 +1,103 @@
+from aijobhunter.incremental import digest, plan_revision, resume_components, split_markdown
+
+RESUME = """Jane Doe
+jane@example.com
+Summary
+I build developer tools and data platforms.
+Built a profile service used by every team.
+Experience
+Acme Corp, Senior Engineer, 2020-2024
+Skills
+Python, SQL, Airflow
+Education
+BSc Computer Science
+"""
+
+PREVIOUS_OUTPUT = """# Jane Doe
+jane@example.com
+
+## Summary
+Engineer who builds developer tools.
+
+## Experience
+### Acme Corp
+Built data pipelines.
+
+## Skills
+Python, SQL, Airflow
+
+## Education
+BSc Computer Science
+"""
+
+
+def strategy_components(resume_text, profile):
+    # What resume_strategy_task records: its prompt, inputs, context tasks and the resume it reads.
+    components = {
+        "template": digest("template"),
+        "input:job_posting_url": digest("https://example.com/job"),
+        "context:research_task": digest("research"),
+        "context:profile_task": digest(profile),
+        "posting:title": digest("Data Engineer"),
+        "posting:skills": digest(["Python", "Airflow"]),
+    }
+    components.update(resume_components(resume_text))
+    return components
+
+
+def test_only_whole_heading_lines_start_resume_sections():
+    components = resume_components(RESUME)
+    assert set(components) == {"resume:header", "resume:summary", "resume:experience", "resume:skills",
+                               "resume:education"}
+
+    edited = resume_components(RESUME.replace("developer tools", "developer tools and CLIs"))
+    assert [key for key in components if components[key] != edited[key]] == ["resume:summary"]
+
+
+def test_job_headings_stay_in_their_section():
+    blocks = split_markdown(PREVIOUS_OUTPUT)
+    assert [kind for kind, _ in blocks] == ["header", "summary", "experience", "skills", "education"]
+    assert "### Acme Corp" in dict(blocks)["experience"]
+    assert "".join(block for _, block in blocks) == PREVIOUS_OUTPUT
+
+
+def test_title_change_rewrites_only_the_summary():
+    previous = strategy_components(RESUME, "profile v1")
+    current = {**previous, "posting:title": digest("Senior Data Engineer")}
+
+    revision = plan_revision(PREVIOUS_OUTPUT, previous, current)
+    assert (revision.changed, revision.sections) == (["posting:title"], {"summary"})
+
+    merged = revision.merge("# Jane Doe\n\n## Summary\nSenior engineer who builds data platforms.\n")
+    assert "Senior engineer who builds data platforms." in merged
+    assert "Engineer who builds developer tools." not in merged
+    assert merged.endswith("## Education\nBSc Computer Science\n")
+
+
+def test_prompt_change_rewrites_everything():
+    previous = strategy_components(RESUME, "profile v1")
+    assert plan_revision(PREVIOUS_OUTPUT, previous, {**previous, "template": digest("new template")}) is None
+    assert plan_revision(PREVIOUS_OUTPUT, {}, previous) is None
+
+
+def test_resume_without_clear_sections_is_one_component():
+    assert set(resume_components("Jane Doe\nI build developer tools\nPython, SQL")) == {"resume:text"}
+
+
+def test_skills_edit_rewrites_only_skills_and_summary():
+    previous = strategy_components(RESUME, "profile v1")
+    # The profiler reads the resume, so its output changes too.
+    edited = RESUME.replace("Python, SQL, Airflow", "Python, SQL, Airflow, Spark")
+    current = strategy_components(edited, "profile v2")
+
+    revision = plan_revision(PREVIOUS_OUTPUT, previous, current)
+    assert revision is not None
+    assert revision.changed == ["context:profile_task", "resume:skills"]
+    assert revision.sections == {"skills", "summary"}
+
+
+def test_edit_of_unsectioned_resume_rewrites_everything():
+    text = "Jane Doe\nPython, SQL, Airflow"
+    previous = strategy_components(text, "profile v1")
+    current = strategy_components(text + ", Spark", "profile v2")
+    assert plan_revision(PREVIOUS_OUTPUT, previous, current) is None
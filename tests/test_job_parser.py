@@ -0,0 +1,74 @@
+import json
+
+from aijobhunter.job_parser import JobRequirements, extract_skills, parse_job_posting
+
+GREENHOUSE_PAGE = """
+<html><body>
+<h1 class="app-title">Data Engineer</h1>
+<div id="content">
+  <p>We build data pipelines on AWS.</p>
+  <p><strong>Requirements</strong></p>
+  <ul>
+    <li>3+ years of Python</li>
+    <li>Experience with Airflow and SQL</li>
+    <li>A degree in computer science</li>
+  </ul>
+  <p><strong>Nice to have</strong></p>
+  <ul><li>Kubernetes in production</li></ul>
+  <h3>What you will do</h3>
+  <ul><li>Own the ingestion pipelines</li></ul>
+</div>
+</body></html>
+"""
+
+
+def test_ambiguous_skills_in_prose_are_ignored():
+    text = "Take a rest this spring. Go ahead and shell out for a swift spark of joy."
+    assert extract_skills(text) == []
+
+
+def test_ambiguous_skills_in_technical_context_are_found():
+    text = "Experience with Python and Go.\nDesign REST APIs.\nSpring Boot services.\nShip iOS apps in Swift."
+    assert extract_skills(text) == ["Python", "Go", "Swift", "Spring", "REST"]
+
+
+def test_greenhouse_sections_are_classified():
+    requirements = parse_job_posting("https://boards.greenhouse.io/acme/jobs/1", GREENHOUSE_PAGE)
+
+    assert (requirements.source, requirements.title) == ("greenhouse", "Data Engineer")
+    assert requirements.qualifications == [
+        "3+ years of Python", "Experience with Airflow and SQL", "A degree in computer science",
+    ]
+    assert requirements.preferred_qualifications == ["Kubernetes in production"]
+    assert requirements.responsibilities == ["Own the ingestion pipelines"]
+    assert requirements.experience == ["3+ years of Python"]
+    assert {"Python", "Airflow", "SQL", "AWS", "Kubernetes"} <= set(requirements.skills)
+
+
+def test_json_ld_postings_are_parsed_on_any_site():
+    posting = {
+        "@context": "https://schema.org",
+        "@type": "JobPosting",
+        "title": "Backend Engineer",
+        "hiringOrganization": {"@type": "Organization", "name": "Acme"},
+        "description": "<p><b>Qualifications:</b></p><ul><li>Python</li><li>PostgreSQL</li><li>Docker</li></ul>",
+        "jobLocationType": "TELECOMMUTE",
+    }
+    page = f'<html><head><script type="application/ld+json">{json.dumps(posting)}</script></head></html>'
+
+    requirements = parse_job_posting("https://careers.acme.example/jobs/2", page)
+    assert (requirements.source, requirements.company, requirements.location) == ("json-ld", "Acme", "Remote")
+    assert requirements.qualifications == ["Python", "PostgreSQL", "Docker"]
+
+
+def test_unknown_pages_are_left_to_the_researcher():
+    assert parse_job_posting("https://example.com/careers/3", "<html><h1>Engineer</h1><p>Python</p></html>") is None
+
+
+def test_skills_alone_do_not_make_a_posting_usable():
+    requirements = JobRequirements(url="https://example.com/job", source="html", title="Engineer",
+                                   skills=["Python", "Docker", "Kubernetes", "AWS"])
+    assert not requirements.is_usable()
+
+    requirements.qualifications = ["3+ years of Python", "Docker in production", "A degree in CS"]
+    assert requirements.is_usable()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as api
+from aijobhunter.jobs import JobQueue, JobStatus, QueueFullError
+
+
+def wait_until_done(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not queue.get(job_id).done:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+def test_submit_returns_at_once_then_the_job_finishes():
+    release = threading.Event()
+
+    def run(inputs):
+        release.wait(5)
+        return {"posting": inputs["job_posting_url"]}
+
+    queue = JobQueue(run, max_workers=1)
+    job = queue.submit({"job_posting_url": "https://jobs.example.com/1"})
+    assert not job.done
+
+    release.set()
+    wait_until_done(queue, job.id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.output == {"posting": "https://jobs.example.com/1"}
+    assert queue.get("unknown") is None
+
+
+def test_apply_returns_202_then_status_then_result(monkeypatch):
+    queue = JobQueue(lambda inputs: {"posting": inputs["job_posting_url"]}, max_workers=1)
+    monkeypatch.setattr(api, "job_queue", queue)
+    client = TestClient(api.app)
+
+    response = client.post("/apply", json={"job_posting_url": "https://jobs.example.com/1",
+                                           "github_url": "https://github.com/someone"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    wait_until_done(queue, job_id)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "succeeded"
+    assert client.get(f"/jobs/{job_id}/result").json()["output"] == {"posting": "https://jobs.example.com/1"}
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_failed_runs_report_their_error(monkeypatch):
+    def fail(inputs):
+        raise RuntimeError("scrape failed")
+
+    queue = JobQueue(fail, max_workers=1)
+    monkeypatch.setattr(api, "job_queue", queue)
+    client = TestClient(api.app)
+
+    job_id = client.post("/apply", json={"job_posting_url": "u", "github_url": "g"}).json()["job_id"]
+    wait_until_done(queue, job_id)
+    summary = client.get(f"/jobs/{job_id}").json()
+    assert summary["status"] == "failed" and summary["error"] == "scrape failed"
+    assert client.get(f"/jobs/{job_id}/result").status_code == 500
+
+
+def test_only_the_newest_finished_jobs_are_retained():
+    queue = JobQueue(lambda inputs: inputs["n"], max_workers=1, max_retained_jobs=3)
+    jobs = []
+    for n in range(5):
+        jobs.append(queue.submit({"n": n}))
+        wait_until_done(queue, jobs[-1].id)
+
+    assert [queue.get(job.id) is not None for job in jobs] == [False, False, True, True, True]
+    assert queue.stats()[JobStatus.SUCCEEDED.value] == 3
+
+
+def test_at_least_one_worker_is_required():
+    with pytest.raises(ValueError):
+        JobQueue(lambda inputs: None, max_workers=0)
+
+
+def test_submissions_beyond_the_pending_limit_are_refused(monkeypatch):
+    release = threading.Event()
+    queue = JobQueue(lambda inputs: release.wait(5), max_workers=1, max_pending=2)
+    running = queue.submit({})
+    while queue.get(running.id).status != JobStatus.RUNNING:
+        time.sleep(0.01)
+    queue.submit({})
+    queue.submit({})
+
+    with pytest.raises(QueueFullError):
+        queue.submit({})
+    monkeypatch.setattr(api, "job_queue", queue)
+    response = TestClient(api.app).post("/apply", json={"job_posting_url": "u", "github_url": "g"})
+    assert response.status_code == 503 and "Retry-After" in response.headers
+
+    release.set()
+    queue.shutdown()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from aijobhunter.llm_router import Backend, ModelRouter, RoutingError
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def make_router(max_concurrency=4, queue_timeout=5.0):
+    backends = [
+        Backend("local", "fake/local", max_concurrency=max_concurrency, context_window=1000, latency=1.0),
+        Backend("hosted", "fake/hosted", max_concurrency=max_concurrency, context_window=100000, latency=1.0),
+    ]
+    return ModelRouter(backends, {"llm": ["local", "hosted"]}, queue_timeout=queue_timeout)
+
+
+def test_fails_over_and_cools_down_the_failed_backend():
+    router = make_router()
+    calls = []
+
+    def send(backend):
+        calls.append(backend.name)
+        if backend.name == "local":
+            raise RateLimited("slow down")
+        return backend.name
+
+    assert router.call("llm", send) == "hosted"
+    assert calls == ["local", "hosted"]
+    assert router.backends["local"].cooling_down(time.monotonic())
+
+    # While it cools down, the preferred backend is skipped.
+    calls.clear()
+    assert router.call("llm", send) == "hosted"
+    assert calls == ["hosted"]
+
+
+def test_cooldown_ends_after_success():
+    router = make_router()
+
+    def send(backend):
+        if backend.name == "local":
+            raise TimeoutError()
+        return backend.name
+
+    router.call("llm", send)
+    local = router.backends["local"]
+    local.cooldown_until = time.monotonic() - 1
+    assert router.call("llm", lambda backend: backend.name) == "local"
+    assert local.failures == 0 and not local.cooling_down(time.monotonic())
+
+
+def test_errors_that_would_fail_anywhere_are_not_failed_over():
+    router = make_router()
+    calls = []
+
+    def send(backend):
+        calls.append(backend.name)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        router.call("llm", send)
+    assert calls == ["local"]
+
+
+def test_prompts_too_large_for_a_backend_skip_it():
+    router = make_router()
+    assert router.call("llm", lambda backend: backend.name, prompt_tokens=5000) == "hosted"
+
+
+def test_concurrency_cap_spills_over_and_queue_times_out():
+    router = make_router(max_concurrency=1, queue_timeout=0.2)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    peaks = {"local": 0, "hosted": 0}
+    lock = threading.Lock()
+
+    def send(backend):
+        with lock:
+            peaks[backend.name] = max(peaks[backend.name], backend.in_flight)
+        started.release()
+        release.wait(5)
+        return backend.name
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(router.call("llm", send))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert started.acquire(timeout=5)
+
+    # Both backends are busy, so a third call waits for the queue timeout.
+    with pytest.raises(RoutingError):
+        router.call("llm", send)
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert sorted(results) == ["hosted", "local"]
+    assert peaks == {"local": 1, "hosted": 1}
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from aijobhunter import matching
+from aijobhunter.matching import JobTarget, Requirement, ResumeMatcher
+
+# Fixed embeddings: each text points along the axes of what it is about.
+VECTORS = {
+    "Experience\nBuilt Python data pipelines on AWS": [1.0, 0.0, 0.0],
+    "Skills\nKubernetes, Docker, SQL": [0.0, 1.0, 0.0],
+    "Python data pipelines": [1.0, 0.0, 0.0],
+    "Operate Kubernetes clusters": [0.6, 0.8, 0.0],
+    "Lead a team": [0.0, 0.0, 1.0],
+}
+
+
+class FixedEmbedder:
+    def embed_documents(self, texts):
+        return [VECTORS[text] for text in texts]
+
+
+def make_matcher(monkeypatch, chunks):
+    index = SimpleNamespace(chunks=chunks, embeddings=[VECTORS[chunk] for chunk in chunks])
+    monkeypatch.setattr(matching, "resume_index_store", SimpleNamespace(load=lambda file_path, model_name: index))
+    monkeypatch.setattr(matching, "get_embedder", lambda model_name: FixedEmbedder())
+    return ResumeMatcher("resume.pdf", model_name="fixed")
+
+
+def target(url, *requirements, skills=()):
+    return JobTarget(url, [Requirement(text, kind) for text, kind in requirements], list(skills))
+
+
+PLATFORM = target(
+    "platform",
+    ("Python data pipelines", "qualification"),
+    ("Operate Kubernetes clusters", "qualification"),
+    ("Lead a team", "preferred"),
+    skills=["Python", "Go"],
+)
+
+
+def test_requirements_align_to_their_best_section(monkeypatch):
+    matcher = make_matcher(monkeypatch, list(VECTORS)[:2])
+    report = matcher.match(PLATFORM)
+
+    assert [(a.requirement, a.section, round(a.score, 3)) for a in report.alignments] == [
+        ("Python data pipelines", "Experience", 1.0),
+        ("Operate Kubernetes clusters", "Skills", 0.8),
+        ("Lead a team", "Experience", 0.0),
+    ]
+    # (1.0 + 0.8 + 0.5 * 0.0) / 2.5 weighted requirements, half the named skills.
+    assert report.semantic_score == pytest.approx(0.72)
+    assert (report.matched_skills, report.missing_skills) == (["Python"], ["Go"])
+    assert report.fit_score == pytest.approx(0.7 * 0.72 + 0.3 * 0.5)
+
+
+def test_one_section_resume(monkeypatch):
+    matcher = make_matcher(monkeypatch, ["Experience\nBuilt Python data pipelines on AWS"])
+    report = matcher.match(PLATFORM)
+
+    assert {a.section for a in report.alignments} == {"Experience"}
+    assert report.semantic_score == pytest.approx((1.0 + 0.6) / 2.5)
+
+
+def test_postings_without_requirements_score_on_skills_alone(monkeypatch):
+    matcher = make_matcher(monkeypatch, list(VECTORS)[:2])
+    skills_only = target("skills-only", skills=["Kubernetes", "Rust"])
+    empty = target("empty")
+
+    reports = matcher.score([skills_only, PLATFORM, empty, target("short", ("Lead a team", "qualification"))])
+
+    assert [report.url for report in reports] == ["skills-only", "platform", "empty", "short"]
+    assert (reports[0].semantic_score, reports[0].fit_score) == (0.0, 0.5)
+    # Scores after a posting without requirements still use their own lines.
+    assert reports[1].semantic_score == pytest.approx(0.72)
+    assert (reports[2].fit_score, reports[2].alignments) == (0.0, [])
+    assert reports[3].semantic_score == 0.0
+
+
+def test_resume_without_sections_scores_zero(monkeypatch):
+    report = make_matcher(monkeypatch, []).match(PLATFORM)
+    assert report.semantic_score == 0.0
+    assert {a.section for a in report.alignments} == {""}
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+from aijobhunter import outbound
+from aijobhunter.outbound import OutboundScheduler, TokenBucket, bind_lane
+
+
+class FakeClock:
+    """Stands in for the time module in outbound; sleeping moves it forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(outbound, "time", clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+    assert [bucket.take(clock.now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(clock.now) == pytest.approx(0.5)
+
+    assert bucket.take(clock.now + 0.5) == 0.0
+    # A long idle period refills no more than the burst.
+    later = clock.now + 60
+    assert [bucket.take(later) for _ in range(4)] == [0.0, 0.0, 0.0, pytest.approx(0.5)]
+
+
+def test_quota_sets_rate_and_burst(clock):
+    scheduler = OutboundScheduler(quotas={"serper": 600})
+    bucket = scheduler._provider("serper").bucket
+    assert (bucket.rate, bucket.burst) == (10.0, 60.0)
+    assert scheduler._provider("ollama") is None
+
+
+def test_pause_empties_the_bucket_until_it_ends(clock):
+    bucket = TokenBucket(rate=1.0, burst=5)
+    bucket.pause(10)
+    assert bucket.take(clock.now + 4) == pytest.approx(6)
+    assert bucket.take(clock.now + 10) == pytest.approx(1)
+    assert bucket.take(clock.now + 11) == 0.0
+
+
+def test_429_pauses_the_provider_for_retry_after(clock):
+    scheduler = OutboundScheduler(quotas={"groq": 60})
+
+    def send():
+        raise ProviderError(429, retry_after=20)
+
+    with pytest.raises(ProviderError):
+        scheduler.call("groq", send, max_retries=0)
+    assert scheduler._provider("groq").bucket.paused_until == clock.now + 20
+    assert scheduler.wait_estimate("groq") == pytest.approx(21)
+
+
+def test_outages_do_not_pause_the_provider(clock):
+    scheduler = OutboundScheduler(quotas={"groq": 60})
+
+    def send():
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        scheduler.call("groq", send, max_retries=0)
+    assert scheduler._provider("groq").bucket.paused_until == 0.0
+
+
+class TestRetries:
+    def test_retries_stop_at_the_limit(self, clock, monkeypatch):
+        monkeypatch.setattr(outbound.random, "uniform", lambda low, high: high)
+        calls = []
+
+        def send():
+            calls.append(clock.now)
+            raise ProviderError(503)
+
+        with pytest.raises(ProviderError):
+            OutboundScheduler(quotas={}).call("ollama", send, max_retries=3)
+        assert len(calls) == 4
+        # Full jitter is drawn from a window that doubles every attempt.
+        assert clock.sleeps == [1.0, 2.0, 4.0]
+
+    def test_retry_waits_at_least_retry_after(self, clock):
+        attempts = iter([ProviderError(429, retry_after=30), None])
+
+        def send():
+            error = next(attempts)
+            if error is not None:
+                raise error
+            return "ok"
+
+        assert OutboundScheduler(quotas={}).call("ollama", send, max_retries=1) == "ok"
+        assert clock.sleeps == [30.0]
+
+    @pytest.mark.parametrize("error", [ValueError("bad request"), ProviderError(401)])
+    def test_errors_that_would_fail_again_are_not_retried(self, clock, error):
+        calls = []
+
+        def send():
+            calls.append(1)
+            raise error
+
+        with pytest.raises(type(error)):
+            OutboundScheduler(quotas={}).retry("groq", send, max_retries=3)
+        assert len(calls) == 1 and clock.sleeps == []
+
+
+def test_interactive_lane_goes_before_batch(clock):
+    scheduler = OutboundScheduler(quotas={"groq": 1})
+    provider = scheduler._provider("groq")
+    with scheduler.acquire("groq"):
+        pass  # Takes the only token.
+
+    order = []
+
+    def request(lane):
+        with bind_lane(lane), scheduler.acquire("groq"):
+            order.append(lane)
+
+    def wait_for_queue(**depths):
+        deadline = time.monotonic() + 5
+        while any(scheduler.queue_depths()[("groq", lane)] != n for lane, n in depths.items()):
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+
+    def tick(seconds):
+        with provider.condition:
+            clock.now += seconds
+            provider.condition.notify_all()
+
+    batch = threading.Thread(target=request, args=("batch",))
+    batch.start()
+    wait_for_queue(batch=1)
+    interactive = threading.Thread(target=request, args=("interactive",))
+    interactive.start()
+    wait_for_queue(batch=1, interactive=1)
+
+    # One token per minute: the later interactive request gets the first one.
+    tick(60)
+    interactive.join(5)
+    assert order == ["interactive"]
+    tick(60)
+    batch.join(5)
+    assert order == ["interactive", "batch"]
@@ -0,0 +1,61 @@
+import fitz
+import pytest
+
+from aijobhunter.tools.pdf_extraction import PDFExtractionCache, parse_page_range
+
+
+@pytest.mark.parametrize("pages, expected", [
+    (None, [0, 1, 2, 3, 4]),
+    ("", [0, 1, 2, 3, 4]),
+    ("2", [1]),
+    ("1-2,4", [0, 1, 3]),
+    ("4-", [3, 4]),
+    ("-2", [0, 1]),
+    ("3,1-3, 3", [0, 1, 2]),
+])
+def test_page_ranges(pages, expected):
+    assert parse_page_range(pages, 5) == expected
+
+
+@pytest.mark.parametrize("pages", ["0", "6", "4-9", "3-1", "two", "1-x", "1--2"])
+def test_invalid_page_ranges_are_rejected(pages):
+    with pytest.raises(ValueError):
+        parse_page_range(pages, 5)
+
+
+def make_pdf(path, *pages):
+    with fitz.open() as document:
+        for text in pages:
+            document.new_page().insert_text((72, 72), text)
+        document.save(str(path))
+    return str(path)
+
+
+def test_least_recently_used_document_is_evicted(tmp_path, monkeypatch):
+    cache = PDFExtractionCache(max_entries=2)
+    first = make_pdf(tmp_path / "first.pdf", "first")
+    second = make_pdf(tmp_path / "second.pdf", "second")
+    third = make_pdf(tmp_path / "third.pdf", "third")
+
+    cache.get_pages(first)
+    cache.get_pages(second)
+    cache.get_pages(first)
+    cache.get_pages(third)
+
+    opened = []
+    real_open = fitz.open
+    monkeypatch.setattr(fitz, "open", lambda path: opened.append(path) or real_open(path))
+    assert [page.text.strip() for page in cache.get_pages(first)] == ["first"]
+    assert cache.get_pages(third)[0].text.strip() == "third"
+    assert opened == []
+
+    assert cache.get_pages(second)[0].text.strip() == "second"
+    assert opened == [second]
+
+
+def test_only_requested_pages_are_extracted(tmp_path):
+    cache = PDFExtractionCache()
+    path = make_pdf(tmp_path / "resume.pdf", "one", "two", "three")
+    assert [page.number for page in cache.get_pages(path, "2-")] == [2, 3]
+    with pytest.raises(ValueError):
+        cache.get_pages(path, "4")
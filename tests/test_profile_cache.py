@@ -0,0 +1,70 @@
+import json
+import time
+
+import pytest
+
+from aijobhunter import profile_cache
+from aijobhunter.profile_cache import ProfileArtifactStore
+from aijobhunter.tools.resume_index import file_sha256
+
+GITHUB_URL = "https://github.com/someone"
+PROMPT = "Profile the candidate at {github_url}"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileArtifactStore(root=str(tmp_path / "profiles"), ttl=60)
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 first version")
+    return path
+
+
+def test_profile_is_keyed_by_url_resume_and_prompt(store, resume):
+    store.put(GITHUB_URL, str(resume), "profile", PROMPT)
+
+    # The URL is compared without case or a trailing slash.
+    assert store.get("https://GitHub.com/someone/", str(resume), PROMPT).profile == "profile"
+    assert store.get("https://github.com/someone-else", str(resume), PROMPT) is None
+    assert store.get(GITHUB_URL, str(resume), PROMPT + " and their projects") is None
+
+    resume.write_bytes(b"%PDF-1.4 second version")
+    assert store.get(GITHUB_URL, str(resume), PROMPT) is None
+
+
+def test_stale_profiles_are_missing(store, resume):
+    artifact = store.put(GITHUB_URL, str(resume), "profile", PROMPT)
+    (path,) = (resume.parent / "profiles").iterdir()
+    data = json.loads(path.read_text())
+    data["created_at"] = time.time() - 61
+    path.write_text(json.dumps(data))
+
+    assert artifact.resume_hash == file_sha256(str(resume))
+    assert store.get(GITHUB_URL, str(resume), PROMPT) is None
+
+
+class TestVersions:
+    def test_rebuilds_bump_the_artifact_version(self, store, resume):
+        assert store.put(GITHUB_URL, str(resume), "first", PROMPT).version == 1
+        assert store.put(GITHUB_URL, str(resume), "second", PROMPT).version == 2
+        stored = store.get(GITHUB_URL, str(resume), PROMPT)
+        assert (stored.version, stored.profile) == (2, "second")
+
+    def test_schema_bump_invalidates_stored_profiles(self, store, resume, monkeypatch):
+        store.put(GITHUB_URL, str(resume), "profile", PROMPT)
+        monkeypatch.setattr(profile_cache, "PROFILE_SCHEMA_VERSION", profile_cache.PROFILE_SCHEMA_VERSION + 1)
+        assert store.get(GITHUB_URL, str(resume), PROMPT) is None
+
+
+def test_forget_removes_profiles_of_those_resumes(store, resume, tmp_path):
+    other = tmp_path / "other.pdf"
+    other.write_bytes(b"%PDF-1.4 another resume")
+    store.put(GITHUB_URL, str(resume), "profile", PROMPT)
+    store.put(GITHUB_URL, str(other), "other profile", PROMPT)
+
+    assert store.forget([file_sha256(str(resume))]) == 1
+    assert store.get(GITHUB_URL, str(resume), PROMPT) is None
+    assert store.get(GITHUB_URL, str(other), PROMPT).profile == "other profile"
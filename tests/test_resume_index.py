@@ -0,0 +1,57 @@
+import os
+
+import fitz
+
+from aijobhunter.tools.resume_index import HashingEmbedder, ResumeIndexStore, register_embedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def write_resume(path, pages):
+    with fitz.open() as document:
+        for text in pages:
+            document.new_page().insert_text((72, 72), text)
+        document.save(str(path))
+
+
+def test_edit_reuses_the_embeddings_of_unchanged_chunks(tmp_path):
+    embedder = CountingEmbedder()
+    register_embedder("test/counting", embedder)
+    store = ResumeIndexStore(root=str(tmp_path / "index"))
+    resume = tmp_path / "resume.pdf"
+
+    write_resume(resume, ["Experience: Acme Corp", "Skills: Python, SQL"])
+    first = store.load(str(resume), "test/counting")
+    assert len(embedder.embedded) == 2
+
+    embedder.embedded.clear()
+    write_resume(resume, ["Experience: Acme Corp", "Skills: Python, SQL, Airflow"])
+    os.utime(resume, ns=(0, os.stat(resume).st_mtime_ns + 1))
+    second = store.load(str(resume), "test/counting")
+
+    assert second.doc_hash != first.doc_hash
+    assert embedder.embedded == ["Skills: Python, SQL, Airflow"]
+    assert (second.embeddings[0] == first.embeddings[0]).all()
+
+
+def test_forget_handles_model_names_containing_double_dashes(tmp_path):
+    register_embedder("org/model--v2", HashingEmbedder())
+    store = ResumeIndexStore(root=str(tmp_path / "index"))
+    resume = tmp_path / "resume.pdf"
+    write_resume(resume, ["Skills: Python"])
+    index = store.load(str(resume), "org/model--v2")
+    index_dir = tmp_path / "index" / "org--model--v2" / index.doc_hash
+    assert index_dir.is_dir()
+
+    store.forget(str(resume))
+    assert not index_dir.exists()
+    # The in-memory copy goes too, so a later load does not serve deleted files.
+    assert store._get_loaded(("org/model--v2", index.doc_hash)) is None
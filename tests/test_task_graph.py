@@ -0,0 +1,98 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from aijobhunter.task_graph import TaskTiming, build_dependencies, critical_path, run_graph
+
+
+def task(name, *context):
+    return SimpleNamespace(name=name, context=list(context))
+
+
+def test_dependencies_come_from_context_links():
+    research = task("research")
+    profile = task("profile")
+    strategy = task("strategy", research, profile)
+    interview = task("interview", strategy, research)
+
+    assert build_dependencies([research, profile, strategy, interview]) == {0: [], 1: [], 2: [0, 1], 3: [2, 0]}
+
+
+def test_context_outside_the_crew_is_rejected():
+    with pytest.raises(ValueError, match="strategy"):
+        build_dependencies([task("strategy", task("research"))])
+
+
+def test_independent_tasks_run_concurrently():
+    # Neither task can pass the barrier unless the other is running too.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run(i):
+        if i < 2:
+            barrier.wait()
+        return i
+
+    results, report = run_graph(["research", "profile", "strategy"], {0: [], 1: [], 2: [0, 1]}, run, max_workers=2)
+
+    assert results == [0, 1, 2]
+    timings = report.timings
+    assert timings["strategy"].started_at >= max(timings["research"].finished_at, timings["profile"].finished_at)
+    assert timings["strategy"].dependencies == ["research", "profile"]
+
+
+def test_results_follow_the_declared_order():
+    finished = []
+    second_done = threading.Event()
+
+    def run(i):
+        if i == 0:
+            assert second_done.wait(5)
+        finished.append(i)
+        if i == 1:
+            second_done.set()
+        return f"output {i}"
+
+    results, _ = run_graph(["slow", "fast"], {0: [], 1: []}, run, max_workers=2)
+    assert finished == [1, 0]
+    assert results == ["output 0", "output 1"]
+
+
+def test_done_tasks_are_not_run():
+    ran = []
+    results, report = run_graph(["a", "b"], {0: [], 1: [0]}, lambda i: ran.append(i) or i, max_workers=1, done={0})
+    assert ran == [1]
+    assert results == [None, 1]
+    assert list(report.timings) == ["b"]
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        run_graph(["a", "b"], {0: [1], 1: [0]}, lambda i: i, max_workers=2)
+
+
+def test_task_errors_are_raised_and_stop_the_run():
+    ran = []
+
+    def run(i):
+        ran.append(i)
+        if i == 0:
+            raise RuntimeError("scrape failed")
+
+    with pytest.raises(RuntimeError, match="scrape failed"):
+        run_graph(["a", "b"], {0: [], 1: [0]}, run, max_workers=2)
+    assert ran == [0]
+
+
+def test_critical_path_of_a_diamond_takes_the_longer_branch():
+    def timing(name, start, end, *deps):
+        return TaskTiming(name, start, end, list(deps))
+
+    timings = {
+        "research": timing("research", 0, 1),
+        "profile": timing("profile", 1, 6, "research"),
+        "match": timing("match", 1, 3, "research"),
+        "strategy": timing("strategy", 6, 7, "profile", "match"),
+    }
+    assert critical_path(timings) == ["research", "profile", "strategy"]
+    assert critical_path({}) == []
@@ -0,0 +1,106 @@
+import os
+
+import fitz
+import pytest
+
+from aijobhunter.checkpoints import CheckpointStore
+from aijobhunter.profile_cache import ProfileArtifactStore
+from aijobhunter.tools.resume_index import ResumeIndexStore
+from aijobhunter.users import InvalidResumeError, UserStore
+
+
+def _pdf(text):
+    with fitz.open() as document:
+        document.new_page().insert_text((72, 72), text)
+        return document.tobytes()
+
+
+@pytest.fixture
+def users(tmp_path):
+    return UserStore(root=str(tmp_path / "users"))
+
+
+def test_upload_stores_the_pdf_its_text_and_metadata(users):
+    content = _pdf("Alice, Python developer")
+    resume = users.save_resume("alice", content)
+
+    assert (resume.size, resume.pages) == (len(content), 1)
+    assert users.get("alice") == resume
+    with open(users.resume_path("alice"), "rb") as f:
+        assert f.read() == content
+    with open(os.path.join(users.root, "alice", "resume.txt")) as f:
+        assert "Python developer" in f.read()
+
+
+@pytest.mark.parametrize("user_id", ["../alice", "alice bob", "", "a" * 65])
+def test_invalid_user_ids_are_rejected(users, user_id):
+    with pytest.raises(ValueError):
+        users.save_resume(user_id, _pdf("Alice"))
+
+
+@pytest.mark.parametrize("content", [b"not a pdf", _pdf("")])
+def test_unreadable_resumes_are_rejected(users, content):
+    with pytest.raises(InvalidResumeError):
+        users.save_resume("alice", content)
+    assert users.get("alice") is None
+
+
+def test_delete_removes_the_upload_and_its_index(users, tmp_path, monkeypatch):
+    import aijobhunter.tools.pool as pool
+    import aijobhunter.tools.resume_index as resume_index
+
+    index = ResumeIndexStore(root=str(tmp_path / "index"))
+    monkeypatch.setattr(resume_index, "resume_index_store", index)
+    monkeypatch.setattr(pool.tool_pool, "evict", lambda *args, **kwargs: None)
+    users.save_resume("alice", _pdf("Alice, Python developer"))
+    built = index.load(users.resume_path("alice"), "hashing")
+
+    assert users.delete("alice")
+    assert not os.path.exists(os.path.join(users.root, "alice"))
+    assert not os.path.exists(os.path.join(index.root, "hashing", built.doc_hash))
+    with pytest.raises(KeyError):
+        users.resume_path("alice")
+    assert not users.delete("alice")
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    import aijobhunter.checkpoints as checkpoints
+    import aijobhunter.profile_cache as profile_cache
+    import aijobhunter.tools.pool as pool
+    import aijobhunter.tools.resume_index as resume_index
+
+    (tmp_path / "profiles").mkdir()
+    stores = {
+        "users": UserStore(root=str(tmp_path / "users")),
+        "checkpoints": CheckpointStore(root=str(tmp_path / "checkpoints"), ttl=60),
+        "profiles": ProfileArtifactStore(root=str(tmp_path / "profiles"), ttl=60),
+        "index": ResumeIndexStore(root=str(tmp_path / "index")),
+    }
+    monkeypatch.setattr(checkpoints, "checkpoint_store", stores["checkpoints"])
+    monkeypatch.setattr(profile_cache, "profile_store", stores["profiles"])
+    monkeypatch.setattr(resume_index, "resume_index_store", stores["index"])
+    monkeypatch.setattr(pool.tool_pool, "evict", lambda *args, **kwargs: None)
+    return stores
+
+
+def test_delete_removes_every_upload_and_what_was_built_from_it(stores):
+    users = stores["users"]
+    users.save_resume("alice", _pdf("Alice, Python developer"))
+    path = users.resume_path("alice")
+    stores["index"].load(path, "hashing")
+    stores["profiles"].put("https://github.com/alice", path, "first profile")
+    run = stores["checkpoints"].start({"github_url": "https://github.com/alice"}, path)
+    run.release()
+    os.makedirs(os.path.join(users.runs_dir("alice"), "job-1"))
+
+    users.save_resume("alice", _pdf("Alice, Python and Go developer"))
+    stores["index"].load(path, "hashing")
+    stores["profiles"].put("https://github.com/alice", path, "second profile")
+
+    assert users.delete("alice")
+    assert not os.path.exists(os.path.join(users.root, "alice"))
+    assert os.listdir(stores["profiles"].root) == []
+    assert stores["checkpoints"].get(run.key) is None
+    model_dir = os.path.join(stores["index"].root, "hashing")
+    assert [name for name in os.listdir(model_dir) if name != "sources.json"] == []
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from aijobhunter.utils import Environment
+
+
+def test_runtime_environment_changes_are_seen(monkeypatch):
+    Environment.load_env()
+    monkeypatch.setenv("AIJOBHUNTER_TEST_SETTING", "first")
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_SETTING") == "first"
+
+    monkeypatch.setenv("AIJOBHUNTER_TEST_SETTING", "second")
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_SETTING") == "second"
+
+    monkeypatch.delenv("AIJOBHUNTER_TEST_SETTING")
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_SETTING", "default") == "default"
+
+
+@pytest.fixture
+def dotenv(tmp_path, monkeypatch):
+    # Registering the variables first makes monkeypatch remove what the .env exports.
+    for key in ("AIJOBHUNTER_TEST_DOTENV", "AIJOBHUNTER_TEST_REMOVED"):
+        monkeypatch.setenv(key, "")
+        monkeypatch.delenv(key)
+    yield tmp_path / ".env"
+    Environment.load_env(force_reload=True)
+
+
+def test_dotenv_values_are_loaded(dotenv):
+    dotenv.write_text("# comment\nAIJOBHUNTER_TEST_DOTENV=from-file\n")
+    Environment.load_env(force_reload=True, dotenv_paths=[str(dotenv)])
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_DOTENV") == "from-file"
+    assert Environment.snapshot().values == {"AIJOBHUNTER_TEST_DOTENV": "from-file"}
+
+
+def test_changed_dotenv_is_picked_up_by_the_next_check(dotenv, monkeypatch):
+    dotenv.write_text("AIJOBHUNTER_TEST_DOTENV=first\n")
+    Environment.load_env(force_reload=True, dotenv_paths=[str(dotenv)])
+    first = Environment.snapshot()
+
+    dotenv.write_text("AIJOBHUNTER_TEST_DOTENV=second\n")
+    os.utime(dotenv, ns=(0, os.stat(dotenv).st_mtime_ns + 1))
+    assert Environment.snapshot() is first
+    monkeypatch.setattr(Environment, "_next_check", 0.0)
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_DOTENV") == "second"
+    assert Environment.snapshot() is not first
+
+
+def test_snapshots_are_read_only(dotenv):
+    dotenv.write_text("AIJOBHUNTER_TEST_DOTENV=from-file\n")
+    Environment.load_env(force_reload=True, dotenv_paths=[str(dotenv)])
+    with pytest.raises(TypeError):
+        Environment.snapshot().values["AIJOBHUNTER_TEST_DOTENV"] = "changed"
+
+
+def test_reload_unexports_removed_values(dotenv):
+    dotenv.write_text("AIJOBHUNTER_TEST_DOTENV=from-file\nAIJOBHUNTER_TEST_REMOVED=gone-soon\n")
+    Environment.load_env(force_reload=True, dotenv_paths=[str(dotenv)])
+    assert os.environ["AIJOBHUNTER_TEST_REMOVED"] == "gone-soon"
+    # Changed at runtime, so the reload leaves it alone.
+    os.environ["AIJOBHUNTER_TEST_DOTENV"] = "from-runtime"
+
+    dotenv.write_text("\n")
+    Environment.load_env(force_reload=True, dotenv_paths=[str(dotenv)])
+    assert "AIJOBHUNTER_TEST_REMOVED" not in os.environ
+    assert Environment.get_env_variable("AIJOBHUNTER_TEST_REMOVED", "default") == "default"
+    assert os.environ["AIJOBHUNTER_TEST_DOTENV"] == "from-runtime"